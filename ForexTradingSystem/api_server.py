@@ -8,18 +8,13 @@ except Exception as e:
 
 import os
 import json
-import logging
 from flask import Flask, jsonify, request
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_cors import CORS
 from dotenv import load_dotenv
-from modules.data_feed import DataFeed
-from modules.signal_generator import SignalGenerator
-from modules.mt_execution import MTExecution
-from modules.risk_management import RiskManager
-from modules.hedging import Hedging
-from modules.arbitrage import Arbitrage
-from modules.monitoring import Monitoring
+from modules.logger import get_logger
+from modules.lazy import lazy_component, is_enabled
+from modules.socket_queue import socketio_options
 
 # Load environment variables
 load_dotenv()
@@ -28,32 +23,104 @@ class APIServer:
     def __init__(self):
         self.app = Flask(__name__)
         CORS(self.app)
-        self.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode=async_mode)
+        # With SOCKETIO_MESSAGE_QUEUE set, every worker shares rooms through the queue
+        self.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode=async_mode,
+                                 **socketio_options())
         self.logger = self._setup_logger()
         
-        # Initialize trading system components
-        self.data_feed = DataFeed()
-        self.signal_generator = SignalGenerator()
-        self.monitoring = Monitoring()
-        self.execution = MTExecution(
+        # Trading components are imported and built on first use by a route
+        self.setup_routes()
+        self.setup_socket_events()
+        
+    @lazy_component
+    def data_feed(self):
+        # One MarketDataService per host serves every process; poll directly without it
+        from modules.market_data_service import connect_data_feed
+        return connect_data_feed()
+        
+    @lazy_component
+    def signal_generator(self):
+        from modules.signal_generator import SignalGenerator
+        return SignalGenerator()
+        
+    @lazy_component
+    def monitoring(self):
+        from modules.monitoring import Monitoring
+        return Monitoring()
+        
+    @lazy_component
+    def risk_manager(self):
+        from modules.risk_management import RiskManager
+        return RiskManager()
+        
+    @lazy_component
+    def hedging(self):
+        from modules.hedging import Hedging
+        return Hedging()
+        
+    @lazy_component
+    def arbitrage(self):
+        from modules.arbitrage import Arbitrage
+        return Arbitrage()
+        
+    @lazy_component
+    def journal(self):
+        from modules.journal import TradeJournal
+        return TradeJournal(os.getenv('JOURNAL_PATH', 'trading_journal.db'))
+        
+    @lazy_component
+    def performance(self):
+        # Bot performance is computed locally from the shared trade journal
+        from modules.performance import PerformanceTracker
+        performance = PerformanceTracker()
+        performance.rollups = self.analytics
+        return performance
+        
+    @lazy_component
+    def analytics(self):
+        # Rollups are fed by the performance tracker as it replays journaled fills
+        from modules.analytics import AnalyticsRollups
+        return AnalyticsRollups()
+        
+    @lazy_component
+    def read_model(self):
+        # Trading state published by the trading process
+        from modules.read_model import ReadModel
+        return ReadModel()
+        
+    @lazy_component
+    def news(self):
+        # Requests are served from the store; only the ingester calls the news provider
+        from modules.news import NewsStore, NewsIngester
+        store = NewsStore()
+        if is_enabled('ENABLE_NEWS_INGEST'):
+            NewsIngester(store).start()
+        return store
+        
+    @lazy_component
+    def scoring(self):
+        # EAs with EnableML post their PrepareFeatures() array; one model, batched calls
+        from modules.ml_scoring import ScoringService
+        return ScoringService()
+        
+    @lazy_component
+    def latency(self):
+        # Order timelines are journaled with their fills by the trading process
+        from modules.latency import LatencyTracker
+        return LatencyTracker()
+        
+    @lazy_component
+    def execution(self):
+        from modules.mt_execution import MTExecution
+        execution = MTExecution(
             api_url=os.getenv('MT_API_URL'),
             api_key=os.getenv('MT_API_KEY')
         )
-        self.risk_manager = RiskManager()
-        self.hedging = Hedging()
-        self.arbitrage = Arbitrage()
-        
-        self.setup_routes()
-        self.setup_socket_events()
+        execution.performance = self.performance
+        return execution
         
     def _setup_logger(self):
-        logger = logging.getLogger('api_server')
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('api_server.log')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('api_server', 'api_server.log')
         
     def setup_routes(self):
         @self.app.route('/api/dashboard', methods=['GET'])
@@ -65,15 +132,15 @@ class APIServer:
                     'analytics': self.get_analytics()
                 })
             except Exception as e:
-                self.logger.error(f"Dashboard error: {e}")
+                self.logger.error("Dashboard error: %s", e)
                 return jsonify({'error': str(e)}), 500
                 
         @self.app.route('/api/bots', methods=['GET'])
         def get_bots():
             try:
-                return jsonify(self.get_bot_configurations())
+                return jsonify(self.get_bots())
             except Exception as e:
-                self.logger.error(f"Bots error: {e}")
+                self.logger.error("Bots error: %s", e)
                 return jsonify({'error': str(e)}), 500
                 
         @self.app.route('/api/bots/performance', methods=['GET'])
@@ -81,7 +148,7 @@ class APIServer:
             try:
                 return jsonify(self.get_bots_performance())
             except Exception as e:
-                self.logger.error(f"Bots performance error: {e}")
+                self.logger.error("Bots performance error: %s", e)
                 return jsonify({'error': str(e)}), 500
                 
         @self.app.route('/api/bots/<string:bot_id>/performance', methods=['GET'])
@@ -89,7 +156,77 @@ class APIServer:
             try:
                 return jsonify(self.get_bot_performance(bot_id))
             except Exception as e:
-                self.logger.error(f"Bot performance error: {e}")
+                self.logger.error("Bot performance error: %s", e)
+                return jsonify({'error': str(e)}), 500
+                
+        @self.app.route('/api/analytics', methods=['GET'])
+        def get_analytics():
+            try:
+                return jsonify(self.get_analytics(
+                    timeframe=request.args.get('timeframe', '1d'),
+                    bot_id=request.args.get('bot_id'),
+                    symbol=request.args.get('symbol'),
+                    resolution=request.args.get('resolution')
+                ))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                self.logger.error("Analytics error: %s", e)
+                return jsonify({'error': str(e)}), 500
+                
+        @self.app.route('/api/ml/score', methods=['POST'])
+        def score_features():
+            try:
+                body = request.get_json(force=True)
+                if 'rows' in body:
+                    return jsonify({'scores': self.scoring.score_many(body['rows'])})
+                return jsonify({'score': self.scoring.score(body['features'])})
+            except (KeyError, TypeError, ValueError) as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                self.logger.error("ML scoring error: %s", e)
+                return jsonify({'error': str(e)}), 500
+                
+        @self.app.route('/api/ml/stats', methods=['GET'])
+        def get_ml_stats():
+            return jsonify(self.scoring.stats())
+                
+        @self.app.route('/api/status', methods=['GET'])
+        def get_status():
+            try:
+                return jsonify(self.read_model.snapshot())
+            except Exception as e:
+                self.logger.error("Status error: %s", e)
+                return jsonify({'error': str(e)}), 500
+                
+        @self.app.route('/api/news', methods=['GET'])
+        def get_news_feed():
+            try:
+                limit = min(request.args.get('limit', 20, type=int), 200)
+                return jsonify(self.news.query(
+                    symbol=request.args.get('symbol'),
+                    q=request.args.get('q'),
+                    since=request.args.get('since', type=float),
+                    cursor=request.args.get('cursor'),
+                    limit=limit,
+                    # Page numbers for older clients; cursors stay stable as news arrives
+                    offset=(request.args.get('page', 1, type=int) - 1) * limit
+                ))
+            except Exception as e:
+                self.logger.error("News error: %s", e)
+                return jsonify({'error': str(e)}), 500
+                
+        @self.app.route('/api/latency', methods=['GET'])
+        def get_latency():
+            try:
+                return jsonify(self.get_latency(
+                    symbol=request.args.get('symbol'),
+                    bot_id=request.args.get('bot_id'),
+                    start=request.args.get('start', type=float),
+                    end=request.args.get('end', type=float)
+                ))
+            except Exception as e:
+                self.logger.error("Latency error: %s", e)
                 return jsonify({'error': str(e)}), 500
         
     def setup_socket_events(self):
@@ -101,7 +238,20 @@ class APIServer:
         def handle_disconnect():
             self.logger.info('Client disconnected')
             
-        # Add other socket events here
+        # Rooms are shared across workers; the trading process emits into them
+        for room in ('market_data', 'trades', 'status'):
+            self._setup_room_events(room)
+            
+    def _setup_room_events(self, room):
+        @self.socketio.on(f'subscribe_{room}')
+        def handle_subscribe():
+            join_room(room)
+            if room == 'status':
+                emit('system_status', self.read_model.snapshot())
+                
+        @self.socketio.on(f'unsubscribe_{room}')
+        def handle_unsubscribe():
+            leave_room(room)
         
     def start(self, port=None):
         self.socketio.run(self.app, 
@@ -112,40 +262,88 @@ class APIServer:
     def stop(self):
         self.socketio.stop()
         
+    def get_bots(self):
+        """Bots that have traded, as recorded in the shared journal"""
+        try:
+            self.performance.load_from_journal(self.journal)
+            return [{'id': bot_id} for bot_id in self.performance.bot_ids()]
+        except Exception as e:
+            self.logger.error("Error getting bots: %s", e)
+            return []
+            
     def get_bots_performance(self):
         """Get performance metrics for all bots"""
         try:
-            # Get all bot configurations
-            bots = self.get_bot_configurations()
+            # Pick up fills journaled since the last request
+            self.performance.load_from_journal(self.journal)
             
-            # Get performance for each bot
-            performance = []
-            for bot in bots:
-                bot_id = bot['id']
-                bot_perf = self.execution.get_bot_performance(bot_id)
-                performance.append({
-                    'bot_id': bot_id,
-                    'performance': bot_perf
-                })
-                
-            return performance
+            # Get performance for each bot known from the journal
+            return [{
+                'bot_id': bot_id,
+                'performance': self.performance.get_performance(bot_id)
+            } for bot_id in self.performance.bot_ids()]
         except Exception as e:
-            self.logger.error(f"Error getting bots performance: {e}")
+            self.logger.error("Error getting bots performance: %s", e)
             return []
             
     def get_bot_performance(self, bot_id):
         """Get detailed performance for a specific bot"""
         try:
+            self.performance.load_from_journal(self.journal)
             return self.execution.get_bot_performance(bot_id)
         except Exception as e:
-            self.logger.error(f"Error getting bot performance: {e}")
+            self.logger.error("Error getting bot performance: %s", e)
+            return {}
+
+    def get_analytics(self, timeframe='1d', bot_id=None, symbol=None, resolution=None):
+        """PnL, volume, trade count, win rate and drawdown from the precomputed rollups"""
+        self.performance.load_from_journal(self.journal)
+        return self.analytics.query(timeframe, bot_id=bot_id, symbol=symbol, resolution=resolution)
+        
+    def get_news(self, limit=10):
+        """Latest articles for the dashboard, from the news store"""
+        try:
+            return self.news.query(limit=limit)['items']
+        except Exception as e:
+            self.logger.error("Error getting news: %s", e)
+            return []
+            
+    def get_latency(self, symbol=None, bot_id=None, start=None, end=None):
+        """Order latency and slippage histograms for a symbol, bot and time window"""
+        try:
+            self.latency.load_from_journal(self.journal)
+            return self.latency.query(symbol=symbol, bot_id=bot_id, start=start, end=end)
+        except Exception as e:
+            self.logger.error("Error getting latency: %s", e)
             return {}
 
+def run_worker(port, ingest_news=True):
+    """One API worker process; state comes from the read model, rooms from the queue"""
+    if not ingest_news:
+        os.environ['ENABLE_NEWS_INGEST'] = 'false'
+    APIServer().start(port=port)
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--port', type=int, help='Port to run the API server on')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes, on consecutive ports behind a sticky load balancer')
     args = parser.parse_args()
     
-    api_server = APIServer()
-    api_server.start(port=5001)
+    if args.workers > 1:
+        import tempfile
+        import multiprocessing
+        os.environ.setdefault('SOCKETIO_MESSAGE_QUEUE', f"unix://{tempfile.gettempdir()}/forex-socketio")
+        base_port = args.port or int(os.getenv('API_PORT', 5001))
+        workers = [
+            multiprocessing.Process(target=run_worker, args=(base_port + i, i == 0))  # One news poller
+            for i in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    else:
+        api_server = APIServer()
+        api_server.start(port=args.port or 5001)
@@ -5,21 +5,23 @@ import styles from '../styles/newsFeed.module.css';
 
 const NewsFeedPage = () => {
   const [news, setNews] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
+  const loadNews = async (cursor = null) => {
+    try {
+      const newsData = await fetchNewsFeed(cursor);
+      setNews(previous => (cursor ? [...previous, ...newsData.items] : newsData.items));
+      setNextCursor(newsData.next_cursor);
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   useEffect(() => {
-    const loadNews = async () => {
-      try {
-        const newsData = await fetchNewsFeed();
-        setNews(newsData);
-      } catch (err) {
-        setError(err.message);
-      } finally {
-        setLoading(false);
-      }
-    };
-    
     loadNews();
   }, []);
 
@@ -42,6 +44,10 @@ const NewsFeedPage = () => {
           />
         ))}
       </div>
+
+      {nextCursor && (
+        <button onClick={() => loadNews(nextCursor)}>Load more</button>
+      )}
     </div>
   );
 };
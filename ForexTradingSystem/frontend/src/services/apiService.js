@@ -20,10 +20,11 @@ export const fetchDashboardData = async () => {
 };
 
 // News Feed
-export const fetchNewsFeed = async (page = 1, limit = 10) => {
+// Returns { items, next_cursor, total }; pass next_cursor back to get the following page
+export const fetchNewsFeed = async (cursor = null, limit = 10, filters = {}) => {
   try {
     const response = await apiClient.get('/news', {
-      params: { page, limit }
+      params: { limit, ...(cursor ? { cursor } : {}), ...filters }
     });
     return response.data;
   } catch (error) {
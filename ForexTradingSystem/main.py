@@ -3,7 +3,7 @@ eventlet.monkey_patch()
 
 import os
 import sys
-import logging
+import time
 from decimal import Decimal
 from dotenv import load_dotenv
 from flask import Flask, jsonify, request
@@ -14,13 +14,8 @@ eventlet.monkey_patch()
 
 # Load environment variables from .env file
 load_dotenv()
-from modules.data_feed import DataFeed
-from modules.signal_generator import SignalGenerator
-from modules.mt_execution import MTExecution
-from modules.risk_management import RiskManager
-from modules.hedging import Hedging
-from modules.arbitrage import Arbitrage
-from modules.monitoring import Monitoring
+from modules.logger import get_logger
+from modules.lazy import lazy_component, is_enabled
 
 # Initialize API server
 app = Flask(__name__)
@@ -114,22 +109,183 @@ def handle_trade_unsubscription():
         trading_system.execution.remove_subscriber(request.sid)
 
 class TradingSystem:
+    """Trading loop whose subsystems are imported and built on first use.
+    
+    Hedging, arbitrage and the monitoring dashboard can be switched off with
+    ENABLE_HEDGING, ENABLE_ARBITRAGE and ENABLE_MONITORING; disabled
+    subsystems are never imported.
+    """
+    
     def __init__(self):
         self.logger = self._setup_logger()
-        self.data_feed = DataFeed()
-        self.signal_generator = SignalGenerator()
-        self.monitoring = Monitoring()
+        self.monitoring_thread = None
+        self.scheduler_thread = None
+        self.state_thread = None
+        self.ea_log_thread = None
+        self.sleep = time.sleep  # Replaced by a virtual clock in replay
+        self.cycle_interval = float(os.getenv('TRADING_CYCLE_SECONDS', '60'))
+        self.order_volume = float(os.getenv('TRADE_VOLUME', '0.01'))
+        self.enable_hedging = is_enabled('ENABLE_HEDGING')
+        self.enable_arbitrage = is_enabled('ENABLE_ARBITRAGE')
+        self.enable_monitoring = is_enabled('ENABLE_MONITORING')
+        self.publish_state_enabled = is_enabled('ENABLE_READ_MODEL', default=False)
+        self.enable_ml = is_enabled('ENABLE_ML', default=False)
+        self.ml_threshold = float(os.getenv('ML_THRESHOLD', '0.5'))
+        self._last_direction = None
+        
+    @lazy_component
+    def journal(self):
+        from modules.journal import TradeJournal
+        return TradeJournal(os.getenv('JOURNAL_PATH', 'trading_journal.db'))
+        
+    @lazy_component
+    def data_feed(self):
+        # One MarketDataService per host serves every process; poll directly without it
+        from modules.market_data_service import connect_data_feed
+        return connect_data_feed()
+        
+    @lazy_component
+    def signal_generator(self):
+        from modules.signal_generator import SignalGenerator
+        return SignalGenerator()
+        
+    @lazy_component
+    def monitoring(self):
+        from modules.monitoring import Monitoring
+        monitoring = Monitoring()
+        monitoring.load_trade_history(self.journal)
+        return monitoring
+        
+    @lazy_component
+    def performance(self):
+        from modules.performance import PerformanceTracker
+        performance = PerformanceTracker()
+        performance.rollups = self.analytics
+        performance.load_from_journal(self.journal)
+        return performance
+        
+    @lazy_component
+    def analytics(self):
+        from modules.analytics import AnalyticsRollups
+        return AnalyticsRollups()
+        
+    @lazy_component
+    def risk_manager(self):
+        from modules.risk_management import RiskManager
+        risk_manager = RiskManager()
+        risk_manager.journal = self.journal
+        return risk_manager
+        
+    @lazy_component
+    def execution(self):
         # Initialize MetaTrader execution
-        self.execution = MTExecution(
+        from modules.mt_execution import MTExecution
+        return self.wire_execution(MTExecution(
             api_url=os.getenv('MT_API_URL'),
             api_key=os.getenv('MT_API_KEY')
-        )
-        self.execution.monitoring = self.monitoring  # Set monitoring reference
-        self.risk_manager = RiskManager()
-        self.hedging = Hedging()
-        self.arbitrage = Arbitrage()
+        ))
+        
+    def wire_execution(self, execution):
+        """Connect an execution backend to the journal, risk gate and trackers"""
+        if self.enable_monitoring:
+            execution.monitoring = self.monitoring  # Set monitoring reference
+        execution.journal = self.journal  # Persist signals, orders and fills
+        execution.performance = self.performance
+        execution.risk_manager = self.risk_manager  # Pre-trade risk gate
+        execution.indicators = self.indicators  # Bridge only computes what the cache cannot
+        return execution
+        
+    @lazy_component
+    def state(self):
+        # Positions, equity and balances read from memory between reconciliations
+        from modules.state_manager import StateManager
+        state = StateManager(source=self.execution)
+        self.execution.state = state  # Acks and fills update positions locally
+        if self.enable_hedging:
+            state.exchange = self.hedging.exchange
+            self.hedging.state = state
+        return state
+        
+    @lazy_component
+    def features(self):
+        # Same indicator settings as the rule-based signals
+        from modules.ml_scoring import FeatureCache
+        return FeatureCache(params=self.signal_generator.indicators)
+        
+    @lazy_component
+    def scoring(self):
+        from modules.ml_scoring import ScoringService
+        return ScoringService()
+        
+    @lazy_component
+    def ea_log(self):
+        # PUR_EA trades from the terminals' CSV logs, without asking the bridge
+        from modules.ea_log import EALogIngester
+        return EALogIngester(journal=self.journal)
+        
+    @lazy_component
+    def read_model(self):
+        # State shared with API workers, which own no TradingSystem
+        from modules.read_model import ReadModel
+        return ReadModel()
+        
+    @lazy_component
+    def events(self):
+        from modules.socket_queue import EventPublisher
+        return EventPublisher()
+        
+    @lazy_component
+    def bars(self):
+        # Higher timeframes are derived locally from the feed's base bars
+        from modules.bar_aggregator import BarAggregator
+        return BarAggregator(os.getenv('AGGREGATE_BASE_TIMEFRAME', '1m'))
+        
+    @lazy_component
+    def indicators(self):
+        from modules.indicators import IndicatorCache
+        return IndicatorCache(self.bars)
+        
+    @lazy_component
+    def scheduler(self):
+        # Ticker polling for the POLL_SYMBOLS universe, feeding risk mark prices
+        from modules.poll_scheduler import PollScheduler
+        return PollScheduler(on_update=self._on_tickers)
         
-        # Start monitoring in separate thread
+    def _on_tickers(self, tickers):
+        for symbol, ticker in tickers.items():
+            if ticker.get('last'):
+                self.risk_manager.update_price(symbol, ticker['last'])
+                self.state.on_price(symbol, ticker['last'])
+                
+    @lazy_component
+    def backfill(self):
+        from modules.backfill import Backfill
+        return Backfill()
+        
+    def backfill_history(self):
+        """Fetch missing history, including gaps left by downtime, before trading"""
+        try:
+            symbols = os.getenv('BACKFILL_SYMBOLS', os.getenv('DATA_FEED_SYMBOL', 'BTC/USDT')).split(',')
+            timeframes = os.getenv('BACKFILL_TIMEFRAMES', '1m').split(',')
+            stored = self.backfill.run(symbols, timeframes, float(os.getenv('HISTORICAL_DATA_DAYS', '30')))
+            self.logger.info("Backfilled candles: %s", stored)
+            if hasattr(self.data_feed, 'load_history'):
+                self.data_feed.load_history(self.backfill, timeframes[0])
+        except Exception as e:
+            self.logger.error("Error backfilling history: %s", e)
+            
+    @lazy_component
+    def hedging(self):
+        from modules.hedging import Hedging
+        return Hedging()
+        
+    @lazy_component
+    def arbitrage(self):
+        from modules.arbitrage import Arbitrage
+        return Arbitrage()
+        
+    def start_monitoring(self):
+        """Start the monitoring dashboard in a separate thread"""
         import threading
         self.monitoring_thread = threading.Thread(
             target=self.monitoring.run,
@@ -139,52 +295,181 @@ class TradingSystem:
         
     def _setup_logger(self):
         """Configure main application logger"""
-        logger = logging.getLogger('trading_system')
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('trading_system.log')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('trading_system', 'trading_system.log')
         
     def run(self):
         """Main trading system loop"""
         self.logger.info("Starting trading system")
         
+        if self.enable_monitoring and self.monitoring_thread is None:
+            self.start_monitoring()
+        if (os.getenv('POLL_SYMBOLS') or os.getenv('POLL_WATCHLIST')) and self.scheduler_thread is None:
+            import threading
+            self.scheduler_thread = threading.Thread(target=self.scheduler.run, daemon=True)
+            self.scheduler_thread.start()
+        if self.state_thread is None:
+            import threading
+            self.state_thread = threading.Thread(target=self.state.run, daemon=True)
+            self.state_thread.start()
+        if os.getenv('EA_LOG_PATHS') and self.ea_log_thread is None:
+            import threading
+            self.ea_log_thread = threading.Thread(target=self.ea_log.run, daemon=True)
+            self.ea_log_thread.start()
+        if is_enabled('ENABLE_BACKFILL'):
+            self.backfill_history()
+        
         while True:
             try:
-                # Check risk parameters before proceeding
-                if not self.risk_manager.update_risk_parameters():
-                    self.logger.warning("Risk parameters exceeded. Stopping trading.")
+                if not self.run_cycle():
                     break
-                    
-                # Get market data
-                data = self.data_feed.get_market_data()
-                
-                # Generate trading signals
-                signals = self.signal_generator.generate_signals(data)
-                
-                # Execute trades if signals are valid
-                if signals:
-                    self.execution.execute_trades(signals)
-                    
-                # Manage hedging positions
-                self.hedging.manage_hedges()
-                
-                # Check for arbitrage opportunities
-                self.arbitrage.check_opportunities()
-                
+
                 # Sleep before next iteration
-                time.sleep(60)
+                self.sleep(self.cycle_interval)
                 
             except KeyboardInterrupt:
                 self.logger.info("Shutting down trading system")
                 break
             except Exception as e:
-                self.logger.error(f"Error in main loop: {e}")
-                time.sleep(60)
+                self.logger.error("Error in main loop: %s", e)
+                self.sleep(self.cycle_interval)
+                
+    def run_cycle(self) -> bool:
+        """One pass of the trading loop; returns False when trading must stop"""
+        # Check risk parameters before proceeding
+        if not self.risk_manager.update_risk_parameters():
+            self.logger.warning("Risk parameters exceeded. Stopping trading.")
+            return False
+            
+        # Refresh equity for the pre-trade limit tables from local state
+        account = self.state.get_account_info()
+        self.risk_manager.update_equity(Decimal(str(account['equity'])))
+        
+        # Symbols with open exposure get the fastest polling tier
+        if self.scheduler_thread is not None:
+            self.scheduler.set_positions(
+                [s for s, exposure in self.risk_manager.get_exposure().items() if exposure]
+            )
+            
+        # Get market data
+        data = self.data_feed.get_data()
+        self.bars.on_frame(self.data_feed.symbol, data)
+        if data is not None and len(data):
+            self.state.on_price(self.data_feed.symbol, float(data['close'].iloc[-1]))
+        
+        # Generate trading signals over the rolling history, not just the newest bar
+        history = self.data_feed.historical_data
+        if history is not None and len(history) >= self.signal_generator.min_bars:
+            signals = self.signal_generator.generate_signals(history)
+            
+            # Execute trades if signals are valid
+            orders = self._orders_from_signals(signals, history)
+            if orders:
+                self.execution.execute_trades(orders)
+                
+        # Manage hedging positions
+        if self.enable_hedging:
+            self.hedging.manage_hedges()
+            
+        # Check for arbitrage opportunities
+        if self.enable_arbitrage:
+            self.arbitrage.check_opportunities()
+            
+        if self.publish_state_enabled:
+            self.publish_state(data)
+        return True
+        
+    def publish_state(self, data=None):
+        """Write trading state to the read model and push it to API worker rooms"""
+        try:
+            status = {'trading_active': True, 'direction': self._last_direction, 'updated': time.time()}
+            risk = self.risk_manager.get_risk_status()
+            account = self.state.get_account_info()
+            positions = self.state.get_positions()
+            self.read_model.publish(status=status, risk=risk, account=account, positions=positions)
+            self.events.emit('system_status', {'status': status, 'risk': risk, 'account': account}, room='status')
+            self.events.emit('positions', positions, room='trades')
+            if data is not None and len(data):
+                bar = data.iloc[-1]
+                self.events.emit('market_data', {
+                    'symbol': self.data_feed.symbol,
+                    'timestamp': str(bar['timestamp']),
+                    **{column: float(bar[column]) for column in ('open', 'high', 'low', 'close', 'volume')}
+                }, room='market_data')
+        except Exception as e:
+            self.logger.error("Error publishing state: %s", e)
+        
+    def _orders_from_signals(self, signals, history):
+        """Turn indicator signals into an order when the combined direction flips"""
+        direction = self.signal_generator.get_direction(signals)
+        if not direction or direction == self._last_direction:
+            return []
+        if self.enable_ml and self._ml_vetoes(direction, history):
+            return []
+        self._last_direction = direction
+        return [{
+            'symbol': self.data_feed.symbol,
+            'direction': direction,
+            'volume': self.order_volume,
+            'price': float(history['close'].iloc[-1]),
+            'signal_ts': time.monotonic()  # Starts the order's latency timeline
+        }]
+        
+    def _ml_vetoes(self, direction, history):
+        """True when the model scores against the signal by more than ML_THRESHOLD"""
+        try:
+            features = self.features.update(self.data_feed.symbol, 'feed', history)
+            if features is None:
+                return False
+            score = self.scoring.score(features)
+        except Exception as e:
+            self.logger.error("ML scoring failed, keeping signal: %s", e)
+            return False
+        if score * (1.0 if direction == 'long' else -1.0) < -self.ml_threshold:
+            self.logger.info("ML score %.2f vetoed %s signal", score, direction)
+            return True
+        return False
 
 if __name__ == "__main__":
+    if '--replay' in sys.argv:
+        # Run the full pipeline against a recorded bar file on a virtual clock
+        from modules.replay import ReplayMarket, ReplayRunner
+        market = ReplayMarket.from_csv(sys.argv[sys.argv.index('--replay') + 1])
+        runner = ReplayRunner(market)
+        runner.attach(TradingSystem())
+        print(runner.run())
+        sys.exit(0)
+        
+    if '--walk-forward' in sys.argv:
+        # Optimize signal parameters over rolling windows of a recorded bar file
+        import json
+        import pandas as pd
+        from modules.walk_forward import WalkForward
+        result = WalkForward(pd.read_csv(sys.argv[sys.argv.index('--walk-forward') + 1])).run()
+        print(json.dumps({'summary': result['summary'], 'folds': result['folds']}, indent=2, default=str))
+        sys.exit(0)
+        
+    if '--api-workers' in sys.argv:
+        # Trade in this process; API workers read its state and share Socket.IO rooms
+        import subprocess
+        import tempfile
+        os.environ['ENABLE_READ_MODEL'] = 'true'
+        os.environ.setdefault('SOCKETIO_MESSAGE_QUEUE', f"unix://{tempfile.gettempdir()}/forex-socketio")
+        workers = subprocess.Popen([
+            sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api_server.py'),
+            '--workers', sys.argv[sys.argv.index('--api-workers') + 1]
+        ])
+        try:
+            TradingSystem().run()
+        finally:
+            workers.terminate()
+        sys.exit(0)
+        
+    if '--multiprocess' in sys.argv or is_enabled('MULTIPROCESS', default=False):
+        # Split ingestion, signals, execution and the API across processes
+        from modules.pipeline import Pipeline
+        Pipeline().run()
+        sys.exit(0)
+        
     # Initialize trading system
     trading_system = TradingSystem()
     
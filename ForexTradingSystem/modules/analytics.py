@@ -0,0 +1,218 @@
+import os
+import re
+import time
+import bisect
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+RESOLUTIONS = {'1m': 60, '1h': 3600, '1d': 86400}
+ALL = '*'  # Bot or symbol key of the combined rollups
+
+_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000, 'y': 31536000}
+_TIMEFRAME = re.compile(r'^(\d+)([mhdwMy])$')
+
+
+def parse_timeframe(timeframe: str) -> Optional[float]:
+    """Lookback window in seconds for '15m', '1h', '1d', '1w', '1M', '1y'; None for 'all'"""
+    if timeframe in (None, '', 'all'):
+        return None
+    match = _TIMEFRAME.match(timeframe)
+    if not match:
+        raise ValueError(f"Unknown timeframe: {timeframe}")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+def resolution_for(window: Optional[float]) -> str:
+    """Finest resolution that keeps a window to a chart-sized number of buckets"""
+    if window is not None and window <= 6 * 3600:
+        return '1m'
+    if window is not None and window <= 14 * 86400:
+        return '1h'
+    return '1d'
+
+
+class _Bucket:
+    """Trade statistics for one time bucket that merge with their neighbours.
+    
+    Drawdown is kept as the running sum with its highest and lowest prefix
+    and the deepest fall inside the bucket, so the drawdown of consecutive
+    buckets follows from these four numbers without the trades.
+    """
+    
+    __slots__ = ('pnl', 'volume', 'fills', 'trades', 'wins', 'gross_profit', 'gross_loss',
+                 'high', 'low', 'drawdown')
+                 
+    def __init__(self):
+        self.pnl = 0.0
+        self.volume = 0.0
+        self.fills = 0
+        self.trades = 0
+        self.wins = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.high = 0.0  # Highest and lowest cumulative PnL since the bucket start
+        self.low = 0.0
+        self.drawdown = 0.0
+        
+    def add_trade(self, profit: float):
+        self.trades += 1
+        if profit > 0:
+            self.wins += 1
+            self.gross_profit += profit
+        else:
+            self.gross_loss += profit
+        self.pnl += profit
+        self.high = max(self.high, self.pnl)
+        self.low = min(self.low, self.pnl)
+        self.drawdown = max(self.drawdown, self.high - self.pnl)
+        
+    def merge(self, other: '_Bucket'):
+        """Append a later bucket"""
+        self.drawdown = max(self.drawdown, other.drawdown, self.high - (self.pnl + other.low))
+        self.high = max(self.high, self.pnl + other.high)
+        self.low = min(self.low, self.pnl + other.low)
+        self.pnl += other.pnl
+        self.volume += other.volume
+        self.fills += other.fills
+        self.trades += other.trades
+        self.wins += other.wins
+        self.gross_profit += other.gross_profit
+        self.gross_loss += other.gross_loss
+        
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'pnl': self.pnl,
+            'volume': self.volume,
+            'fills': self.fills,
+            'trades': self.trades,
+            'wins': self.wins,
+            'win_rate': self.wins / self.trades * 100 if self.trades else 0,
+            'gross_profit': self.gross_profit,
+            'gross_loss': self.gross_loss,
+            'max_drawdown': self.drawdown
+        }
+
+
+class _Series:
+    __slots__ = ('starts', 'buckets')
+    
+    def __init__(self):
+        self.starts: List[int] = []
+        self.buckets: Dict[int, _Bucket] = {}
+        
+    def bucket(self, start: int) -> _Bucket:
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            bucket = self.buckets[start] = _Bucket()
+            if not self.starts or start > self.starts[-1]:
+                self.starts.append(start)
+            else:
+                bisect.insort(self.starts, start)
+        return bucket
+        
+    def prune(self, cutoff: int):
+        drop = bisect.bisect_left(self.starts, cutoff)
+        for start in self.starts[:drop]:
+            del self.buckets[start]
+        del self.starts[:drop]
+
+
+class AnalyticsRollups:
+    """PnL, volume, trade count, win rate and drawdown rolled up at 1m, 1h and 1d.
+    
+    Every fill and closed trade updates one bucket per resolution for its
+    (bot, symbol), for the bot and symbol totals and for everything, so a
+    timeframe query reads precomputed buckets for exactly the series it
+    asks for and never scans trades. Minute and hour buckets are kept for
+    ANALYTICS_RETENTION_1M / _1H seconds.
+    """
+    
+    def __init__(self):
+        self.retention = {
+            '1m': int(os.getenv('ANALYTICS_RETENTION_1M', str(2 * 86400))),
+            '1h': int(os.getenv('ANALYTICS_RETENTION_1H', str(90 * 86400))),
+            '1d': None
+        }
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self._latest = 0
+        self._lock = threading.Lock()
+        
+    def _buckets(self, bot_id: Optional[str], symbol: Optional[str], ts: float):
+        bot_id, symbol = bot_id or 'default', symbol or ALL
+        keys = {(bot_id, symbol), (bot_id, ALL), (ALL, symbol), (ALL, ALL)}
+        for resolution, seconds in RESOLUTIONS.items():
+            start = int(ts // seconds) * seconds
+            for bot, sym in keys:
+                series = self._series.get((resolution, bot, sym))
+                if series is None:
+                    series = self._series[(resolution, bot, sym)] = _Series()
+                yield series.bucket(start)
+                
+    def on_fill(self, bot_id: Optional[str], symbol: str, volume: float, ts: Optional[float] = None):
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            for bucket in self._buckets(bot_id, symbol, ts):
+                bucket.fills += 1
+                bucket.volume += abs(float(volume))
+            self._advance(ts)
+            
+    def on_trade(self, bot_id: Optional[str], symbol: Optional[str], profit: float,
+                 ts: Optional[float] = None):
+        """Add a closed trade's realized profit"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            for bucket in self._buckets(bot_id, symbol, ts):
+                bucket.add_trade(float(profit))
+            self._advance(ts)
+            
+    def _advance(self, ts: float):
+        # Pruning runs once per hour of data, not on every update
+        if ts - self._latest < 3600:
+            return
+        self._latest = ts
+        for (resolution, _, _), series in self._series.items():
+            if self.retention[resolution] is not None:
+                series.prune(int(ts - self.retention[resolution]))
+                
+    def query(self, timeframe: str = '1d', bot_id: Optional[str] = None, symbol: Optional[str] = None,
+              resolution: Optional[str] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """Per-bucket series and totals for the window `timeframe` back from `end`"""
+        window = parse_timeframe(timeframe)
+        resolution = resolution or resolution_for(window)
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        end = time.time() if end is None else end
+        start = None if window is None else end - window
+        total = _Bucket()
+        series = []
+        with self._lock:
+            buckets = self._series.get((resolution, bot_id or ALL, symbol or ALL))
+            if buckets is not None:
+                first = 0 if start is None else bisect.bisect_left(
+                    buckets.starts, int(start // RESOLUTIONS[resolution]) * RESOLUTIONS[resolution])
+                last = bisect.bisect_right(buckets.starts, end)
+                for bucket_start in buckets.starts[first:last]:
+                    bucket = buckets.buckets[bucket_start]
+                    total.merge(bucket)
+                    series.append(dict(bucket.summary(), time=bucket_start,
+                                       cumulative_pnl=total.pnl, drawdown=total.high - total.pnl))
+        return {
+            'timeframe': timeframe,
+            'resolution': resolution,
+            'bot_id': bot_id,
+            'symbol': symbol,
+            'start': start,
+            'end': end,
+            'summary': total.summary(),
+            'series': series,
+            # Chart data in the shape the analytics page renders
+            'profitLoss': [{'date': _iso(s['time']), 'value': s['cumulative_pnl']} for s in series],
+            'tradeVolume': [{'name': _iso(s['time']), 'value': s['volume']} for s in series],
+            'winRate': [{'name': 'Wins', 'value': total.wins},
+                        {'name': 'Losses', 'value': total.trades - total.wins}]
+        }
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
@@ -1,14 +1,34 @@
 import os
+import time
 import ccxt
-import logging
 from decimal import Decimal
 from typing import Dict, Any, Optional
 
+from .lazy import is_enabled
+from .logger import get_logger
+from .order_book import DepthStream, OrderBookManager
+from .triangular_arbitrage import TriangularArbitrageScanner
+
 class Arbitrage:
     def __init__(self):
         self.exchange = self._initialize_exchange()
         self.logger = self._setup_logger()
         self.min_profit_threshold = Decimal('0.005')  # 0.5% minimum profit
+        self.base_currency = os.getenv('ARBITRAGE_BASE_CURRENCY', 'USDT')
+        self.trade_amount = Decimal(os.getenv('ARBITRAGE_TRADE_AMOUNT', '100'))
+        self.scanner = TriangularArbitrageScanner(
+            max_cycle_length=int(os.getenv('ARBITRAGE_MAX_CYCLE_LENGTH', '3'))
+        )
+        # Candidates are priced through depth only after passing on tickers; a shallow
+        # snapshot covers the trade size at a fraction of a full book's request weight
+        self.max_depth_checks = int(os.getenv('ARBITRAGE_MAX_DEPTH_CHECKS', '5'))
+        self.order_books = OrderBookManager(
+            self.exchange, logger=self.logger,
+            snapshot_limit=int(os.getenv('ARBITRAGE_BOOK_DEPTH', '100'))
+        )
+        if is_enabled('ENABLE_DEPTH_STREAM'):
+            # Books a scan has read stay current from depth diffs instead of new snapshots
+            self.order_books.stream = DepthStream(self.order_books)
         
     def _initialize_exchange(self):
         """Initialize exchange connection with API credentials"""
@@ -21,71 +41,93 @@ class Arbitrage:
         
     def _setup_logger(self):
         """Configure arbitrage logger"""
-        logger = logging.getLogger('arbitrage')
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('arbitrage.log')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('arbitrage', 'arbitrage.log')
         
     def check_opportunities(self):
-        """Check for arbitrage opportunities"""
+        """Scan all loaded markets for profitable conversion cycles"""
         try:
-            # Get order book data
-            order_book = self.exchange.fetch_order_book('BTC/USDT')
-            
-            # Calculate potential arbitrage
-            opportunity = self._find_arbitrage_opportunity(order_book)
-            
-            if opportunity:
-                self._execute_arbitrage(opportunity)
+            if self.scanner.cycle_count == 0:
+                self.scanner.load_markets(self.exchange.load_markets())
+                self.logger.info(
+                    "Arbitrage scanner loaded %d currencies, %d cycles",
+                    len(self.scanner.currencies), self.scanner.cycle_count
+                )
+
+            # One request covers top-of-book for every market
+            scan_started = time.monotonic()
+            self.scanner.update_from_tickers(self.exchange.fetch_tickers())
+
+            opportunities = self.scanner.find_opportunities(
+                float(self.min_profit_threshold),
+                start_currency=self.base_currency
+            )
+
+            # Books fetched for one candidate are reused by the others in this scan
+            for opportunity in opportunities[:self.max_depth_checks]:
+                if self._estimate_cycle_return(opportunity, scan_started) > self.min_profit_threshold:
+                    self._execute_arbitrage(opportunity, scan_started)
+                    break
                 
         except Exception as e:
-            self.logger.error(f"Error checking arbitrage opportunities: {e}")
+            self.logger.error("Error checking arbitrage opportunities: %s", e)
             
-    def _find_arbitrage_opportunity(self, order_book: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Find arbitrage opportunity in order book"""
-        best_bid = Decimal(str(order_book['bids'][0][0]))
-        best_ask = Decimal(str(order_book['asks'][0][0]))
-        
-        # Calculate spread
-        spread = best_bid - best_ask
-        
-        # Check if spread meets profit threshold
-        if spread > best_ask * self.min_profit_threshold:
-            return {
-                'bid_price': best_bid,
-                'ask_price': best_ask,
-                'quantity': Decimal(str(min(
-                    order_book['bids'][0][1],
-                    order_book['asks'][0][1]
-                )))
-            }
-        return None
-        
-    def _execute_arbitrage(self, opportunity: Dict[str, Any]):
-        """Execute arbitrage trade"""
+    def _estimate_cycle_return(self, opportunity: Dict[str, Any], since: Optional[float] = None) -> Decimal:
+        """Walk the local order books to estimate the net return at trade size"""
         try:
-            # Place buy order at ask price
-            buy_order = self.exchange.create_limit_buy_order(
-                'BTC/USDT',
-                float(opportunity['quantity']),
-                float(opportunity['ask_price'])
-            )
+            amount = float(self.trade_amount)
+            for leg in opportunity['legs']:
+                fee = 1 - leg.get('fee', self.scanner.default_fee)
+                if leg['side'] == 'buy':
+                    # Size the buy from top of book, then price it through the depth
+                    quantity = amount / leg['price']
+                    price, filled = self.order_books.estimate_fill(leg['symbol'], 'buy', quantity, since)
+                    if price is None or filled < quantity:
+                        return Decimal('-1')
+                    amount = amount / price * fee
+                else:
+                    price, filled = self.order_books.estimate_fill(leg['symbol'], 'sell', amount, since)
+                    if price is None or filled < amount:
+                        return Decimal('-1')
+                    amount = amount * price * fee
+            return Decimal(str(amount)) / self.trade_amount - 1
+        except Exception as e:
+            self.logger.error("Error estimating arbitrage fill: %s", e)
+            return Decimal('-1')
             
-            # Place sell order at bid price
-            sell_order = self.exchange.create_limit_sell_order(
-                'BTC/USDT',
-                float(opportunity['quantity']),
-                float(opportunity['bid_price'])
+    def _execute_arbitrage(self, opportunity: Dict[str, Any], since: Optional[float] = None):
+        """Execute each leg of an arbitrage cycle with market orders"""
+        try:
+            self.logger.info(
+                "Arbitrage opportunity %s: %.4f%%",
+                ' -> '.join(opportunity['path']), opportunity['profit'] * 100
             )
+            amount = self.trade_amount
+            orders = []
+            for leg in opportunity['legs']:
+                if leg['side'] == 'buy':
+                    # Spend `amount` of quote currency for base at the expected fill price
+                    price, _ = self.order_books.estimate_fill(
+                        leg['symbol'], 'buy', float(amount) / leg['price'], since
+                    )
+                    quantity = amount / Decimal(str(price or leg['price']))
+                else:
+                    quantity = amount
+                order = self.exchange.create_market_order(
+                    leg['symbol'],
+                    leg['side'],
+                    float(quantity)
+                )
+                orders.append(order)
+                if leg['side'] == 'buy':
+                    amount = Decimal(str(order.get('filled') or quantity))
+                else:
+                    amount = Decimal(str(order.get('cost') or quantity * Decimal(str(leg['price']))))
             
-            self.logger.info(f"Arbitrage executed - Buy: {buy_order}, Sell: {sell_order}")
+            self.logger.info("Arbitrage executed - Orders: %s", orders)
             
         except ccxt.InsufficientFunds:
             self.logger.error("Insufficient funds to execute arbitrage")
         except ccxt.NetworkError:
             self.logger.error("Network error while executing arbitrage")
         except Exception as e:
-            self.logger.error(f"Error executing arbitrage: {e}")
+            self.logger.error("Error executing arbitrage: %s", e)
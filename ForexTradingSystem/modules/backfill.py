@@ -0,0 +1,192 @@
+import os
+import time
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+import ccxt
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .logger import get_logger
+from .poll_scheduler import TokenBucket
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, timeframe, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS backfill_chunks (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (symbol, timeframe, start)
+);
+"""
+
+Range = Tuple[int, int]  # [start, end) in epoch milliseconds
+
+
+class Backfill:
+    """Historical OHLCV backfill with checkpointed, resumable chunks.
+    
+    The wanted range is compared against what is already stored, and only
+    the missing ranges are fetched: the initial history, gaps left by
+    downtime and the tail since the last run. Missing ranges are split into
+    chunks that page through fetch_ohlcv concurrently under a shared token
+    bucket. Each finished chunk is committed with its checkpoint in one
+    transaction, so a crash only loses chunks that were still in flight.
+    Candles are keyed by (symbol, timeframe, ts), which de-duplicates
+    overlapping pages.
+    """
+    
+    def __init__(self, exchange=None, path: Optional[str] = None,
+                 bucket: Optional[TokenBucket] = None):
+        self.logger = self._setup_logger()
+        self.exchange = exchange or self._initialize_exchange()
+        self.path = path or os.getenv('BACKFILL_PATH', 'market_history.db')
+        self.page_limit = int(os.getenv('BACKFILL_PAGE_LIMIT', '1000'))
+        self.chunk_pages = int(os.getenv('BACKFILL_CHUNK_PAGES', '5'))
+        self.workers = int(os.getenv('BACKFILL_WORKERS', '4'))
+        self.request_weight = float(os.getenv('BACKFILL_REQUEST_WEIGHT', '5'))
+        weight_per_minute = float(os.getenv('BACKFILL_WEIGHT_PER_MINUTE', '2400'))
+        self.bucket = bucket or TokenBucket(weight_per_minute / 60.0, weight_per_minute / 6.0)
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+        
+    def _initialize_exchange(self):
+        """Initialize exchange connection with API credentials"""
+        exchange = ccxt.binance({
+            'apiKey': os.getenv('EXCHANGE_API_KEY'),
+            'secret': os.getenv('EXCHANGE_API_SECRET'),
+            'enableRateLimit': True
+        })
+        return exchange
+        
+    def _setup_logger(self):
+        return get_logger('backfill', 'backfill.log')
+        
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+        
+    @staticmethod
+    def timeframe_ms(timeframe: str) -> int:
+        return int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+        
+    def missing_ranges(self, symbol: str, timeframe: str, start: int, end: int) -> List[Range]:
+        """Ranges in [start, end) with no stored candles that no completed chunk covers"""
+        step = self.timeframe_ms(timeframe)
+        start = start - start % step
+        conn = self._connection()
+        stored = np.array([row[0] for row in conn.execute(
+            "SELECT ts FROM candles WHERE symbol = ? AND timeframe = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (symbol, timeframe, start, end)
+        )], dtype=np.int64)
+        
+        # Every stretch between consecutive stored candles longer than one bar is a gap
+        edges = np.concatenate(([start - step], stored, [end]))
+        gap = np.flatnonzero(np.diff(edges) > step)
+        gaps = [(int(edges[i] + step), int(edges[i + 1])) for i in gap]
+        
+        done = conn.execute(
+            "SELECT start, end FROM backfill_chunks WHERE symbol = ? AND timeframe = ? AND end > ? AND start < ?",
+            (symbol, timeframe, start, end)
+        ).fetchall()
+        return [(a, b) for a, b in gaps if not any(s <= a and b <= e for s, e in done)]
+        
+    def plan(self, symbol: str, timeframe: str, start: int, end: int) -> List[Range]:
+        """Split missing ranges into chunks of at most chunk_pages pages"""
+        span = self.timeframe_ms(timeframe) * self.page_limit * self.chunk_pages
+        chunks = []
+        for a, b in self.missing_ranges(symbol, timeframe, start, end):
+            chunks.extend((s, min(s + span, b)) for s in range(a, b, span))
+        return chunks
+        
+    def _acquire(self):
+        while not self.bucket.try_acquire(self.request_weight):
+            time.sleep(max(0.01, self.bucket.wait_time(self.request_weight)))
+            
+    def _fetch_chunk(self, symbol: str, timeframe: str, start: int, end: int) -> List[list]:
+        """Page through fetch_ohlcv from start until end; returns closed candles only"""
+        step = self.timeframe_ms(timeframe)
+        closed_before = int(time.time() * 1000) - step
+        candles = []
+        cursor = start
+        while cursor < end:
+            self._acquire()
+            page = self.exchange.fetch_ohlcv(symbol, timeframe, since=cursor, limit=self.page_limit)
+            if not page:
+                break
+            candles.extend(c for c in page if c[0] < end and c[0] <= closed_before)
+            next_cursor = page[-1][0] + step
+            if next_cursor <= cursor:
+                break
+            cursor = next_cursor
+        return candles
+        
+    def _store_chunk(self, symbol: str, timeframe: str, start: int, end: int, candles: List[list]):
+        step = self.timeframe_ms(timeframe)
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(symbol, timeframe, int(c[0]), c[1], c[2], c[3], c[4], c[5]) for c in candles]
+            )
+            # Only a chunk that is entirely in the past can be skipped on the next run
+            if end <= int(time.time() * 1000) - step:
+                conn.execute(
+                    "INSERT OR REPLACE INTO backfill_chunks VALUES (?, ?, ?, ?, ?, ?)",
+                    (symbol, timeframe, start, end, len(candles), time.time())
+                )
+                
+    def run(self, symbols: Sequence[str], timeframes: Sequence[str], days: float,
+            end: Optional[int] = None) -> Dict[Tuple[str, str], int]:
+        """Backfill `days` of history for every symbol and timeframe; returns candles stored"""
+        end = end or int(time.time() * 1000)
+        start = end - int(days * 86400 * 1000)
+        jobs = [
+            (symbol, timeframe, a, b)
+            for symbol in symbols for timeframe in timeframes
+            for a, b in self.plan(symbol, timeframe, start, end)
+        ]
+        stored: Dict[Tuple[str, str], int] = {}
+        if not jobs:
+            return stored
+        self.logger.info("Backfilling %d chunks for %d symbols", len(jobs), len(symbols))
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='backfill') as pool:
+            futures = {pool.submit(self._fetch_chunk, *job): job for job in jobs}
+            for future in as_completed(futures):
+                symbol, timeframe, a, b = futures[future]
+                try:
+                    candles = future.result()
+                except Exception as e:
+                    # Left unchecked, so the next run retries this chunk
+                    self.logger.error("Backfill chunk %s %s %d-%d failed: %s", symbol, timeframe, a, b, e)
+                    continue
+                self._store_chunk(symbol, timeframe, a, b, candles)
+                stored[(symbol, timeframe)] = stored.get((symbol, timeframe), 0) + len(candles)
+        return stored
+        
+    def load(self, symbol: str, timeframe: str, start: Optional[int] = None,
+             end: Optional[int] = None) -> pd.DataFrame:
+        """Stored candles as a DataFeed-style DataFrame"""
+        df = pd.read_sql_query(
+            "SELECT ts AS timestamp, open, high, low, close, volume FROM candles "
+            "WHERE symbol = ? AND timeframe = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            self._connection(),
+            params=(symbol, timeframe, start or 0, end or 2 ** 62)
+        )
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
@@ -0,0 +1,144 @@
+import os
+import time
+import threading
+import pandas as pd
+from collections import deque
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
+
+from .logger import get_logger
+
+_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+BarCallback = Callable[[str, str, Dict[str, Any]], None]
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    """'15m' -> 900; buckets are aligned to the Unix epoch in UTC"""
+    return int(timeframe[:-1]) * _UNITS[timeframe[-1]]
+
+
+class BarAggregator:
+    """Derives higher-timeframe bars from one base bar stream.
+    
+    Every closed base bar updates one partial bar per derived timeframe in
+    constant time. A derived bar closes as soon as the base bar that ends its
+    bucket arrives, or when a later bucket starts after a gap. Subscribers
+    receive each closed bar, and the last `history` closed bars per symbol and
+    timeframe are kept for indicator calculations.
+    """
+    
+    def __init__(self, base_timeframe: str = '1m', timeframes: Optional[Sequence[str]] = None,
+                 history: Optional[int] = None):
+        self.logger = self._setup_logger()
+        self.base_timeframe = base_timeframe
+        self.base_ms = timeframe_seconds(base_timeframe) * 1000
+        if timeframes is None:
+            timeframes = os.getenv('AGGREGATE_TIMEFRAMES', '5m,15m,1h').split(',')
+        self.timeframes: Dict[str, int] = {}
+        for timeframe in timeframes:
+            ms = timeframe_seconds(timeframe) * 1000
+            if ms % self.base_ms:
+                raise ValueError(f"{timeframe} is not a multiple of {base_timeframe}")
+            if ms > self.base_ms:
+                self.timeframes[timeframe] = ms
+        self.history_size = history or int(os.getenv('AGGREGATE_HISTORY', '500'))
+        # (symbol, timeframe) -> [start, open, high, low, close, volume, base bar count]
+        self._partial: Dict[Tuple[str, str], list] = {}
+        self._closed: Dict[Tuple[str, str], deque] = {}
+        self._last_ts: Dict[str, int] = {}
+        self._subscribers: Dict[str, List[Tuple[Optional[str], BarCallback]]] = {}
+        self._lock = threading.RLock()
+        
+    def _setup_logger(self):
+        return get_logger('bar_aggregator', 'bar_aggregator.log')
+        
+    def subscribe(self, timeframe: str, callback: BarCallback, symbol: Optional[str] = None):
+        """Call callback(symbol, timeframe, bar) for each closed bar; symbol None means all"""
+        if timeframe != self.base_timeframe and timeframe not in self.timeframes:
+            raise ValueError(f"Timeframe {timeframe} is not aggregated")
+        with self._lock:
+            self._subscribers.setdefault(timeframe, []).append((symbol, callback))
+            
+    def unsubscribe(self, timeframe: str, callback: BarCallback):
+        with self._lock:
+            self._subscribers[timeframe] = [
+                (s, cb) for s, cb in self._subscribers.get(timeframe, []) if cb is not callback
+            ]
+            
+    def _close(self, symbol: str, timeframe: str, bar: Dict[str, Any]):
+        self._closed.setdefault((symbol, timeframe), deque(maxlen=self.history_size)).append(bar)
+        for wanted, callback in self._subscribers.get(timeframe, ()):
+            if wanted is None or wanted == symbol:
+                try:
+                    callback(symbol, timeframe, bar)
+                except Exception as e:
+                    self.logger.error("Bar subscriber failed for %s %s: %s", symbol, timeframe, e)
+                    
+    @staticmethod
+    def _bar(state: list, complete: bool) -> Dict[str, Any]:
+        start, o, h, l, c, v, count = state
+        return {'timestamp': start, 'open': o, 'high': h, 'low': l, 'close': c,
+                'volume': v, 'bars': count, 'complete': complete}
+                
+    def on_bar(self, symbol: str, ts: int, open_: float, high: float, low: float,
+               close: float, volume: float):
+        """Feed one closed base bar (ts in epoch milliseconds, bar open time)"""
+        with self._lock:
+            if ts <= self._last_ts.get(symbol, -1):
+                return  # Already seen
+            self._last_ts[symbol] = ts
+            self._close(symbol, self.base_timeframe, {
+                'timestamp': ts, 'open': open_, 'high': high, 'low': low, 'close': close,
+                'volume': volume, 'bars': 1, 'complete': True
+            })
+            
+            for timeframe, ms in self.timeframes.items():
+                key = (symbol, timeframe)
+                start = ts - ts % ms
+                state = self._partial.get(key)
+                if state is not None and state[0] != start:
+                    # A gap skipped the base bar that would have closed this one
+                    self._close(symbol, timeframe, self._bar(state, False))
+                    state = None
+                if state is None:
+                    state = self._partial[key] = [start, open_, high, low, close, volume, 1]
+                else:
+                    state[2] = max(state[2], high)
+                    state[3] = min(state[3], low)
+                    state[4] = close
+                    state[5] += volume
+                    state[6] += 1
+                if ts + self.base_ms >= start + ms:
+                    self._close(symbol, timeframe, self._bar(state, state[6] == ms // self.base_ms))
+                    del self._partial[key]
+                    
+    def on_frame(self, symbol: str, frame: pd.DataFrame, now: Optional[float] = None):
+        """Feed DataFeed-style rows; only rows newer than the last one fed, and closed, are visited"""
+        if frame is None or frame.empty:
+            return
+        # A candle fed before it closes would be taken as final and its later updates dropped
+        closes_by = ((time.time() if now is None else now) * 1000) - self.base_ms
+        timestamps = pd.to_datetime(frame['timestamp']).astype('datetime64[ms]').astype('int64').to_numpy()
+        fresh = (timestamps > self._last_ts.get(symbol, -1)) & (timestamps <= closes_by)
+        if not fresh.any():
+            return
+        rows = frame.loc[fresh, ['open', 'high', 'low', 'close', 'volume']]
+        for ts, row in zip(timestamps[fresh], rows.itertuples(index=False)):
+            self.on_bar(symbol, int(ts), *row)
+            
+    def partial(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        """The still-forming bar of a derived timeframe, if any"""
+        with self._lock:
+            state = self._partial.get((symbol, timeframe))
+            return None if state is None else self._bar(list(state), False)
+            
+    def history(self, symbol: str, timeframe: str, include_partial: bool = False) -> pd.DataFrame:
+        """Closed bars (optionally plus the forming one) as a DataFrame"""
+        with self._lock:
+            bars = list(self._closed.get((symbol, timeframe), ()))
+            if include_partial and (symbol, timeframe) in self._partial:
+                bars.append(self._bar(list(self._partial[(symbol, timeframe)]), False))
+        df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close',
+                                         'volume', 'bars', 'complete'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
@@ -1,18 +1,32 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
-from alpaca_trade_api import REST
+import os
 import threading
 import json
+from .news import NewsStore, NewsIngester
+from .journal import TradeJournal
+from .performance import PerformanceTracker
+from .analytics import AnalyticsRollups
 
 class Dashboard:
     def __init__(self, config):
         self.app = Flask(__name__)
         CORS(self.app)
+        from alpaca_trade_api import REST
         self.alpaca = REST(
             key_id=config['ALPACA_API_KEY'],
             secret_key=config['ALPACA_SECRET_KEY'],
             base_url=config['ALPACA_BASE_URL']
         )
+        # News is polled in the background and served from the local store
+        symbols = [s.strip() for s in os.getenv('NEWS_SYMBOLS', 'AAPL').split(',') if s.strip()]
+        self.news = NewsStore()
+        self.news_ingester = NewsIngester(self.news, fetch=lambda: self.alpaca.get_news(symbols, limit=50))
+        # Analytics are rolled up from the trade journal's fills
+        self.journal = TradeJournal(config.get('JOURNAL_PATH', 'trading_journal.db'))
+        self.analytics = AnalyticsRollups()
+        self.performance = PerformanceTracker()
+        self.performance.rollups = self.analytics
         
         self.setup_routes()
         self.running = False
@@ -49,25 +63,26 @@ class Dashboard:
     def get_news(self):
         # Get financial news
         try:
-            news = self.alpaca.get_news('AAPL', limit=10)
             return [{
-                'headline': n.headline,
-                'summary': n.summary,
-                'url': n.url
-            } for n in news]
+                'headline': n['title'],
+                'summary': n['description'],
+                'url': n['url']
+            } for n in self.news.query(limit=10)['items']]
         except Exception as e:
             return {'error': str(e)}
             
-    def get_analytics(self):
+    def get_analytics(self, timeframe='1d'):
         # Generate trading analytics
-        return {
-            'performance': self.calculate_performance(),
-            'risk_metrics': self.calculate_risk_metrics()
-        }
+        try:
+            self.performance.load_from_journal(self.journal)
+            return self.analytics.query(timeframe)
+        except Exception as e:
+            return {'error': str(e)}
         
     def start(self):
         if not self.running:
             self.running = True
+            self.news_ingester.start()
             threading.Thread(target=self.app.run).start()
             
     def stop(self):
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 class DataFeed:
     def __init__(self):
         self.exchange = self._initialize_exchange()
+        self.symbol = os.getenv('DATA_FEED_SYMBOL', 'BTC/USDT')
         self.historical_data = None
         
     def _initialize_exchange(self):
@@ -20,9 +21,9 @@ class DataFeed:
     def get_data(self):
         """Get real-time market data"""
         try:
-            # Get latest OHLCV data
+            # Get latest OHLCV data: the last closed candle and the one still forming
             timeframe = f"{int(os.getenv('DATA_FEED_INTERVAL'))}s"
-            ohlcv = self.exchange.fetch_ohlcv('BTC/USDT', timeframe, limit=1)
+            ohlcv = self.exchange.fetch_ohlcv(self.symbol, timeframe, limit=2)
             
             # Convert to DataFrame
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
@@ -42,7 +43,10 @@ class DataFeed:
         if self.historical_data is None:
             self.historical_data = new_data
         else:
-            self.historical_data = pd.concat([self.historical_data, new_data])
+            # Newer snapshots of the forming candle replace the earlier ones
+            self.historical_data = pd.concat([self.historical_data, new_data]).drop_duplicates(
+                'timestamp', keep='last'
+            ).reset_index(drop=True)
             
         # Keep only the last N days of data
         days_to_keep = int(os.getenv('HISTORICAL_DATA_DAYS'))
@@ -50,3 +54,12 @@ class DataFeed:
         self.historical_data = self.historical_data[
             self.historical_data['timestamp'] > cutoff
         ]
+
+    def load_history(self, backfill, timeframe: str = '1m'):
+        """Seed historical data from backfilled candles instead of waiting on live polls"""
+        days_to_keep = int(os.getenv('HISTORICAL_DATA_DAYS', '30'))
+        start = int((datetime.now() - timedelta(days=days_to_keep)).timestamp() * 1000)
+        history = backfill.load(self.symbol, timeframe, start=start)
+        if self.historical_data is not None:
+            history = pd.concat([history, self.historical_data]).drop_duplicates('timestamp', keep='last')
+        self.historical_data = history.reset_index(drop=True)
@@ -0,0 +1,304 @@
+import os
+import re
+import glob
+import json
+import mmap
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+from .logger import get_logger
+
+HEADER = ('Time', 'Symbol', 'Type', 'Volume', 'Price', 'Stop Loss', 'Take Profit', 'Profit')
+TIME_FORMAT = '%Y.%m.%d %H:%M:%S'  # TimeToString(..., TIME_DATE|TIME_MINUTES|TIME_SECONDS)
+
+_LINE_BREAK = re.compile(r'[\r\n]+')
+_FINGERPRINT = 32  # Bytes before the read offset that must be unchanged between polls
+
+
+def _float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _timestamp(value: str) -> Optional[float]:
+    try:
+        return datetime.strptime(value.strip(), TIME_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+class EALogTail:
+    """Follows one PUR_EA log file and parses the rows appended since the last poll.
+    
+    The file is memory-mapped on each poll and only the bytes after the
+    saved offset are decoded, up to the last complete line. The handle
+    stays open, so a rotated file is read to its end before the new one is
+    picked up by path; a shrunk or rewritten file is read again from the
+    start. MetaTrader writes FILE_CSV logs as UTF-16 with tab separators
+    unless told otherwise, so the encoding and delimiter are detected.
+    
+    UpdateMonitoring() seeks to one byte before the end and writes the
+    position's profit, overwriting the last byte of the previous line.
+    That single changed byte is recognised and the offset steps back over
+    it, so the profit arrives as a one-field line that updates the last
+    trade instead of looking like a truncated file.
+    """
+    
+    def __init__(self, path: str, bot_id: Optional[str] = None):
+        self.path = path
+        self.bot_id = bot_id or os.path.splitext(os.path.basename(path))[0]
+        self.offset = 0
+        self.inode = None
+        self.encoding = None
+        self.delimiter = None
+        self.fingerprint = b''
+        self.last_trade: Optional[Dict[str, Any]] = None
+        self._file = None
+        
+    def state(self) -> Dict[str, Any]:
+        return {
+            'offset': self.offset,
+            'inode': self.inode,
+            'encoding': self.encoding,
+            'delimiter': self.delimiter,
+            'fingerprint': self.fingerprint.hex()
+        }
+        
+    def restore(self, state: Dict[str, Any]):
+        """Resume from a checkpoint; checked against the file on the next poll"""
+        self.offset = state.get('offset', 0)
+        self.inode = state.get('inode')
+        self.encoding = state.get('encoding')
+        self.delimiter = state.get('delimiter')
+        self.fingerprint = bytes.fromhex(state.get('fingerprint', ''))
+        
+    def _reset(self):
+        self.offset = 0
+        self.encoding = None
+        self.delimiter = None
+        self.fingerprint = b''
+        self.last_trade = None
+        
+    def _open(self) -> bool:
+        try:
+            self._file = open(self.path, 'rb')
+        except OSError:
+            return False
+        inode = os.fstat(self._file.fileno()).st_ino
+        if inode != self.inode:
+            self.inode = inode
+            self._reset()
+        return True
+        
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            
+    def poll(self) -> List[Dict[str, Any]]:
+        """Records appended since the last poll, following rotation"""
+        if self._file is None and not self._open():
+            return []
+        records = self._read()
+        try:
+            rotated = os.stat(self.path).st_ino != self.inode
+        except OSError:
+            rotated = False  # Between rename and the EA creating the new file
+        if rotated:
+            self.close()
+            if self._open():
+                records.extend(self._read())
+        return records
+        
+    def _read(self) -> List[Dict[str, Any]]:
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.offset:
+            self._reset()  # Truncated, e.g. the EA reopened it with FILE_WRITE
+        if size == 0:
+            return []
+        with mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            offset = self.offset
+            seen = mm[max(0, offset - len(self.fingerprint)):offset]
+            if seen != self.fingerprint:
+                if seen[:-1] == self.fingerprint[:-1]:
+                    offset -= 1  # Profit written over the last line break
+                else:
+                    self._reset()  # Replaced in place
+                    offset = 0
+            if self.encoding is None:
+                self._detect_encoding(mm[:4])
+            breaker = b'\n\x00' if self.encoding == 'utf-16-le' else b'\n'
+            end = mm.rfind(breaker, offset, size)
+            if end < 0:
+                return []  # No complete line yet
+            end += len(breaker)
+            chunk = mm[offset:end]
+            self.offset = end
+            self.fingerprint = mm[max(0, end - _FINGERPRINT):end]
+        text = self._decode(chunk).lstrip('\ufeff')
+        return [record for line in _LINE_BREAK.split(text) if line.strip()
+                for record in [self._parse(line)] if record is not None]
+                
+    def _decode(self, chunk: bytes) -> str:
+        if self.encoding != 'utf-16-le':
+            return chunk.decode(self.encoding, errors='replace')
+        # A profit rewrite leaves a line ending in a lone b'\n', one byte short,
+        # so everything after it is decoded from its own start
+        pieces, start, i = [], 0, 0
+        while True:
+            i = chunk.find(b'\r\x00\n', i)
+            if i < 0:
+                break
+            if (i - start) % 2:
+                i += 1
+                continue
+            pieces.append(chunk[start:i])
+            start = i = i + 4 if chunk[i + 3:i + 4] == b'\x00' else i + 3
+        pieces.append(chunk[start:])
+        return '\n'.join(piece.decode(self.encoding, errors='replace') for piece in pieces)
+        
+    def _detect_encoding(self, head: bytes):
+        if head[:2] == b'\xff\xfe' or head[1:2] == b'\x00':
+            self.encoding = 'utf-16-le'
+        else:
+            self.encoding = 'cp1252'  # FILE_ANSI
+            
+    def _parse(self, line: str) -> Optional[Dict[str, Any]]:
+        if self.delimiter is None:
+            self.delimiter = max('\t;,', key=line.count) if any(d in line for d in '\t;,') else None
+        fields = [f.strip() for f in line.split(self.delimiter)] if self.delimiter else [line.strip()]
+        if fields[0] == HEADER[0] or fields[0].endswith(':'):
+            return None  # Header, or a summary line such as "Total Trades:"
+        if len(fields) == 1:
+            profit = _float(fields[0])
+            if profit is None or self.last_trade is None:
+                return None
+            self.last_trade['profit'] = profit
+            return {
+                'type': 'profit',
+                'bot_id': self.bot_id,
+                'symbol': self.last_trade['symbol'],
+                'profit': profit,
+                'trade_ts': self.last_trade['ts'],
+                'ts': time.time()
+            }
+        if len(fields) < len(HEADER) - 1:
+            return None
+        values = dict(zip(HEADER, fields))
+        ts = _timestamp(values['Time'])
+        if ts is None:
+            return None
+        self.last_trade = {
+            'type': 'trade',
+            'bot_id': self.bot_id,
+            'ts': ts,
+            'symbol': values['Symbol'],
+            'side': values['Type'].upper(),
+            'volume': _float(values['Volume']),
+            'price': _float(values['Price']),
+            'stop_loss': _float(values['Stop Loss']),
+            'take_profit': _float(values['Take Profit']),
+            'profit': _float(values.get('Profit', '0')) or 0.0
+        }
+        return dict(self.last_trade)
+
+
+class EALogIngester:
+    """Tails the PUR_EA logs of any number of terminals into the trade journal.
+    
+    EA_LOG_PATHS is a comma-separated list of files or glob patterns; each
+    file's name is its bot id. Trades become journal fills and profit
+    updates become PnL rows, queued for the journal's batched writer, so
+    performance and analytics pick them up like bridge executions.
+    """
+    
+    def __init__(self, journal=None, paths: Optional[List[str]] = None,
+                 interval: Optional[float] = None, state_path: Optional[str] = None):
+        self.logger = self._setup_logger()
+        self.journal = journal
+        self.patterns = paths or [p.strip() for p in os.getenv('EA_LOG_PATHS', 'PUR_EA_Log.csv').split(',') if p.strip()]
+        self.interval = interval or float(os.getenv('EA_LOG_POLL_INTERVAL', '1.0'))
+        self.state_path = state_path if state_path is not None else os.getenv('EA_LOG_STATE_PATH', 'ea_log_state.json')
+        self.tails: Dict[str, EALogTail] = {}
+        self.ingested = 0
+        self._checkpoint = self._load_checkpoint()
+        
+    def _setup_logger(self):
+        return get_logger('ea_log', 'ea_log.log')
+        
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error("Error loading EA log checkpoint: %s", e)
+            return {}
+            
+    def _save_checkpoint(self):
+        if not self.state_path:
+            return
+        try:
+            tmp = f'{self.state_path}.tmp'
+            with open(tmp, 'w') as f:
+                json.dump({path: tail.state() for path, tail in self.tails.items()}, f)
+            os.replace(tmp, self.state_path)
+        except Exception as e:
+            self.logger.error("Error saving EA log checkpoint: %s", e)
+            
+    def _discover(self):
+        for pattern in self.patterns:
+            for path in glob.glob(pattern) if glob.has_magic(pattern) else [pattern]:
+                if path not in self.tails:
+                    tail = self.tails[path] = EALogTail(path)
+                    if path in self._checkpoint:
+                        tail.restore(self._checkpoint[path])
+                        
+    def poll(self) -> List[Dict[str, Any]]:
+        """Read every log once and journal the new records"""
+        self._discover()
+        records = []
+        for path, tail in self.tails.items():
+            try:
+                records.extend(tail.poll())
+            except Exception as e:
+                self.logger.error("Error reading EA log %s: %s", path, e)
+        if records:
+            self._journal(records)
+            self._save_checkpoint()
+            self.ingested += len(records)
+        return records
+        
+    def _journal(self, records: List[Dict[str, Any]]):
+        if self.journal is None:
+            return
+        for record in records:
+            if record['type'] == 'trade':
+                self.journal.record_fill(
+                    record['symbol'], record['side'], record['volume'], record['price'],
+                    bot_id=record['bot_id'],
+                    data={'source': 'ea_log', 'stop_loss': record['stop_loss'],
+                          'take_profit': record['take_profit']},
+                    ts=record['ts']
+                )
+            else:
+                # The EA reports the open position's profit, not a realized amount
+                self.journal.record_position_pnl(
+                    record['profit'], symbol=record['symbol'], bot_id=record['bot_id'],
+                    data={'source': 'ea_log', 'kind': 'position_profit', 'trade_ts': record['trade_ts']},
+                    ts=record['ts']
+                )
+                
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """Poll every `interval` seconds until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.poll()
+            stop_event.wait(self.interval)
+        for tail in self.tails.values():
+            tail.close()
@@ -1,14 +1,18 @@
 import os
+import time
 import ccxt
-import logging
 from decimal import Decimal
 from typing import Dict, Any
 
+from .logger import get_logger
+from .latency import order_timeline
+
 class Execution:
     def __init__(self):
         self.exchange = self._initialize_exchange()
         self.logger = self._setup_logger()
         self.monitoring = None  # Will be set by main system
+        self.latency = None  # Latency histograms, set by main system
         
     def _initialize_exchange(self):
         """Initialize exchange connection with API credentials"""
@@ -21,13 +25,7 @@ class Execution:
         
     def _setup_logger(self):
         """Configure execution logger"""
-        logger = logging.getLogger('execution')
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('execution.log')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('execution', 'execution.log')
         
     def execute_trades(self, signals: Dict[str, Any]):
         """Execute trades based on generated signals"""
@@ -45,7 +43,7 @@ class Execution:
                 self._place_order('sell', position_size)
                 
         except Exception as e:
-            self.logger.error(f"Error executing trade: {e}")
+            self.logger.error("Error executing trade: %s", e)
             
     def _get_account_balance(self) -> Decimal:
         """Get available account balance"""
@@ -67,8 +65,17 @@ class Execution:
         """Place market order with proper error handling"""
         try:
             symbol = 'BTC/USDT'
+            submitted = time.monotonic()
             order = self.exchange.create_market_order(symbol, side, float(amount))
-            self.logger.info(f"Order executed: {order}")
+            acked = time.monotonic()
+            filled = order.get('status') == 'closed'
+            timeline = order_timeline(
+                {'submit': submitted, 'ack': acked, 'fill': acked if filled else None},
+                side, None, order.get('average') or order.get('price')
+            )
+            self.logger.info("Order executed: %s (latency %s ms)", order, timeline['latency_ms'])
+            if self.latency is not None:
+                self.latency.record(symbol, None, timeline)
             
             # Send trade data to monitoring system
             if self.monitoring:
@@ -84,4 +91,4 @@ class Execution:
         except ccxt.NetworkError:
             self.logger.error("Network error while placing order")
         except Exception as e:
-            self.logger.error(f"Error placing order: {e}")
+            self.logger.error("Error placing order: %s", e)
@@ -0,0 +1,56 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+class HedgeOptimizer:
+    """Minimum-cost hedge solver over a shared return covariance matrix.
+    
+    Exposures and hedges are quote-currency notionals. The optimizer picks
+    hedge notionals ``x`` over the hedge instruments that minimise
+    
+        Var(ratio * e . r_assets + x . r_hedges) + aversion * sum(cost_j * x_j^2)
+        
+    whose solution is ``x = -(S_hh + L)^-1 S_ha (ratio * e)``, where ``S`` is
+    the covariance of per-period returns and ``L`` the cost penalty scaled to
+    the hedge variance. With zero cost and a single hedge equal to the held
+    asset this reduces to selling ``ratio`` of that exposure.
+    """
+    
+    def __init__(self, symbols: Sequence[str], cost_aversion: float = 1.0):
+        self.symbols = list(symbols)
+        self.cost_aversion = cost_aversion
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        self.covariance: Optional[np.ndarray] = None
+        
+    def update_returns(self, closes: np.ndarray):
+        """Refresh the covariance from a (periods x symbols) matrix of closes"""
+        closes = np.asarray(closes, dtype=float)
+        returns = np.diff(np.log(closes), axis=0)
+        returns = returns[np.isfinite(returns).all(axis=1)]
+        if len(returns) < 2:
+            raise ValueError("Need at least three aligned closes to estimate covariance")
+        self.covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+        
+    def betas(self, asset_symbols: Sequence[str], hedge_symbols: Sequence[str]) -> np.ndarray:
+        """Regression betas of each asset on each hedge instrument (assets x hedges)"""
+        a = [self._index[s] for s in asset_symbols]
+        h = [self._index[s] for s in hedge_symbols]
+        var = np.diag(self.covariance)[h]
+        return self.covariance[np.ix_(a, h)] / np.where(var > 0, var, np.nan)
+        
+    def solve(self, exposures: Dict[str, float], hedge_symbols: Sequence[str],
+              costs: Sequence[float], ratio: float) -> np.ndarray:
+        """Return target hedge notionals aligned with hedge_symbols"""
+        if self.covariance is None:
+            raise ValueError("Covariance has not been estimated yet")
+        assets: List[str] = [s for s in exposures if s in self._index]
+        if not assets or not hedge_symbols:
+            return np.zeros(len(hedge_symbols))
+            
+        a = [self._index[s] for s in assets]
+        h = [self._index[s] for s in hedge_symbols]
+        e = np.array([exposures[s] for s in assets], dtype=float) * ratio
+        
+        s_hh = self.covariance[np.ix_(h, h)]
+        s_ha = self.covariance[np.ix_(h, a)]
+        penalty = self.cost_aversion * np.diag(np.asarray(costs, dtype=float)) * np.mean(np.diag(s_hh))
+        return -np.linalg.lstsq(s_hh + penalty, s_ha @ e, rcond=None)[0]
@@ -1,14 +1,30 @@
 import os
+import time
 import ccxt
-import logging
+import numpy as np
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+from .hedge_optimizer import HedgeOptimizer
+from .logger import get_logger
 
 class Hedging:
     def __init__(self):
         self.exchange = self._initialize_exchange()
         self.logger = self._setup_logger()
         self.hedge_ratio = Decimal('0.5')  # Default hedge ratio
+        self.quote_currency = os.getenv('HEDGE_QUOTE_CURRENCY', 'USDT')
+        self.hedge_symbols = os.getenv('HEDGE_INSTRUMENTS', 'BTC/USDT').split(',')
+        self.min_trade_value = Decimal(os.getenv('HEDGE_MIN_TRADE_VALUE', '10'))
+        self.cost_aversion = float(os.getenv('HEDGE_COST_AVERSION', '1.0'))
+        self.price_ttl = float(os.getenv('HEDGE_PRICE_TTL', '5'))
+        self.covariance_ttl = float(os.getenv('HEDGE_COVARIANCE_TTL', '3600'))
+        self.hedge_positions: Dict[str, Decimal] = {}  # Base quantity held as hedge per instrument
+        self._tickers: Dict[str, Dict[str, Any]] = {}
+        self._tickers_at = 0.0
+        self._optimizer = None
+        self._optimizer_at = 0.0
+        self.state = None  # Local balance state, set by main system
         
     def _initialize_exchange(self):
         """Initialize exchange connection with API credentials"""
@@ -21,13 +37,7 @@ class Hedging:
         
     def _setup_logger(self):
         """Configure hedging logger"""
-        logger = logging.getLogger('hedging')
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('hedging.log')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('hedging', 'hedging.log')
         
     def manage_hedges(self):
         """Manage hedging positions based on current market exposure"""
@@ -35,53 +45,140 @@ class Hedging:
             # Get current positions
             positions = self._get_positions()
             
-            # Calculate required hedge
-            hedge_amount = self._calculate_hedge_amount(positions)
+            # Value every held asset from one cached ticker snapshot
+            symbols = sorted(set(self._asset_symbols(positions)) | set(self.hedge_symbols))
+            tickers = self._get_tickers(symbols)
+            exposures = self._calculate_exposures(positions, tickers)
+            
+            # Calculate required hedge adjustments
+            orders = self._calculate_hedge_orders(exposures, tickers, symbols)
             
-            if hedge_amount > 0:
-                self._place_hedge_order(hedge_amount)
+            if orders:
+                self._place_hedge_orders(orders)
                 
         except Exception as e:
-            self.logger.error(f"Error managing hedges: {e}")
+            self.logger.error("Error managing hedges: %s", e)
             
     def _get_positions(self) -> Dict[str, Decimal]:
-        """Get current positions from exchange"""
-        positions = self.exchange.fetch_balance()
+        """Get current non-zero balances, from local state when available"""
+        if self.state is not None:
+            return {
+                currency: Decimal(str(amount))
+                for currency, amount in self.state.get_balances().items()
+            }
+        balance = self.exchange.fetch_balance()
         return {
-            'BTC': Decimal(str(positions['free']['BTC'])),
-            'USDT': Decimal(str(positions['free']['USDT']))
+            currency: Decimal(str(amount))
+            for currency, amount in balance['total'].items()
+            if amount
         }
         
-    def _calculate_hedge_amount(self, positions: Dict[str, Decimal]) -> Decimal:
-        """Calculate required hedge amount based on current positions"""
-        btc_value = positions['BTC'] * self._get_btc_price()
-        total_value = btc_value + positions['USDT']
+    def _asset_symbols(self, positions: Dict[str, Decimal]) -> List[str]:
+        """Map held assets to their market against the quote currency, where one exists"""
+        # Dust, delisted and earn (LD*) balances have no market; fetch_tickers would reject them
+        markets = self.exchange.load_markets()
+        symbols = (f"{currency}/{self.quote_currency}" for currency in positions if currency != self.quote_currency)
+        return [symbol for symbol in symbols if symbol in markets]
+        
+    def _get_tickers(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get tickers for all symbols in one request, cached for price_ttl seconds"""
+        now = time.monotonic()
+        if now - self._tickers_at > self.price_ttl or not set(symbols) <= set(self._tickers):
+            self._tickers = self.exchange.fetch_tickers(symbols)
+            self._tickers_at = now
+        return self._tickers
+        
+    def _calculate_exposures(self, positions: Dict[str, Decimal],
+                             tickers: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+        """Quote-currency exposure per asset market, excluding our own hedges"""
+        exposures = {}
+        for symbol in self._asset_symbols(positions):
+            ticker = tickers.get(symbol)
+            if not ticker or not ticker.get('last'):
+                continue
+            base = symbol.split('/')[0]
+            quantity = positions[base] - self.hedge_positions.get(symbol, Decimal('0'))
+            exposures[symbol] = float(quantity) * ticker['last']
+        for symbol, quantity in self.hedge_positions.items():
+            # Hedged away the whole asset; keep the original exposure visible
+            if symbol not in exposures and quantity and tickers.get(symbol):
+                exposures[symbol] = -float(quantity) * tickers[symbol]['last']
+        return exposures
+        
+    def _get_optimizer(self, symbols: List[str]) -> HedgeOptimizer:
+        """Return a hedge optimizer with a covariance no older than covariance_ttl"""
+        now = time.monotonic()
+        if (self._optimizer is None or set(symbols) - set(self._optimizer.symbols)
+                or now - self._optimizer_at > self.covariance_ttl):
+            # Align on the hours every market has; a newly listed asset has a shorter history
+            series = [
+                {candle[0]: candle[4] for candle in self.exchange.fetch_ohlcv(symbol, '1h', limit=500)}
+                for symbol in symbols
+            ]
+            hours = sorted(set.intersection(*(set(closes) for closes in series)))
+            if len(hours) < 2:
+                raise ValueError(f"Not enough common price history for {symbols}")
+            closes = np.array([[closes[hour] for closes in series] for hour in hours], dtype=float)
+            optimizer = HedgeOptimizer(symbols, cost_aversion=self.cost_aversion)
+            optimizer.update_returns(closes)
+            self._optimizer = optimizer
+            self._optimizer_at = now
+        return self._optimizer
         
-        # Calculate target hedge position
-        target_hedge = total_value * self.hedge_ratio
+    def _calculate_hedge_orders(self, exposures: Dict[str, float],
+                                tickers: Dict[str, Dict[str, Any]],
+                                symbols: List[str]) -> List[Dict[str, Any]]:
+        """Solve for target hedges and return the orders needed to reach them"""
+        optimizer = self._get_optimizer(symbols)
+        prices = np.array([tickers[s]['last'] for s in self.hedge_symbols], dtype=float)
+        # Per-unit trading cost: taker fee plus half the quoted spread
+        costs = np.array([
+            self.exchange.markets.get(s, {}).get('taker', 0.001) if self.exchange.markets else 0.001
+            for s in self.hedge_symbols
+        ]) + np.array([
+            (tickers[s]['ask'] - tickers[s]['bid']) / (2 * tickers[s]['last'])
+            if tickers[s].get('ask') and tickers[s].get('bid') else 0.0
+            for s in self.hedge_symbols
+        ])
         
-        # Calculate required hedge adjustment
-        return target_hedge - btc_value
+        target = optimizer.solve(exposures, self.hedge_symbols, costs, float(self.hedge_ratio))
+        current = np.array([float(self.hedge_positions.get(s, 0)) for s in self.hedge_symbols]) * prices
+        adjustment = target - current
         
-    def _get_btc_price(self) -> Decimal:
-        """Get current BTC price"""
-        ticker = self.exchange.fetch_ticker('BTC/USDT')
-        return Decimal(str(ticker['last']))
+        orders = []
+        for symbol, value, price in zip(self.hedge_symbols, adjustment, prices):
+            if abs(value) < self.min_trade_value:
+                continue
+            orders.append({
+                'symbol': symbol,
+                'side': 'buy' if value > 0 else 'sell',
+                'amount': abs(value) / price  # Base quantity, not quote value
+            })
+        return orders
         
-    def _place_hedge_order(self, amount: Decimal):
-        """Place hedge order with proper error handling"""
+    def _place_hedge_orders(self, orders: List[Dict[str, Any]]):
+        """Place hedge orders as one batch where the exchange supports it"""
         try:
-            symbol = 'BTC/USDT'
-            side = 'buy' if amount > 0 else 'sell'
-            order = self.exchange.create_market_order(
-                symbol, 
-                side, 
-                float(abs(amount))
-            )
-            self.logger.info(f"Hedge order executed: {order}")
+            if self.exchange.has.get('createOrders'):
+                results = self.exchange.create_orders([
+                    {'symbol': o['symbol'], 'type': 'market', 'side': o['side'], 'amount': o['amount']}
+                    for o in orders
+                ])
+            else:
+                results = [
+                    self.exchange.create_market_order(o['symbol'], o['side'], o['amount'])
+                    for o in orders
+                ]
+            for order, result in zip(orders, results):
+                filled = Decimal(str(result.get('filled') or order['amount']))
+                signed = filled if order['side'] == 'buy' else -filled
+                self.hedge_positions[order['symbol']] = self.hedge_positions.get(order['symbol'], Decimal('0')) + signed
+                if self.state is not None:
+                    self.state.on_exchange_fill(order['symbol'], order['side'], float(filled), result.get('cost'))
+            self.logger.info("Hedge orders executed: %s", results)
         except ccxt.InsufficientFunds:
             self.logger.error("Insufficient funds to place hedge order")
         except ccxt.NetworkError:
             self.logger.error("Network error while placing hedge order")
         except Exception as e:
-            self.logger.error(f"Error placing hedge order: {e}")
+            self.logger.error("Error placing hedge order: %s", e)
@@ -0,0 +1,191 @@
+import threading
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from .logger import get_logger
+
+# MetaTrader period names accepted alongside the aggregator's own ('H1' -> '1h')
+MT_TIMEFRAMES = {
+    'M1': '1m', 'M5': '5m', 'M15': '15m', 'M30': '30m',
+    'H1': '1h', 'H4': '4h', 'D1': '1d', 'W1': '1w'
+}
+
+Buffers = Dict[str, np.ndarray]
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average; the first period - 1 values are NaN"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        csum = np.cumsum(np.insert(values.astype(float), 0, 0.0))
+        out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def _smooth(values: np.ndarray, alpha: float, period: int) -> np.ndarray:
+    """Recursive average seeded with the SMA of the first `period` values, as MetaTrader does"""
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    seeded = values[period - 1:].astype(float).copy()
+    seeded[0] = values[:period].mean()
+    out[period - 1:] = pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    return _smooth(values, 2.0 / (period + 1), period)
+
+
+def rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's RSI"""
+    out = np.full(len(close), np.nan)
+    change = np.diff(close.astype(float))
+    gain = _smooth(np.clip(change, 0, None), 1.0 / period, period)
+    loss = _smooth(np.clip(-change, 0, None), 1.0 / period, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[1:] = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    out[1:][np.isnan(gain)] = np.nan
+    return out
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's average true range"""
+    previous = np.concatenate(([np.nan], close[:-1]))
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    return _smooth(true_range, 1.0 / period, period)
+
+
+def _sma(bars: Buffers, period: int = 14) -> Buffers:
+    return {'main': sma(bars['close'], period)}
+
+
+def _ema(bars: Buffers, period: int = 14) -> Buffers:
+    return {'main': ema(bars['close'], period)}
+
+
+def _rsi(bars: Buffers, period: int = 14) -> Buffers:
+    return {'main': rsi(bars['close'], period)}
+
+
+def _macd(bars: Buffers, fast: int = 12, slow: int = 26, signal: int = 9) -> Buffers:
+    main = ema(bars['close'], fast) - ema(bars['close'], slow)
+    line = np.full(len(main), np.nan)
+    valid = ~np.isnan(main)
+    line[valid] = ema(main[valid], signal)
+    return {'main': main, 'signal': line, 'histogram': main - line}
+
+
+def _atr(bars: Buffers, period: int = 14) -> Buffers:
+    return {'main': atr(bars['high'], bars['low'], bars['close'], period)}
+
+
+def _pur(bars: Buffers, short_period: int = 10, long_period: int = 30, rsi_period: int = 14,
+         overbought: float = 70.0, oversold: float = 30.0) -> Buffers:
+    """The four buffers of PUR_Indicator.mq5"""
+    short_ma = sma(bars['close'], short_period)
+    long_ma = sma(bars['close'], long_period)
+    strength = (np.tanh((short_ma - long_ma) / (long_ma * 0.01))
+                + np.tanh((rsi(bars['close'], rsi_period) - 50.0) / 50.0)) / 2.0
+    trend = np.sign(short_ma - long_ma)
+    return {
+        'main': strength,
+        'trend': trend,
+        'overbought': np.full(len(strength), float(overbought)),
+        'oversold': np.full(len(strength), float(oversold))
+    }
+
+
+INDICATORS: Dict[str, Callable[..., Buffers]] = {
+    'sma': _sma,
+    'ema': _ema,
+    'rsi': _rsi,
+    'macd': _macd,
+    'atr': _atr,
+    'pur': _pur
+}
+
+
+def compute(indicator: str, frame: pd.DataFrame, params: Optional[Dict[str, Any]] = None) -> Buffers:
+    """Every buffer of a local indicator over an OHLC frame"""
+    bars = {column: frame[column].to_numpy(dtype=float) for column in ('open', 'high', 'low', 'close')}
+    return INDICATORS[indicator.lower()](bars, **(params or {}))
+
+
+class IndicatorCache:
+    """Local indicator values over the aggregator's closed bars.
+    
+    Results are cached per (symbol, timeframe, indicator, params). All
+    entries for a symbol and timeframe are dropped when the aggregator closes
+    the next bar there, so a lookup between bar closes is a dict hit. get()
+    returns None when it cannot answer locally (unknown indicator or
+    parameters, a timeframe the aggregator does not build, too little
+    history), so the caller can fall back to the bridge.
+    """
+    
+    def __init__(self, bars):
+        self.logger = self._setup_logger()
+        self.bars = bars
+        self._entries: Dict[Tuple[str, str], Dict[tuple, Dict[str, Any]]] = {}
+        self._generation: Dict[Tuple[str, str], int] = {}
+        self._watched = set()
+        self._lock = threading.Lock()
+        
+    def _setup_logger(self):
+        return get_logger('indicators', 'indicators.log')
+        
+    def _on_bar(self, symbol: str, timeframe: str, bar: Dict[str, Any]):
+        with self._lock:
+            self._entries.pop((symbol, timeframe), None)
+            self._generation[(symbol, timeframe)] = self._generation.get((symbol, timeframe), 0) + 1
+            
+    def _watch(self, timeframe: str) -> bool:
+        if timeframe not in self._watched:
+            try:
+                self.bars.subscribe(timeframe, self._on_bar)
+            except ValueError:
+                return False
+            self._watched.add(timeframe)
+        return True
+        
+    def get(self, symbol: str, timeframe: str, indicator: str,
+            params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Latest value of every buffer, or None if the bridge has to answer"""
+        timeframe = MT_TIMEFRAMES.get(timeframe, timeframe)
+        indicator = indicator.lower()
+        if indicator not in INDICATORS or not self._watch(timeframe):
+            return None
+        key = (indicator, tuple(sorted((params or {}).items())))
+        with self._lock:
+            cached = self._entries.get((symbol, timeframe), {}).get(key)
+            generation = self._generation.get((symbol, timeframe), 0)
+        if cached is not None:
+            return dict(cached, buffers=dict(cached['buffers']))
+            
+        history = self.bars.history(symbol, timeframe)
+        if history.empty:
+            return None
+        try:
+            buffers = compute(indicator, history, params)
+        except (TypeError, ValueError) as e:
+            self.logger.error("Cannot compute %s%s locally: %s", indicator, params, e)
+            return None
+        values = {name: float(buffer[-1]) for name, buffer in buffers.items()}
+        if np.isnan(values['main']):
+            return None  # Still warming up
+        result = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'indicator': indicator,
+            'params': dict(params or {}),
+            'timestamp': int(history['timestamp'].iloc[-1].value // 1_000_000),
+            'value': values['main'],
+            'buffers': values,
+            'source': 'local'
+        }
+        with self._lock:
+            # A bar that closed while computing has already made this result stale
+            if self._generation.get((symbol, timeframe), 0) == generation:
+                self._entries.setdefault((symbol, timeframe), {})[key] = result
+        return dict(result, buffers=dict(values))
@@ -0,0 +1,221 @@
+import json
+import time
+import queue
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional
+
+from .logger import get_logger
+
+TABLES = ('signals', 'orders', 'fills', 'pnl', 'position_pnl')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    bot_id TEXT,
+    symbol TEXT,
+    side TEXT,
+    volume REAL,
+    price REAL,
+    amount REAL,
+    ref TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_ts ON {table} (ts);
+CREATE INDEX IF NOT EXISTS idx_{table}_bot_ts ON {table} (bot_id, ts);
+CREATE INDEX IF NOT EXISTS idx_{table}_symbol_ts ON {table} (symbol, ts);
+"""
+
+_COLUMNS = ('ts', 'bot_id', 'symbol', 'side', 'volume', 'price', 'amount', 'ref', 'data')
+_INSERT = "INSERT INTO {table} (" + ", ".join(_COLUMNS) + ") VALUES (" + ", ".join('?' * len(_COLUMNS)) + ")"
+
+
+class TradeJournal:
+    """Write-behind journal of signals, orders, fills and PnL on SQLite in WAL mode.
+    
+    record_* calls only enqueue a tuple; a background thread groups queued rows
+    into one transaction per batch. Readers use their own connections, which
+    WAL lets run alongside the writer.
+    """
+    
+    def __init__(self, path: str = 'trading_journal.db', batch_size: int = 1000,
+                 flush_interval: float = 0.25, queue_size: int = 100000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.logger = self._setup_logger()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        
+        conn = self._connect()
+        for table in TABLES:
+            conn.executescript(_SCHEMA.format(table=table))
+        conn.commit()
+        
+        self._thread = threading.Thread(target=self._run, name='journal-writer', daemon=True)
+        self._thread.start()
+        
+    def _setup_logger(self):
+        return get_logger('journal', 'journal.log')
+        
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+        
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.row_factory = sqlite3.Row
+        return conn
+        
+    def _enqueue(self, table: str, row: tuple):
+        try:
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            self.dropped += 1
+            
+    def _row(self, bot_id, symbol, side, volume, price, amount, ref, data, ts) -> tuple:
+        # Decimals and numpy scalars are not SQLite types; coerce on the caller's thread
+        volume, price, amount = (None if value is None else float(value) for value in (volume, price, amount))
+        return (
+            time.time() if ts is None else float(ts),
+            bot_id, symbol, side, volume, price, amount,
+            None if ref is None else str(ref),
+            None if data is None else json.dumps(data, default=str)
+        )
+        
+    def record_signal(self, signal: Dict[str, Any], bot_id: Optional[str] = None, ts: Optional[float] = None):
+        """Journal a trading signal as received by execution"""
+        self._enqueue('signals', self._row(
+            bot_id or signal.get('bot_id'), signal.get('symbol'), signal.get('direction'),
+            signal.get('volume'), signal.get('price'), None, None, signal, ts
+        ))
+        
+    def record_order(self, symbol: str, side: str, volume: float, price: Optional[float] = None,
+                     ref: Optional[Any] = None, bot_id: Optional[str] = None,
+                     data: Optional[Dict[str, Any]] = None, ts: Optional[float] = None):
+        """Journal an order submission; ref is the broker ticket or order id"""
+        self._enqueue('orders', self._row(bot_id, symbol, side, volume, price, None, ref, data, ts))
+        
+    def record_fill(self, symbol: str, side: str, volume: float, price: float,
+                    ref: Optional[Any] = None, bot_id: Optional[str] = None,
+                    data: Optional[Dict[str, Any]] = None, ts: Optional[float] = None):
+        """Journal an execution against an order"""
+        self._enqueue('fills', self._row(bot_id, symbol, side, volume, price, None, ref, data, ts))
+        
+    def record_pnl(self, amount: float, symbol: Optional[str] = None, ref: Optional[Any] = None,
+                   bot_id: Optional[str] = None, data: Optional[Dict[str, Any]] = None,
+                   ts: Optional[float] = None):
+        """Journal a realized PnL change"""
+        self._enqueue('pnl', self._row(bot_id, symbol, None, None, None, amount, ref, data, ts))
+        
+    def record_position_pnl(self, amount: float, symbol: Optional[str] = None, ref: Optional[Any] = None,
+                            bot_id: Optional[str] = None, data: Optional[Dict[str, Any]] = None,
+                            ts: Optional[float] = None):
+        """Journal a snapshot of an open position's unrealized profit"""
+        self._enqueue('position_pnl', self._row(bot_id, symbol, None, None, None, amount, ref, data, ts))
+        
+    def _run(self):
+        conn = self._connect()
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                    
+            rows: Dict[str, List[tuple]] = {}
+            markers = []
+            for table, row in batch:
+                if table is None:
+                    if row is None:
+                        running = False
+                    else:
+                        markers.append(row)
+                else:
+                    rows.setdefault(table, []).append(row)
+            if rows:
+                self._write(conn, rows)
+            for marker in markers:
+                marker.set()
+        conn.close()
+        
+    def _write(self, conn: sqlite3.Connection, rows: Dict[str, List[tuple]]):
+        """Commit a batch; if it fails, insert row by row so only the bad rows are dropped"""
+        try:
+            with conn:
+                for table, table_rows in rows.items():
+                    conn.executemany(_INSERT.format(table=table), table_rows)
+            return
+        except Exception as e:
+            self.logger.error("Error writing journal batch, retrying row by row: %s", e)
+        for table, table_rows in rows.items():
+            for row in table_rows:
+                try:
+                    with conn:
+                        conn.execute(_INSERT.format(table=table), row)
+                except Exception as e:
+                    self.dropped += 1
+                    self.logger.error("Dropped journal row for %s: %s", table, e)
+        
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything recorded so far is committed"""
+        marker = threading.Event()
+        self._queue.put((None, marker), timeout=timeout)
+        return marker.wait(timeout)
+        
+    def close(self, timeout: float = 5.0):
+        """Commit pending rows and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put((None, None), timeout=timeout)
+            self._thread.join(timeout)
+            
+    def query(self, table: str, start: Optional[float] = None, end: Optional[float] = None,
+              bot_id: Optional[str] = None, symbol: Optional[str] = None,
+              limit: Optional[int] = None, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return journal rows filtered by time range, bot and symbol.
+        
+        Rows come back in time order, or in insertion order when paging with
+        after_id.
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown journal table: {table}")
+        clauses, params = [], []
+        for column, value in (('bot_id', bot_id), ('symbol', symbol)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(end)
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        sql = f"SELECT * FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id" if after_id is not None else " ORDER BY ts"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+            
+        rows = []
+        for row in self._reader().execute(sql, params):
+            record = dict(row)
+            if record['data'] is not None:
+                record['data'] = json.loads(record['data'])
+            rows.append(record)
+        return rows
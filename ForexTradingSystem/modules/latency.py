@@ -0,0 +1,149 @@
+import os
+import time
+import threading
+import numpy as np
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+# Segments between the order stages signal -> risk -> submit -> ack -> fill
+SEGMENTS = {
+    'risk_check': ('signal', 'risk'),
+    'queue': ('risk', 'submit'),
+    'bridge': ('submit', 'ack'),
+    'fill': ('ack', 'fill'),
+    'total': ('signal', 'fill')
+}
+
+LATENCY_EDGES = np.geomspace(0.01, 100000.0, 71)  # Milliseconds, ten buckets per decade
+SLIPPAGE_EDGES = np.linspace(-50.0, 50.0, 201)  # Basis points, adverse is positive
+
+
+def order_timeline(stamps: Dict[str, float], side: str, expected_price: Optional[float] = None,
+                   fill_price: Optional[float] = None) -> Dict[str, Any]:
+    """Segment latencies in milliseconds and slippage from monotonic stage stamps"""
+    latency = {
+        segment: (stamps[end] - stamps[start]) * 1000.0
+        for segment, (start, end) in SEGMENTS.items()
+        if stamps.get(start) is not None and stamps.get(end) is not None
+    }
+    slippage = None
+    if expected_price and fill_price:
+        sign = 1.0 if side.lower() in ('buy', 'long') else -1.0
+        slippage = sign * (fill_price - expected_price) / expected_price * 10000.0
+    return {
+        'latency_ms': latency,
+        'expected_price': expected_price,
+        'fill_price': fill_price,
+        'slippage_bps': slippage
+    }
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total')
+    
+    def __init__(self, edges: np.ndarray):
+        self.counts = np.zeros(len(edges) + 1, dtype=np.int64)  # Plus underflow and overflow
+        self.total = 0.0
+
+
+class LatencyTracker:
+    """Rolling per-minute histograms of order latency and slippage.
+    
+    Each recorded order timeline adds its segment latencies and slippage to
+    histograms bucketed by (minute, symbol, bot). A query sums the buckets
+    inside its time window, so it costs the same however many orders went
+    into them. Percentiles are read off the histograms at bucket resolution.
+    """
+    
+    def __init__(self, retention_minutes: Optional[int] = None):
+        self.retention = 60 * (retention_minutes or int(os.getenv('LATENCY_RETENTION_MINUTES', '1440')))
+        self.recent: deque = deque(maxlen=int(os.getenv('LATENCY_RECENT_ORDERS', '1000')))
+        self._buckets: Dict[Tuple[int, str, str], Dict[str, _Histogram]] = {}
+        self._last_fill_id = 0
+        self._lock = threading.Lock()
+        
+    def record(self, symbol: str, bot_id: Optional[str], timeline: Dict[str, Any],
+               ts: Optional[float] = None):
+        """Add one order's timeline, as built by order_timeline()"""
+        ts = time.time() if ts is None else ts
+        minute = int(ts // 60) * 60
+        key = (minute, symbol, bot_id or 'default')
+        metrics = [(segment, ms, LATENCY_EDGES) for segment, ms in timeline['latency_ms'].items()]
+        if timeline.get('slippage_bps') is not None:
+            metrics.append(('slippage_bps', timeline['slippage_bps'], SLIPPAGE_EDGES))
+        with self._lock:
+            bucket = self._buckets.setdefault(key, {})
+            for name, value, edges in metrics:
+                histogram = bucket.get(name)
+                if histogram is None:
+                    histogram = bucket[name] = _Histogram(edges)
+                histogram.counts[np.searchsorted(edges, value, side='right')] += 1
+                histogram.total += value
+            self.recent.append(dict(timeline, symbol=symbol, bot_id=bot_id, ts=ts))
+            cutoff = minute - self.retention
+            if len(self._buckets) > 1 and min(self._buckets)[0] < cutoff:
+                for old in [k for k in self._buckets if k[0] < cutoff]:
+                    del self._buckets[old]
+                    
+    def load_from_journal(self, journal):
+        """Pick up timelines journaled with fills since the last call"""
+        for fill in journal.query('fills', after_id=self._last_fill_id):
+            self._last_fill_id = fill['id']
+            timeline = (fill['data'] or {}).get('timeline')
+            if timeline:
+                self.record(fill['symbol'], fill['bot_id'], timeline, fill['ts'])
+                
+    @staticmethod
+    def _summary(histogram: _Histogram, edges: np.ndarray) -> Dict[str, Any]:
+        count = int(histogram.counts.sum())
+        cumulative = np.cumsum(histogram.counts)
+        # Upper edge of the bucket holding each percentile; the overflow bucket reports the last edge
+        bounds = np.append(edges, edges[-1])
+        percentiles = {
+            f'p{p}': float(bounds[np.searchsorted(cumulative, count * p / 100.0)])
+            for p in (50, 90, 99)
+        }
+        return {
+            'count': count,
+            'mean': histogram.total / count,
+            **percentiles,
+            'buckets': [
+                {'lt': float(bounds[i]) if i < len(edges) else None, 'count': int(c)}
+                for i, c in enumerate(histogram.counts) if c
+            ]
+        }
+        
+    def query(self, symbol: Optional[str] = None, bot_id: Optional[str] = None,
+              start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """Latency per segment and slippage for the orders matching the filters"""
+        merged: Dict[str, _Histogram] = {}
+        with self._lock:
+            for (minute, bucket_symbol, bucket_bot), bucket in self._buckets.items():
+                if ((symbol is not None and bucket_symbol != symbol)
+                        or (bot_id is not None and bucket_bot != bot_id)
+                        or (start is not None and minute + 60 <= start)
+                        or (end is not None and minute >= end)):
+                    continue
+                for name, histogram in bucket.items():
+                    total = merged.get(name)
+                    if total is None:
+                        edges = SLIPPAGE_EDGES if name == 'slippage_bps' else LATENCY_EDGES
+                        total = merged[name] = _Histogram(edges)
+                    total.counts += histogram.counts
+                    total.total += histogram.total
+        slippage = merged.pop('slippage_bps', None)
+        return {
+            'symbol': symbol,
+            'bot_id': bot_id,
+            'start': start,
+            'end': end,
+            'latency_ms': {
+                segment: self._summary(merged[segment], LATENCY_EDGES)
+                for segment in SEGMENTS if segment in merged
+            },
+            'slippage_bps': self._summary(slippage, SLIPPAGE_EDGES) if slippage else None
+        }
+        
+    def recent_orders(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.recent)[-limit:]
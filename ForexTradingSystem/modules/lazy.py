@@ -0,0 +1,45 @@
+import os
+import threading
+
+def is_enabled(name: str, default: bool = True) -> bool:
+    """Read a boolean feature flag such as ENABLE_HEDGING from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class lazy_component:
+    """Build a component on first attribute access, at most once per instance.
+    
+    Works like functools.cached_property but holds a lock while the factory
+    runs, so two threads touching a component at startup cannot build it
+    twice. Once built the value lives in the instance __dict__ and reads cost
+    a plain attribute lookup.
+    """
+    
+    def __init__(self, factory):
+        self.factory = factory
+        self.name = factory.__name__
+        self.__doc__ = factory.__doc__
+        self._lock = threading.RLock()
+        
+    def __set_name__(self, owner, name):
+        self.name = name
+        
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            pass
+        with self._lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.factory(instance)
+        return instance.__dict__[self.name]
+        
+    @staticmethod
+    def is_loaded(instance, name: str) -> bool:
+        """Whether a component has been built without triggering construction"""
+        return name in instance.__dict__
@@ -0,0 +1,238 @@
+import os
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from typing import Dict, List, Optional, Tuple
+
+# Attributes every LogRecord carries; anything else was passed via `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+_formatter = logging.Formatter()
+_lock = threading.Lock()
+_writer: Optional['LogWriter'] = None
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the caller's thread"""
+    
+    def __init__(self, log_queue: queue.Queue, filename: str):
+        super().__init__(log_queue)
+        self.filename = filename
+        self.dropped = 0
+        
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Interpolate now so the queued record holds no caller args or traceback objects;
+        # JSON encoding and file I/O still happen on the writer thread
+        try:
+            message = record.getMessage()
+        except Exception as e:
+            message = f"Unformattable log message {record.msg!r}: {e}"
+        exc_text = record.exc_text
+        if record.exc_info:
+            exc_text = _formatter.formatException(record.exc_info)
+        record = copy.copy(record)
+        record.message = record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+        
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait((self.filename, record))
+        except queue.Full:
+            self.dropped += 1
+
+
+class _RotatingSink:
+    """Append-only JSON-lines file rotated by size and age"""
+    
+    def __init__(self, path: str, max_bytes: int, rotate_seconds: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self._open()
+        
+    def _open(self):
+        self.stream = open(self.path, 'a', encoding='utf-8')
+        self.size = self.stream.tell()
+        self.opened_at = time.time()
+        
+    def _rotate(self):
+        self.stream.close()
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        target = f"{self.path}.{stamp}"
+        suffix = 1
+        while os.path.exists(target):
+            target = f"{self.path}.{stamp}.{suffix}"
+            suffix += 1
+        os.replace(self.path, target)
+        self._open()
+        
+    def write(self, data: str):
+        if self.size and (self.size + len(data) > self.max_bytes
+                          or time.time() - self.opened_at > self.rotate_seconds):
+            self._rotate()
+        self.stream.write(data)
+        self.stream.flush()
+        self.size += len(data)
+        
+    def close(self):
+        self.stream.close()
+
+
+class LogWriter(threading.Thread):
+    """Background thread draining the log queue into per-file batched writes"""
+    
+    def __init__(self, directory: str, max_bytes: int, rotate_seconds: float,
+                 batch_size: int, flush_interval: float, queue_size: int):
+        super().__init__(name='log-writer', daemon=True)
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._sinks: Dict[str, _RotatingSink] = {}
+        
+    def run(self):
+        running = True
+        while running:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            running = self._write_batch(batch)
+        for sink in self._sinks.values():
+            sink.close()
+            
+    def _write_batch(self, batch: List[Tuple]) -> bool:
+        """Write one batch grouped by file; returns False on the stop sentinel"""
+        running = True
+        lines: Dict[str, List[str]] = {}
+        markers = []
+        for filename, item in batch:
+            if item is None:
+                running = False
+            elif isinstance(item, threading.Event):
+                markers.append(item)
+            else:
+                lines.setdefault(filename, []).append(self._format_safely(item))
+        for filename, file_lines in lines.items():
+            try:
+                sink = self._sinks.get(filename)
+                if sink is None:
+                    sink = self._sinks[filename] = _RotatingSink(
+                        os.path.join(self.directory, filename), self.max_bytes, self.rotate_seconds
+                    )
+                sink.write(''.join(file_lines))
+            except OSError:
+                pass  # Never let a full disk take the writer thread down
+        for marker in markers:
+            marker.set()
+        return running
+        
+    def _format_safely(self, record: logging.LogRecord) -> str:
+        # Like logging.Handler.handleError: one bad record must not stop the writer
+        try:
+            return self._format(record)
+        except Exception as e:
+            return json.dumps({
+                'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+                'level': getattr(record, 'levelname', 'ERROR'),
+                'logger': getattr(record, 'name', 'logging'),
+                'message': f"Unformattable log record: {e}"
+            }) + '\n'
+            
+    @staticmethod
+    def _format(record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = _formatter.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str) + '\n'
+        
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far has been written"""
+        marker = threading.Event()
+        self.queue.put((None, marker), timeout=timeout)
+        return marker.wait(timeout)
+        
+    def stop(self, timeout: float = 5.0):
+        try:
+            self.queue.put((None, None), timeout=timeout)
+        except queue.Full:
+            return
+        self.join(timeout)
+
+
+def _get_writer() -> LogWriter:
+    global _writer
+    if _writer is None or not _writer.is_alive():
+        _writer = LogWriter(
+            directory=os.getenv('LOG_DIR', '.'),
+            max_bytes=int(os.getenv('LOG_MAX_BYTES', str(50 * 1024 * 1024))),
+            rotate_seconds=float(os.getenv('LOG_ROTATE_SECONDS', '86400')),
+            batch_size=int(os.getenv('LOG_BATCH_SIZE', '512')),
+            flush_interval=float(os.getenv('LOG_FLUSH_INTERVAL', '0.5')),
+            queue_size=int(os.getenv('LOG_QUEUE_SIZE', '100000'))
+        )
+        _writer.start()
+    return _writer
+
+
+def get_logger(name: str, filename: Optional[str] = None, level: int = logging.INFO) -> logging.Logger:
+    """Return a logger writing JSON lines to `filename` through the shared background writer.
+    
+    Safe to call any number of times; the queue handler is attached only once
+    per logger.
+    """
+    logger = logging.getLogger(name)
+    with _lock:
+        writer = _get_writer()
+        handlers = [h for h in logger.handlers if isinstance(h, _NonBlockingQueueHandler)]
+        if not handlers:
+            logger.addHandler(_NonBlockingQueueHandler(writer.queue, filename or f"{name}.log"))
+        elif handlers[0].queue is not writer.queue:
+            # Writer was restarted (e.g. after fork); repoint the existing handler
+            handlers[0].queue = writer.queue
+        logger.setLevel(level)
+    return logger
+
+
+def flush_logs(timeout: float = 5.0) -> bool:
+    """Wait for all queued records to reach disk"""
+    return _writer.flush(timeout) if _writer is not None and _writer.is_alive() else True
+
+
+def shutdown_logging(timeout: float = 5.0):
+    """Drain the queue and stop the writer thread"""
+    global _writer
+    with _lock:
+        if _writer is not None and _writer.is_alive():
+            _writer.stop(timeout)
+        _writer = None
+
+
+atexit.register(shutdown_logging)
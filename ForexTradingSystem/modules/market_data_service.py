@@ -0,0 +1,407 @@
+import os
+import time
+import fcntl
+import select
+import socket
+import tempfile
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+from .logger import get_logger
+from .shm_ring import BAR_DTYPE, RingReader
+from .bar_aggregator import timeframe_seconds
+
+QUOTE_DTYPE = np.dtype([
+    ('seq', 'u8'), ('ts', 'f8'), ('bid', 'f8'), ('ask', 'f8'), ('last', 'f8'), ('volume', 'f8')
+])
+
+_MAGIC = 0x4D4B5444415441  # "MKTDATA"
+_HEADER = 64
+# Header words: magic, max symbols, bar capacity, symbol count, change sequence, bar write sequence
+_MAX_SYMBOLS, _BAR_CAPACITY, _SYMBOL_COUNT, _CHANGE_SEQ, _BAR_SEQ = 1, 2, 3, 4, 5
+
+
+def default_segment_path() -> str:
+    """Segment location: MARKET_DATA_SEGMENT, else RAM-backed /dev/shm when available"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.getenv('MARKET_DATA_SEGMENT', os.path.join(base, 'forex_market_data.seg'))
+
+
+class MarketDataSegment:
+    """Memory-mapped quotes table and bar ring shared by one writer and many readers.
+    
+    Quotes use a per-symbol sequence lock: the writer makes the sequence odd,
+    updates the fields and makes it even again, and readers retry if the
+    sequence moved while they copied. Readers give up after a bounded
+    number of retries, so a producer that died mid-update cannot hang
+    them. Bars are appended to a ring with the
+    same publish-after-write protocol as ShmRing, so RingReader works on it.
+    """
+    
+    def __init__(self, path: str, writable: bool = False, max_symbols: int = 256,
+                 bar_capacity: int = 65536):
+        self.path = path
+        self.writable = writable
+        self.dtype = BAR_DTYPE
+        if writable and not self._compatible(path, max_symbols, bar_capacity):
+            # Build the new file aside so readers of an old segment never see it truncated
+            size = (_HEADER + max_symbols * (32 + QUOTE_DTYPE.itemsize)
+                    + bar_capacity * BAR_DTYPE.itemsize)
+            with open(path + '.tmp', 'wb') as f:
+                f.truncate(size)
+            header = np.memmap(path + '.tmp', dtype=np.uint64, mode='r+', shape=(8,))
+            header[:] = (_MAGIC, max_symbols, bar_capacity, 0, 0, 0, 0, 0)
+            header.flush()
+            del header
+            os.replace(path + '.tmp', path)
+        mode = 'r+' if writable else 'r'
+        
+        # A restarted producer keeps the existing symbol table and sequences
+        self._header = np.memmap(path, dtype=np.uint64, mode=mode, shape=(8,))
+        if int(self._header[0]) != _MAGIC:
+            raise ValueError(f"{path} is not a market data segment")
+        self.max_symbols = int(self._header[_MAX_SYMBOLS])
+        self.capacity = int(self._header[_BAR_CAPACITY])
+        
+        offset = _HEADER
+        self._names = np.memmap(path, dtype='S32', mode=mode, offset=offset, shape=(self.max_symbols,))
+        offset += self._names.nbytes
+        self.quotes = np.memmap(path, dtype=QUOTE_DTYPE, mode=mode, offset=offset,
+                                shape=(self.max_symbols,))
+        offset += self.quotes.nbytes
+        self._slots = np.memmap(path, dtype=BAR_DTYPE, mode=mode, offset=offset,
+                                shape=(self.capacity,))
+        self._symbol_ids: Dict[str, int] = {}
+        
+    @staticmethod
+    def _compatible(path: str, max_symbols: int, bar_capacity: int) -> bool:
+        try:
+            header = np.fromfile(path, dtype=np.uint64, count=3)
+        except OSError:
+            return False
+        return len(header) == 3 and tuple(int(v) for v in header) == (_MAGIC, max_symbols, bar_capacity)
+        
+    @property
+    def write_seq(self) -> int:
+        return int(self._header[_BAR_SEQ])
+        
+    @property
+    def change_seq(self) -> int:
+        """Bumped on every publish; cheap way to check for updates"""
+        return int(self._header[_CHANGE_SEQ])
+        
+    def symbols(self) -> List[str]:
+        count = int(self._header[_SYMBOL_COUNT])
+        return [name.decode() for name in self._names[:count]]
+        
+    def symbol_id(self, symbol: str) -> Optional[int]:
+        index = self._symbol_ids.get(symbol)
+        if index is None:
+            self._symbol_ids = {s: i for i, s in enumerate(self.symbols())}
+            index = self._symbol_ids.get(symbol)
+        return index
+        
+    def _register(self, symbol: str) -> int:
+        index = self.symbol_id(symbol)
+        if index is None:
+            index = int(self._header[_SYMBOL_COUNT])
+            if index >= self.max_symbols:
+                raise ValueError(f"Market data segment is full ({self.max_symbols} symbols)")
+            self._names[index] = symbol.encode()
+            self._header[_SYMBOL_COUNT] = index + 1
+            self._symbol_ids[symbol] = index
+        return index
+        
+    def write_quote(self, symbol: str, ts: float, bid: float, ask: float, last: float, volume: float):
+        index = self._register(symbol)
+        seq = int(self.quotes['seq'][index])
+        seq += seq % 2  # A previous producer may have died mid-update
+        self.quotes['seq'][index] = seq + 1
+        self.quotes['ts'][index] = ts
+        self.quotes['bid'][index] = bid
+        self.quotes['ask'][index] = ask
+        self.quotes['last'][index] = last
+        self.quotes['volume'][index] = volume
+        self.quotes['seq'][index] = seq + 2
+        
+    def write_bars(self, records: np.ndarray):
+        records = np.asarray(records, dtype=BAR_DTYPE)[-self.capacity:]
+        seq = self.write_seq
+        self._slots[(seq + np.arange(len(records))) % self.capacity] = records
+        self._header[_BAR_SEQ] = seq + len(records)
+        
+    def publish(self):
+        """Mark everything written so far as one change"""
+        self._header[_CHANGE_SEQ] = self.change_seq + 1
+        
+    def read_quote(self, symbol: str, retries: int = 10000) -> Optional[Dict[str, float]]:
+        """Consistent copy of a symbol's quote; None if unknown or no stable copy was seen"""
+        index = self.symbol_id(symbol)
+        if index is None:
+            return None
+        for _ in range(retries):
+            before = int(self.quotes['seq'][index])
+            if before % 2:
+                continue  # Writer is mid-update
+            quote = self.quotes[index].copy()
+            if int(self.quotes['seq'][index]) == before:
+                break
+        else:
+            return None
+        return {'symbol': symbol, 'ts': float(quote['ts']), 'bid': float(quote['bid']),
+                'ask': float(quote['ask']), 'last': float(quote['last']),
+                'volume': float(quote['volume'])}
+                
+    def reader(self, from_start: bool = False) -> RingReader:
+        seq = self.write_seq
+        return RingReader(self, max(0, seq - self.capacity) if from_start else seq)
+        
+    def flush(self):
+        if self.writable:
+            for array in (self._header, self._names, self.quotes, self._slots):
+                array.flush()
+
+
+class _Notifier:
+    """Wakes subscribed consumers through one Unix datagram socket each"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        
+    def notify(self):
+        for name in os.listdir(self.directory):
+            address = os.path.join(self.directory, name)
+            try:
+                self._socket.sendto(b'\x01', address)
+            except BlockingIOError:
+                pass  # Consumer already has a wake-up pending
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(address)  # Consumer exited without unsubscribing
+                except OSError:
+                    pass
+
+
+class MarketDataService:
+    """The single upstream poller; writes quotes and closed bars to the segment.
+    
+    An exclusive lock next to the segment guarantees one producer per host,
+    however many TradingSystem or APIServer processes read from it. Every
+    request spends its exchange weight from a token bucket
+    (MARKET_DATA_WEIGHT_PER_MINUTE), and candles are only fetched for a
+    symbol once its next bar has closed.
+    """
+    
+    def __init__(self, path: Optional[str] = None, symbols: Optional[List[str]] = None,
+                 exchange=None):
+        self.logger = self._setup_logger()
+        self.path = path or default_segment_path()
+        self.symbols = symbols or os.getenv('MARKET_DATA_SYMBOLS', 'BTC/USDT').split(',')
+        self.timeframe = os.getenv('MARKET_DATA_TIMEFRAME', '1m')
+        self.interval = float(os.getenv('MARKET_DATA_INTERVAL', '1'))
+        self.exchange = exchange or self._initialize_exchange()
+        from .poll_scheduler import TokenBucket, binance_ticker_weight  # Imports ccxt; producer only
+        weight_per_minute = float(os.getenv('MARKET_DATA_WEIGHT_PER_MINUTE', '1200'))
+        self.bucket = TokenBucket(weight_per_minute / 60.0, weight_per_minute / 6.0)
+        self.ticker_weight = binance_ticker_weight
+        self.ohlcv_weight = 2
+        self.bar_seconds = timeframe_seconds(self.timeframe)
+        self._lock_file = open(self.path + '.lock', 'w')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise RuntimeError(f"Another market data producer owns {self.path}")
+        self.segment = MarketDataSegment(
+            self.path, writable=True,
+            max_symbols=int(os.getenv('MARKET_DATA_MAX_SYMBOLS', '256')),
+            bar_capacity=int(os.getenv('MARKET_DATA_BAR_CAPACITY', '65536'))
+        )
+        self.notifier = _Notifier(self.path + '.subs')
+        self._last_bar: Dict[str, float] = {}
+        # After a restart, resume from the bars already in the segment
+        for record in self.segment.reader(from_start=True).read():
+            symbol = record['symbol'].decode()
+            self._last_bar[symbol] = max(self._last_bar.get(symbol, 0.0), float(record['ts']))
+            
+    def _initialize_exchange(self):
+        """Initialize exchange connection with API credentials"""
+        import ccxt
+        return ccxt.binance({
+            'apiKey': os.getenv('EXCHANGE_API_KEY'),
+            'secret': os.getenv('EXCHANGE_API_SECRET'),
+            'enableRateLimit': True
+        })
+        
+    def _setup_logger(self):
+        return get_logger('market_data', 'market_data.log')
+        
+    def poll_once(self) -> bool:
+        """Fetch quotes and new closed bars once; returns True if anything changed"""
+        changed = False
+        now = time.time()
+        tickers = {}
+        if self.bucket.try_acquire(self.ticker_weight(len(self.symbols))):
+            tickers = self.exchange.fetch_tickers(self.symbols)
+        for symbol, ticker in tickers.items():
+            self.segment.write_quote(
+                symbol, (ticker.get('timestamp') or time.time() * 1000) / 1000,
+                ticker.get('bid') or np.nan, ticker.get('ask') or np.nan,
+                ticker.get('last') or np.nan, ticker.get('baseVolume') or 0.0
+            )
+            changed = True
+            
+        for symbol in self.symbols:
+            # Nothing new until the bar after the last published one has closed
+            last = self._last_bar.get(symbol, 0.0)
+            if now < last + 2 * self.bar_seconds or not self.bucket.try_acquire(self.ohlcv_weight):
+                continue
+            # The last candle is still forming; only closed bars are published
+            candles = self.exchange.fetch_ohlcv(symbol, self.timeframe, limit=3)[:-1]
+            new = [(c[0] / 1000, symbol.encode(), c[1], c[2], c[3], c[4], c[5])
+                   for c in candles if c[0] / 1000 > last]
+            if new:
+                self.segment.write_bars(np.array(new, dtype=BAR_DTYPE))
+                self._last_bar[symbol] = new[-1][0]
+                changed = True
+                
+        if changed:
+            self.segment.publish()
+            self.notifier.notify()
+        return changed
+        
+    def run(self):
+        """Poll upstream until interrupted"""
+        self.logger.info("Market data producer started for %s at %s", self.symbols, self.path)
+        while True:
+            started = time.monotonic()
+            try:
+                self.poll_once()
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                self.logger.error("Market data poll error: %s", e)
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+            
+    def close(self):
+        self.segment.flush()
+        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+
+
+def producer_running(path: Optional[str] = None) -> bool:
+    """Whether a MarketDataService currently holds the segment lock"""
+    path = path or default_segment_path()
+    if not os.path.exists(path) or not os.path.exists(path + '.lock'):
+        return False
+    with open(path + '.lock') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return False
+
+
+def connect_data_feed():
+    """Attach to the shared producer if one is running, else poll the exchange directly"""
+    if producer_running():
+        return MarketDataClient()
+    from .data_feed import DataFeed
+    return DataFeed()
+
+
+class MarketDataClient:
+    """Zero-copy consumer of the shared segment with change notifications.
+    
+    Offers the DataFeed get_data() interface, so TradingSystem and APIServer
+    can use it in place of their own exchange polling.
+    """
+    
+    def __init__(self, path: Optional[str] = None, symbol: Optional[str] = None):
+        self.path = path or default_segment_path()
+        self.symbol = symbol or os.getenv('MARKET_DATA_SYMBOLS', 'BTC/USDT').split(',')[0]
+        self.segment = MarketDataSegment(self.path)
+        self.bars = self.segment.reader(from_start=True)
+        self.history_by_symbol: Dict[str, pd.DataFrame] = {}
+        self.max_bars = int(os.getenv('MARKET_DATA_CLIENT_BARS', '1000'))
+        self._seen = self.segment.change_seq
+        self._socket = None
+        
+    def subscribe(self):
+        """Register for wake-ups; wait() falls back to polling without this"""
+        if self._socket is None:
+            directory = self.path + '.subs'
+            os.makedirs(directory, exist_ok=True)
+            self._address = os.path.join(directory, f'{os.getpid()}-{id(self)}.sock')
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.bind(self._address)
+            self._socket.setblocking(False)
+            
+    def unsubscribe(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            try:
+                os.unlink(self._address)
+            except OSError:
+                pass
+                
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the producer publishes a change; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.segment.change_seq == self._seen:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            if self._socket is not None:
+                ready, _, _ = select.select([self._socket], [], [], remaining)
+                while ready:
+                    try:
+                        self._socket.recv(64)
+                    except BlockingIOError:
+                        break
+            else:
+                time.sleep(0.01 if remaining is None else min(0.01, remaining))
+        self._seen = self.segment.change_seq
+        return True
+        
+    def get_quote(self, symbol: Optional[str] = None) -> Optional[Dict[str, float]]:
+        return self.segment.read_quote(symbol or self.symbol)
+        
+    def _update_bars(self):
+        records = self.bars.read()
+        if not len(records):
+            return
+        frame = pd.DataFrame.from_records(records)
+        frame['symbol'] = frame['symbol'].str.decode('utf-8')
+        frame['timestamp'] = pd.to_datetime(frame.pop('ts'), unit='s')
+        for symbol, bars in frame.groupby('symbol'):
+            bars = bars.drop(columns='symbol')
+            history = self.history_by_symbol.get(symbol)
+            if history is not None:
+                bars = pd.concat([history, bars], ignore_index=True)
+            self.history_by_symbol[symbol] = bars.iloc[-self.max_bars:].reset_index(drop=True)
+            
+    @property
+    def historical_data(self) -> Optional[pd.DataFrame]:
+        """Rolling bar history of the feed's own symbol, like DataFeed.historical_data"""
+        return self.history_by_symbol.get(self.symbol)
+            
+    def get_data(self, symbol: Optional[str] = None) -> pd.DataFrame:
+        """Recent closed bars for a symbol, like DataFeed.get_data"""
+        self._update_bars()
+        columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        return self.history_by_symbol.get(symbol or self.symbol, pd.DataFrame(columns=columns))[columns]
+
+
+if __name__ == '__main__':
+    service = MarketDataService()
+    try:
+        service.run()
+    finally:
+        service.close()
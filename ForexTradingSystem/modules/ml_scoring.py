@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import queue
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from .logger import get_logger
+from .indicators import sma, ema, rsi, atr
+
+# Same order as PrepareFeatures() in PUR_EA, so an EA can post its array as is
+FEATURES = ('rsi', 'macd', 'atr', 'ma_diff', 'price_change', 'spread', 'volume')
+
+
+def bar_features(frame: pd.DataFrame, quote: Optional[Dict[str, float]] = None,
+                 params: Optional[Dict[str, Dict[str, int]]] = None) -> np.ndarray:
+    """Feature vector for the last bar of an OHLCV frame.
+    
+    params takes SignalGenerator.indicators' shape; the MA difference uses
+    the EA's ShortMAPeriod/LongMAPeriod. The spread features come from a
+    bid/ask quote when one is given.
+    """
+    params = params or {}
+    close = frame['close'].to_numpy(dtype=float)
+    high = frame['high'].to_numpy(dtype=float)
+    low = frame['low'].to_numpy(dtype=float)
+    macd = params.get('macd', {})
+    rsi_value = rsi(close, params.get('rsi', {}).get('length', 14))[-1]
+    macd_value = (ema(close, macd.get('fast', 12)) - ema(close, macd.get('slow', 26)))[-1]
+    atr_value = atr(high, low, close, params.get('atr', {}).get('length', 14))[-1]
+    ma = params.get('ma', {})
+    ma_diff = (sma(close, ma.get('short', 10)) - sma(close, ma.get('long', 30)))[-1]
+    bid, ask = (quote or {}).get('bid'), (quote or {}).get('ask')
+    volume = float(frame['volume'].iloc[-1]) if 'volume' in frame else 0.0
+    return np.array([
+        rsi_value, macd_value, atr_value, ma_diff,
+        (bid - ask) / ask if bid and ask else 0.0,
+        ask - bid if bid and ask else 0.0,
+        volume
+    ])
+
+
+class FeatureCache:
+    """Latest feature vector per (symbol, timeframe), recomputed once per closed bar"""
+    
+    def __init__(self, params: Optional[Dict[str, Dict[str, int]]] = None):
+        self.params = params
+        self._entries: Dict[Tuple[str, str], Tuple[Any, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        
+    def update(self, symbol: str, timeframe: str, history: pd.DataFrame,
+               quote: Optional[Dict[str, float]] = None) -> Optional[np.ndarray]:
+        """Features for the newest bar of `history`; cached until a newer bar arrives"""
+        if history is None or history.empty:
+            return None
+        stamp = history['timestamp'].iloc[-1] if 'timestamp' in history else len(history)
+        with self._lock:
+            cached = self._entries.get((symbol, timeframe))
+        if cached is not None and cached[0] == stamp and quote is None:
+            return cached[1]
+        features = bar_features(history, quote, self.params)
+        if np.isnan(features).any():
+            return None  # Indicators still warming up
+        with self._lock:
+            self._entries[(symbol, timeframe)] = (stamp, features)
+        return features
+        
+    def subscribe(self, aggregator, timeframe: str, symbol: Optional[str] = None):
+        """Keep features current as the aggregator closes bars"""
+        def on_bar(bar_symbol: str, bar_timeframe: str, bar: Dict[str, Any]):
+            self.update(bar_symbol, bar_timeframe, aggregator.history(bar_symbol, bar_timeframe))
+        aggregator.subscribe(timeframe, on_bar, symbol)
+        return on_bar
+        
+    def get(self, symbol: str, timeframe: str) -> Optional[np.ndarray]:
+        with self._lock:
+            cached = self._entries.get((symbol, timeframe))
+        return None if cached is None else cached[1]
+
+
+class StandInModel:
+    """Deterministic rule model with the ML interface, for tests and dry runs.
+    
+    Scores in [-1, 1] like the EA's mlPrediction: positive favours a buy.
+    RSI distance from 50, and MACD and the MA difference in units of ATR,
+    are combined and squashed with tanh.
+    """
+    
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        features = np.atleast_2d(features)
+        scale = np.where(features[:, 2] > 0, features[:, 2], 1.0)
+        raw = (50.0 - features[:, 0]) / 25.0 + features[:, 1] / scale + 0.5 * features[:, 3] / scale
+        return np.tanh(raw)
+
+
+class LinearModel:
+    """Standardized linear model squashed to [-1, 1], loaded from JSON"""
+    
+    def __init__(self, weights: Sequence[float], bias: float = 0.0,
+                 mean: Optional[Sequence[float]] = None, scale: Optional[Sequence[float]] = None):
+        self.weights = np.asarray(weights, dtype=float)
+        self.bias = float(bias)
+        self.mean = np.zeros_like(self.weights) if mean is None else np.asarray(mean, dtype=float)
+        self.scale = np.ones_like(self.weights) if scale is None else np.asarray(scale, dtype=float)
+        
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return np.tanh(((np.atleast_2d(features) - self.mean) / self.scale) @ self.weights + self.bias)
+
+
+def load_model(path: Optional[str] = None):
+    """Model for MLModelPath: JSON weights, a pickled estimator with predict(), or the stand-in"""
+    path = path if path is not None else os.getenv('ML_MODEL_PATH', '')
+    if not path or path == 'stand-in':
+        return StandInModel()
+    if path.endswith('.json'):
+        with open(path) as f:
+            return LinearModel(**json.load(f))
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class ScoringService:
+    """Scores feature vectors on one model, batching concurrent requests.
+    
+    Callers block on score() while a single worker thread drains the
+    queue: it takes whatever arrived, waits at most ML_MAX_WAIT_MS for
+    more up to ML_MAX_BATCH, and runs one predict() over the stacked
+    rows. The model is loaded once, and concurrent signals from the
+    trading loop and from EAs share one model call.
+    """
+    
+    def __init__(self, model=None, max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        self.logger = self._setup_logger()
+        self.model = model if model is not None else load_model()
+        self.max_batch = max_batch or int(os.getenv('ML_MAX_BATCH', '64'))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(os.getenv('ML_MAX_WAIT_MS', '2'))) / 1000.0
+        self.batches = 0
+        self.scored = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='ml-scoring', daemon=True)
+        self._thread.start()
+        
+    def _setup_logger(self):
+        return get_logger('ml_scoring', 'ml_scoring.log')
+        
+    @staticmethod
+    def _validate(features: Sequence[float]) -> np.ndarray:
+        # A malformed row would fail np.vstack for every request batched with it
+        row = np.asarray(features, dtype=float)
+        if row.shape != (len(FEATURES),):
+            raise ValueError(f"Expected {len(FEATURES)} features {FEATURES}, got shape {row.shape}")
+        return row
+        
+    def submit(self, features: Sequence[float]) -> Future:
+        row = self._validate(features)
+        future: Future = Future()
+        self._queue.put((row, future))
+        return future
+        
+    def score(self, features: Sequence[float], timeout: Optional[float] = 1.0) -> float:
+        return self.submit(features).result(timeout)
+        
+    def score_many(self, rows: Sequence[Sequence[float]], timeout: Optional[float] = 1.0) -> List[float]:
+        rows = [self._validate(row) for row in rows]  # Reject the request before queueing any of it
+        futures = [self.submit(row) for row in rows]
+        return [future.result(timeout) for future in futures]
+        
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                return
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # Stop after this batch
+                    break
+                batch.append(item)
+            self._predict(batch)
+            
+    def _predict(self, batch: List[Tuple[np.ndarray, Future]]):
+        try:
+            scores = np.asarray(self.model.predict(np.vstack([features for features, _ in batch])), dtype=float)
+            for (_, future), value in zip(batch, scores.ravel()):
+                future.set_result(float(value))
+        except Exception as e:
+            self.logger.error("Error scoring batch of %d: %s", len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        self.batches += 1
+        self.scored += len(batch)
+        
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'model': type(self.model).__name__,
+            'batches': self.batches,
+            'scored': self.scored,
+            'mean_batch_size': self.scored / self.batches if self.batches else 0.0,
+            'queued': self._queue.qsize()
+        }
+        
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
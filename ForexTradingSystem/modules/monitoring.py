@@ -1,21 +1,26 @@
 import os
-import dash
-from dash import dcc, html
-import plotly.express as px
 import pandas as pd
-import logging
 from datetime import datetime
 
+from .lazy import lazy_component
+from .logger import get_logger
+
 class Monitoring:
     def __init__(self):
         self.logger = self._setup_logger()
-        self.app = dash.Dash(__name__)
         self.trade_history = pd.DataFrame(columns=[
             'timestamp', 'pair', 'side', 'price', 'quantity', 'pnl'
         ])
         
+    @lazy_component
+    def app(self):
+        """Dash app, imported and built only when the dashboard is first served"""
+        import dash
+        from dash import dcc, html
+        app = dash.Dash(__name__)
+        
         # Set initial empty layout
-        self.app.layout = html.Div([
+        app.layout = html.Div([
             html.H1('Trading System Dashboard - Loading...'),
             dcc.Interval(
                 id='interval-component',
@@ -23,16 +28,28 @@ class Monitoring:
                 n_intervals=0
             )
         ])
+        return app
         
     def _setup_logger(self):
         """Configure monitoring logger"""
-        logger = logging.getLogger('monitoring')
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('monitoring.log')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('monitoring', 'monitoring.log')
+        
+    def load_trade_history(self, journal, since: float = None):
+        """Rebuild trade history from the persistent trade journal"""
+        try:
+            fills = journal.query('fills', start=since)
+            if fills:
+                self.trade_history = pd.DataFrame([{
+                    'timestamp': pd.to_datetime(f['ts'], unit='s'),
+                    'pair': f['symbol'],
+                    'side': f['side'],
+                    'price': f['price'],
+                    'quantity': f['volume'],
+                    'pnl': 0.0
+                } for f in fills])
+                self._update_dashboard()
+        except Exception as e:
+            self.logger.error("Error loading trade history: %s", e)
         
     def add_trade(self, trade_data: dict):
         """Add trade to history and update dashboard"""
@@ -41,7 +58,7 @@ class Monitoring:
             self.trade_history = pd.concat([self.trade_history, new_trade], ignore_index=True)
             self._update_dashboard()
         except Exception as e:
-            self.logger.error(f"Error adding trade: {e}")
+            self.logger.error("Error adding trade: %s", e)
             
     def _update_dashboard(self):
         """Update dashboard visualizations"""
@@ -49,6 +66,11 @@ class Monitoring:
             # Create profit/loss chart
             self.trade_history['cumulative_pnl'] = self.trade_history['pnl'].cumsum()
             
+            if not lazy_component.is_loaded(self, 'app'):
+                return  # Charts are rendered when the dashboard starts
+                
+            from dash import dcc, html
+            import plotly.express as px
             self.app.layout = html.Div([
                 html.H1('Trading System Dashboard'),
                 
@@ -82,11 +104,14 @@ class Monitoring:
             ])
             
         except Exception as e:
-            self.logger.error(f"Error updating dashboard: {e}")
+            self.logger.error("Error updating dashboard: %s", e)
             
     def run(self):
         """Run the monitoring dashboard"""
         try:
-            self.app.run_server(host='0.0.0.0', port=int(os.getenv('API_PORT', 8051)))
+            app = self.app
+            if len(self.trade_history):
+                self._update_dashboard()  # Render trades recorded before the app existed
+            app.run_server(host='0.0.0.0', port=int(os.getenv('API_PORT', 8051)))
         except Exception as e:
-            self.logger.error(f"Error running monitoring dashboard: {e}")
+            self.logger.error("Error running monitoring dashboard: %s", e)
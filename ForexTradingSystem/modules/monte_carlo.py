@@ -0,0 +1,150 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+
+from .logger import get_logger
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _simulate_chunk(r_multiples: np.ndarray, paths: int, horizon: int, method: str,
+                    seed: np.random.SeedSequence, risk_per_trade: float, max_position_size: float,
+                    daily_loss_limit: float, trades_per_day: float, initial_equity: float,
+                    ruin_equity: float) -> Dict[str, np.ndarray]:
+    """Simulate one chunk of equity paths; runs in a worker process"""
+    rng = np.random.default_rng(seed)
+    if method == 'permutation':
+        sample = rng.permuted(np.broadcast_to(r_multiples, (paths, len(r_multiples))), axis=1)
+    else:
+        sample = r_multiples[rng.integers(0, len(r_multiples), (paths, horizon))]
+        
+    # Risking a fraction of equity per trade, and never more than the position is worth
+    returns = np.maximum(sample * risk_per_trade, -max_position_size)
+    equity = initial_equity * np.cumprod(1.0 + returns, axis=1)
+    previous = np.concatenate((np.full((paths, 1), initial_equity), equity[:, :-1]), axis=1)
+    peak = np.maximum.accumulate(previous, axis=1)
+    drawdown = ((peak - equity) / peak).max(axis=1)
+    
+    # Loss since the start of each trading day, against the absolute daily limit
+    per_day = max(1, int(round(trades_per_day)))
+    days = -(-sample.shape[1] // per_day)
+    pnl = np.zeros((paths, days * per_day))
+    pnl[:, :sample.shape[1]] = equity - previous
+    intraday = np.cumsum(pnl.reshape(paths, days, per_day), axis=2).reshape(paths, -1)
+    stopped = intraday <= -daily_loss_limit
+    first = stopped.argmax(axis=1)
+    time_to_stop = np.where(stopped.any(axis=1), (first + 1) / trades_per_day, np.nan)
+    
+    return {
+        'max_drawdown': drawdown,
+        'ruined': equity.min(axis=1) <= ruin_equity,
+        'final_equity': equity[:, -1],
+        'days_to_daily_stop': time_to_stop
+    }
+
+
+class MonteCarloRisk:
+    """Monte Carlo drawdown and risk-of-ruin analysis of a trade PnL sequence.
+    
+    Trade PnL is normalized to R-multiples (profit per unit of risk), so the
+    same history can be replayed under candidate RISK_PER_TRADE and
+    MAX_POSITION_SIZE settings. Paths are bootstrapped (drawn with
+    replacement) or permuted (reordered), simulated as whole NumPy arrays
+    in fixed-size chunks, and the chunks are spread across processes. Each
+    chunk has its own seed, so results do not depend on the worker count.
+    """
+    
+    def __init__(self, trade_pnl: Sequence[float], risk_unit: Optional[float] = None,
+                 trades_per_day: Optional[float] = None):
+        self.logger = self._setup_logger()
+        pnl = np.asarray(trade_pnl, dtype=float)
+        if not len(pnl):
+            raise ValueError("No trades to simulate")
+        losses = pnl[pnl < 0]
+        # Without a recorded risk per trade, the average loss stands in for 1R
+        self.risk_unit = risk_unit or (float(-losses.mean()) if len(losses) else float(np.abs(pnl).mean()))
+        self.r_multiples = pnl / self.risk_unit
+        self.trades_per_day = trades_per_day or float(os.getenv('MC_TRADES_PER_DAY', '10'))
+        self.paths = int(os.getenv('MC_PATHS', '20000'))
+        self.chunk_size = int(os.getenv('MC_CHUNK_SIZE', '2000'))
+        self.workers = int(os.getenv('MC_WORKERS', str(os.cpu_count() or 1)))
+        
+    def _setup_logger(self):
+        return get_logger('monte_carlo', 'monte_carlo.log')
+        
+    @classmethod
+    def from_journal(cls, journal, bot_id: Optional[str] = None, **kwargs) -> 'MonteCarloRisk':
+        """Use the realized PnL rows of a TradeJournal"""
+        rows = journal.query('pnl', bot_id=bot_id)
+        if 'trades_per_day' not in kwargs and len(rows) > 1:
+            span_days = (rows[-1]['ts'] - rows[0]['ts']) / 86400
+            if span_days > 0:
+                kwargs['trades_per_day'] = len(rows) / span_days
+        return cls([row['amount'] for row in rows], **kwargs)
+        
+    def run(self, risk_per_trade: Optional[float] = None, max_position_size: Optional[float] = None,
+            daily_loss_limit: Optional[float] = None, initial_equity: float = 10000.0,
+            paths: Optional[int] = None, horizon: Optional[int] = None, method: str = 'bootstrap',
+            ruin_level: Optional[float] = None, seed: int = 0,
+            workers: Optional[int] = None) -> Dict[str, Any]:
+        """Simulate paths under one sizing setting and summarize their distribution.
+        
+        Sizing and the daily loss limit default to RISK_PER_TRADE,
+        MAX_POSITION_SIZE and MAX_DAILY_LOSS. A path is ruined once equity
+        falls to ruin_level of the starting equity.
+        """
+        if method not in ('bootstrap', 'permutation'):
+            raise ValueError(f"Unknown resampling method: {method}")
+        risk_per_trade = float(risk_per_trade if risk_per_trade is not None else os.getenv('RISK_PER_TRADE', '0.015'))
+        max_position_size = float(max_position_size if max_position_size is not None
+                                  else os.getenv('MAX_POSITION_SIZE', '0.15'))
+        daily_loss_limit = float(daily_loss_limit if daily_loss_limit is not None
+                                 else os.getenv('MAX_DAILY_LOSS', '300'))
+        ruin_level = float(ruin_level if ruin_level is not None else os.getenv('MC_RUIN_LEVEL', '0.5'))
+        paths = paths or self.paths
+        horizon = len(self.r_multiples) if method == 'permutation' else (horizon or len(self.r_multiples))
+        workers = workers or self.workers
+        
+        sizes = [min(self.chunk_size, paths - start) for start in range(0, paths, self.chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        common = (risk_per_trade, max_position_size, daily_loss_limit, self.trades_per_day,
+                  initial_equity, initial_equity * ruin_level)
+        jobs = [(self.r_multiples, size, horizon, method, s) + common for size, s in zip(sizes, seeds)]
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                chunks = list(pool.map(_simulate_chunk, *zip(*jobs)))
+        else:
+            chunks = [_simulate_chunk(*job) for job in jobs]
+        result = {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]}
+        
+        drawdown = result['max_drawdown']
+        stop = result['days_to_daily_stop']
+        hit = ~np.isnan(stop)
+        summary = {
+            'paths': paths,
+            'horizon': horizon,
+            'method': method,
+            'risk_per_trade': risk_per_trade,
+            'max_position_size': max_position_size,
+            'daily_loss_limit': daily_loss_limit,
+            'risk_of_ruin': float(result['ruined'].mean()),
+            'max_drawdown': {
+                'mean': float(drawdown.mean()),
+                **{f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(drawdown, PERCENTILES))}
+            },
+            'final_equity': {
+                f'p{p}': float(v) for p, v in zip((5, 50, 95), np.percentile(result['final_equity'], (5, 50, 95)))
+            },
+            'daily_stop_probability': float(hit.mean()),
+            'days_to_daily_stop': {
+                f'p{p}': float(v) for p, v in zip((5, 50, 95), np.percentile(stop[hit], (5, 50, 95)))
+            } if hit.any() else None
+        }
+        self.logger.info("Monte Carlo %s: ruin %.4f, median drawdown %.4f",
+                         method, summary['risk_of_ruin'], summary['max_drawdown']['p50'])
+        return summary
+        
+    def sweep(self, candidates: Iterable[Dict[str, float]], **kwargs) -> List[Dict[str, Any]]:
+        """Run every candidate sizing setting with the same seed, for a like-for-like comparison"""
+        return [self.run(**dict(kwargs, **candidate)) for candidate in candidates]
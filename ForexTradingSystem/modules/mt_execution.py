@@ -1,9 +1,12 @@
 import requests
 import json
 import time
-import logging
 from typing import Dict, Optional
 
+from .logger import get_logger
+from .latency import order_timeline
+from .risk_management import REJECT_REASONS
+
 class MTExecution:
     def __init__(self, api_url: str, api_key: str):
         self.api_url = api_url
@@ -14,15 +17,18 @@ class MTExecution:
             'Content-Type': 'application/json'
         })
         self.logger = self._setup_logger()
+        self.risk_manager = None  # Pre-trade gate, set by main system
+        self.journal = None  # Trade journal, set by main system
+        self.performance = None  # Local performance tracker, set by main system
+        self.fill_sink = None  # Publishes fills to other processes, set by the pipeline
+        self.indicators = None  # Local indicator cache, set by main system
+        self.state = None  # Local order/position state, set by main system
+        self.monitoring = None  # Dashboard, set by main system when ENABLE_MONITORING is on
+        self.latency = None  # In-process latency histograms, optional
+        self.clock = time.time  # Timestamps for journal and performance; virtual in replay
         
     def _setup_logger(self):
-        logger = logging.getLogger('mt_execution')
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('mt_execution.log')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('mt_execution', 'mt_execution.log')
         
     def place_order(self, symbol: str, order_type: str, volume: float, 
                    price: Optional[float] = None, stop_loss: Optional[float] = None,
@@ -49,7 +55,7 @@ class MTExecution:
             return response.json()
             
         except Exception as e:
-            self.logger.error(f"Error placing order: {e}")
+            self.logger.error("Error placing order: %s", e)
             raise
             
     def close_order(self, ticket: int) -> Dict:
@@ -59,9 +65,11 @@ class MTExecution:
                 f'{self.api_url}/order/{ticket}'
             )
             response.raise_for_status()
+            if self.state is not None:
+                self.state.on_close(ticket)
             return response.json()
         except Exception as e:
-            self.logger.error(f"Error closing order: {e}")
+            self.logger.error("Error closing order: %s", e)
             raise
             
     def get_account_info(self) -> Dict:
@@ -71,7 +79,7 @@ class MTExecution:
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            self.logger.error(f"Error getting account info: {e}")
+            self.logger.error("Error getting account info: %s", e)
             raise
             
     def get_positions(self) -> Dict:
@@ -81,7 +89,7 @@ class MTExecution:
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            self.logger.error(f"Error getting positions: {e}")
+            self.logger.error("Error getting positions: %s", e)
             raise
             
     def modify_order(self, ticket: int, stop_loss: Optional[float] = None,
@@ -100,7 +108,7 @@ class MTExecution:
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            self.logger.error(f"Error modifying order: {e}")
+            self.logger.error("Error modifying order: %s", e)
             raise
             
     def execute_mql(self, code: str, params: Optional[Dict] = None) -> Dict:
@@ -118,12 +126,16 @@ class MTExecution:
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            self.logger.error(f"Error executing MQL code: {e}")
+            self.logger.error("Error executing MQL code: %s", e)
             raise
             
     def calculate_indicator(self, symbol: str, timeframe: str, 
                           indicator_name: str, params: Dict) -> Dict:
-        """Calculate technical indicator using MQL4"""
+        """Calculate technical indicator locally, or using MQL4 when the cache cannot"""
+        if self.indicators is not None:
+            result = self.indicators.get(symbol, timeframe, indicator_name, params)
+            if result is not None:
+                return result
         try:
             payload = {
                 'symbol': symbol,
@@ -139,7 +151,7 @@ class MTExecution:
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            self.logger.error(f"Error calculating indicator: {e}")
+            self.logger.error("Error calculating indicator: %s", e)
             raise
             
     def backtest_strategy(self, code: str, params: Dict, 
@@ -160,12 +172,30 @@ class MTExecution:
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            self.logger.error(f"Error backtesting strategy: {e}")
+            self.logger.error("Error backtesting strategy: %s", e)
             raise
 
     def execute_trades(self, signals: list) -> None:
         """Execute trades based on trading signals for MT4"""
         try:
+            received = time.monotonic()
+            if self.journal is not None:
+                now = self.clock()
+                for signal in signals:
+                    self.journal.record_signal(signal, ts=now)
+                    
+            # Run the whole batch through the pre-trade risk gate
+            if self.risk_manager is not None:
+                approved, reasons = self.risk_manager.check_orders(signals)
+                for signal, reason in zip(signals, reasons):
+                    if reason:
+                        self.logger.warning(
+                            "Order rejected by risk check (%s): %s",
+                            REJECT_REASONS[reason], signal
+                        )
+                signals = [s for s, ok in zip(signals, approved) if ok]
+            approved_at = time.monotonic()
+
             for signal in signals:
                 # Convert signal to MT4 order parameters
                 order_type = 'BUY' if signal['direction'] == 'long' else 'SELL'
@@ -175,6 +205,7 @@ class MTExecution:
                 take_profit = signal.get('take_profit')
                 
                 # Place order through MetaTrader 4 API
+                submitted = time.monotonic()
                 order_response = self.place_order(
                     symbol=signal['symbol'],
                     order_type=order_type,
@@ -184,19 +215,85 @@ class MTExecution:
                     take_profit=take_profit
                 )
                 
+                acked = time.monotonic()
+                
+                fill_price = order_response.get('price') or price
+                filled_at = self.clock()
+                ticket = order_response.get('ticket') or order_response.get('order')
+                
+                # Market orders come back filled, so the fill is stamped with the ack
+                timeline = order_timeline({
+                    'signal': signal.get('signal_ts', received),
+                    'risk': approved_at,
+                    'submit': submitted,
+                    'ack': acked,
+                    'fill': acked if order_response.get('price') else None
+                }, order_type, price, order_response.get('price'))
+                
                 # Log order execution
-                self.logger.info(f"Executed trade: {order_response}")
+                self.logger.info("Executed trade: %s (latency %s ms, slippage %s bps)",
+                                 order_response, timeline['latency_ms'], timeline['slippage_bps'])
+                if self.latency is not None:
+                    self.latency.record(signal['symbol'], signal.get('bot_id'), timeline, filled_at)
+                
+                # Journal the order and its fill
+                if self.journal is not None:
+                    self.journal.record_order(
+                        signal['symbol'], order_type, volume, price,
+                        ref=ticket, bot_id=signal.get('bot_id'), data=order_response, ts=filled_at
+                    )
+                    if fill_price:
+                        self.journal.record_fill(
+                            signal['symbol'], order_type, volume, fill_price,
+                            ref=ticket, bot_id=signal.get('bot_id'),
+                            data={'timeline': timeline}, ts=filled_at
+                        )
+
+                # Track the open ticket and net position locally
+                if self.state is not None:
+                    self.state.on_order(ticket, order_response)
+                    if fill_price:
+                        self.state.on_fill(signal['symbol'], order_type, volume, fill_price)
+                        
+                # Update local performance statistics
+                if self.performance is not None and fill_price:
+                    self.performance.on_fill(
+                        signal.get('bot_id'), signal['symbol'], order_type, volume, fill_price, filled_at
+                    )
+                    
+                if self.fill_sink is not None and fill_price:
+                    self.fill_sink.publish_fill(
+                        signal.get('bot_id'), signal['symbol'], order_type, volume, fill_price, ticket
+                    )
+                    
+                # Update exposure state from the fill
+                if self.risk_manager is not None:
+                    self.risk_manager.record_fill(
+                        signal['symbol'],
+                        signal['direction'],
+                        volume,
+                        fill_price
+                    )
                 
                 # Update monitoring if available
-                if hasattr(self, 'monitoring'):
-                    self.monitoring.update_trades(order_response)
+                if self.monitoring is not None and fill_price:
+                    self.monitoring.add_trade({
+                        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(filled_at)),
+                        'pair': signal['symbol'],
+                        'side': order_type,
+                        'price': float(fill_price),
+                        'quantity': float(volume),
+                        'pnl': 0.0
+                    })
                     
         except Exception as e:
-            self.logger.error(f"Error executing trades: {e}")
+            self.logger.error("Error executing trades: %s", e)
             raise
 
     def get_bot_performance(self, bot_id: str) -> Dict:
         """Get performance metrics for a specific bot"""
+        if self.performance is not None:
+            return self.performance.get_performance(bot_id)
         try:
             response = self.session.get(
                 f'{self.api_url}/bots/{bot_id}/performance',
@@ -205,7 +302,7 @@ class MTExecution:
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            self.logger.error(f"Error getting bot performance: {e}")
+            self.logger.error("Error getting bot performance: %s", e)
             return {
                 'bot_id': bot_id,
                 'error': str(e),
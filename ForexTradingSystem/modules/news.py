@@ -0,0 +1,245 @@
+import os
+import re
+import json
+import time
+import bisect
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from .logger import get_logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    published REAL NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'&.-]*[a-z0-9]")
+_STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the this to was were will with'.split()
+)
+
+
+def _env_list(name: str, default: str = '') -> List[str]:
+    return [s.strip() for s in os.getenv(name, default).split(',') if s.strip()]
+
+
+def _timestamp(value: Any) -> float:
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+def terms(text: str) -> Set[str]:
+    """Lower-cased keywords of a headline or summary, without stopwords"""
+    return {word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+def normalize_article(item: Any) -> Dict[str, Any]:
+    """Article dict in the shape the frontend renders, from an Alpaca entity or a dict"""
+    raw = item if isinstance(item, dict) else getattr(item, '_raw', None) or vars(item)
+    title = raw.get('headline') or raw.get('title') or ''
+    url = raw.get('url') or ''
+    # Alpaca ids are stable; other providers are de-duplicated on url and title
+    article_id = raw.get('id')
+    if article_id is None:
+        article_id = hashlib.sha1(f'{url}|{title}'.encode()).hexdigest()[:20]
+    published = _timestamp(raw.get('created_at') or raw.get('publishedAt'))
+    return {
+        'id': str(article_id),
+        'title': title,
+        'description': raw.get('summary') or raw.get('description') or '',
+        'source': raw.get('source') or raw.get('author') or '',
+        'published': published,
+        'publishedAt': datetime.fromtimestamp(published, timezone.utc).isoformat(),
+        'url': url,
+        'symbols': sorted({s.upper() for s in raw.get('symbols') or ()})
+    }
+
+
+class NewsStore:
+    """De-duplicated news articles on SQLite with an in-memory inverted index.
+    
+    Articles are keyed by id, so refetching a page of news adds nothing
+    twice. Each process indexes the rows it has not seen yet by symbol and
+    by headline/summary keyword, newest first, and answers queries from
+    memory: a filtered page is a set intersection plus a bisect to the
+    cursor, whatever the request rate.
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_articles: Optional[int] = None):
+        self.path = path or os.getenv('NEWS_DB_PATH', 'news.db')
+        self.max_articles = max_articles or int(os.getenv('NEWS_MAX_ARTICLES', '20000'))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._articles: Dict[str, Dict[str, Any]] = {}
+        self._order: List[Tuple[float, str]] = []  # (-published, id), newest first
+        self._by_symbol: Dict[str, Set[str]] = {}
+        self._by_term: Dict[str, Set[str]] = {}
+        self._last_seq = 0
+        self._connection().executescript(_SCHEMA)
+        self.refresh()
+        
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+        
+    def add(self, articles: Iterable[Any]) -> int:
+        """Store new articles, skipping ids already stored; returns how many were new"""
+        rows = []
+        for item in articles:
+            article = normalize_article(item)
+            rows.append((article['id'], article['published'], json.dumps(article)))
+        conn = self._connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO news (id, published, data) VALUES (?, ?, ?)", rows)
+            added = conn.total_changes - before
+        self.refresh()
+        return added
+        
+    def refresh(self):
+        """Index rows stored since the last refresh, including other processes' writes"""
+        rows = self._connection().execute(
+            "SELECT seq, data FROM news WHERE seq > ? ORDER BY seq", (self._last_seq,)
+        ).fetchall()
+        if not rows:
+            return
+        with self._lock:
+            for seq, data in rows:
+                self._last_seq = max(self._last_seq, seq)
+                self._index(json.loads(data))
+            while len(self._order) > self.max_articles:
+                self._unindex(self._order.pop()[1])  # Oldest first
+                
+    def _index(self, article: Dict[str, Any]):
+        article_id = article['id']
+        if article_id in self._articles:
+            return
+        self._articles[article_id] = article
+        bisect.insort(self._order, (-article['published'], article_id))
+        for symbol in article['symbols']:
+            self._by_symbol.setdefault(symbol, set()).add(article_id)
+        for term in terms(f"{article['title']} {article['description']}"):
+            self._by_term.setdefault(term, set()).add(article_id)
+            
+    def _unindex(self, article_id: str):
+        article = self._articles.pop(article_id)
+        for index, keys in ((self._by_symbol, article['symbols']),
+                            (self._by_term, terms(f"{article['title']} {article['description']}"))):
+            for key in keys:
+                ids = index.get(key)
+                if ids is not None:
+                    ids.discard(article_id)
+                    if not ids:
+                        del index[key]
+                        
+    @staticmethod
+    def encode_cursor(key: Tuple[float, str]) -> str:
+        return f'{-key[0]!r}:{key[1]}'
+        
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[float, str]:
+        published, _, article_id = cursor.partition(':')
+        return (-float(published), article_id)
+        
+    def query(self, symbol: Optional[str] = None, q: Optional[str] = None, since: Optional[float] = None,
+              cursor: Optional[str] = None, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Newest-first page of articles matching every filter, and the cursor for the next page"""
+        self.refresh()
+        with self._lock:
+            candidates = None
+            filters = [self._by_symbol.get(s.upper(), set()) for s in (symbol or '').split(',') if s.strip()]
+            if filters:
+                candidates = set().union(*filters)  # Any of the symbols
+            for term in terms(q or ''):
+                matched = self._by_term.get(term, set())  # Every keyword
+                candidates = matched if candidates is None else candidates & matched
+                
+            if candidates is None:
+                order = self._order
+            else:
+                order = sorted((-self._articles[i]['published'], i) for i in candidates)
+            start = bisect.bisect_right(order, self.decode_cursor(cursor)) if cursor else 0
+            stop = len(order)
+            if since is not None:
+                stop = bisect.bisect_left(order, (-since, chr(0x10ffff)))
+            start = min(start + offset, stop)
+            page = order[start:min(start + limit, stop)]
+            items = [self._articles[i] for _, i in page]
+            has_more = start + len(page) < stop
+            return {
+                'items': items,
+                'next_cursor': self.encode_cursor(page[-1]) if page and has_more else None,
+                'total': stop
+            }
+
+
+def alpaca_news_source(symbols: Optional[List[str]] = None, limit: int = 50) -> Callable[[], List[Any]]:
+    """Fetch callable for Alpaca's news API, built from the ALPACA_* settings"""
+    from alpaca_trade_api import REST
+    client = REST(
+        key_id=os.getenv('ALPACA_API_KEY'),
+        secret_key=os.getenv('ALPACA_SECRET_KEY'),
+        base_url=os.getenv('ALPACA_BASE_URL')
+    )
+    symbols = symbols or _env_list('NEWS_SYMBOLS', 'AAPL')
+    return lambda: client.get_news(symbols, limit=limit)
+
+
+class NewsIngester:
+    """Polls a news source in the background and feeds the store"""
+    
+    def __init__(self, store: NewsStore, fetch: Optional[Callable[[], Iterable[Any]]] = None,
+                 interval: Optional[float] = None):
+        self.logger = self._setup_logger()
+        self.store = store
+        self.fetch = fetch
+        self.interval = interval or float(os.getenv('NEWS_POLL_INTERVAL', '60'))
+        self.last_fetch = None
+        self.last_error = None
+        
+    def _setup_logger(self):
+        return get_logger('news', 'news.log')
+        
+    def poll(self) -> int:
+        """One fetch from the source; returns the number of new articles"""
+        try:
+            if self.fetch is None:
+                self.fetch = alpaca_news_source()
+            added = self.store.add(self.fetch())
+            self.last_fetch = time.time()
+            self.last_error = None
+            if added:
+                self.logger.info("Stored %d new articles", added)
+            return added
+        except Exception as e:
+            self.last_error = str(e)
+            self.logger.error("Error fetching news: %s", e)
+            return 0
+            
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """Poll every `interval` seconds until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.poll()
+            stop_event.wait(self.interval)
+            
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run, name='news-ingester', daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+import numpy as np
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+class OrderBook:
+    """Array-backed L2 book for one symbol.
+
+    Each side keeps parallel sorted NumPy arrays of prices and quantities,
+    best level first. Cumulative quantity and notional arrays are rebuilt
+    lazily after an update, so depth and VWAP queries are a single
+    ``searchsorted`` on the hot path.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.nonce: Optional[int] = None
+        # Internal sort keys ascend from best to worst: -price for bids, price for asks
+        self._keys = {'bids': np.zeros(0), 'asks': np.zeros(0)}
+        self._qty = {'bids': np.zeros(0), 'asks': np.zeros(0)}
+        self._cum = {}
+
+    @staticmethod
+    def _sign(side: str) -> float:
+        return -1.0 if side == 'bids' else 1.0
+
+    def load_snapshot(self, snapshot: Dict[str, Any]):
+        """Replace the book with a ccxt fetch_order_book() snapshot"""
+        for side in ('bids', 'asks'):
+            levels = np.asarray(snapshot.get(side) or [], dtype=float).reshape(-1, 2)[:, :2]
+            levels = levels[levels[:, 1] > 0]
+            keys = levels[:, 0] * self._sign(side)
+            order = np.argsort(keys, kind='stable')
+            self._keys[side] = keys[order]
+            self._qty[side] = levels[order, 1]
+        self.nonce = snapshot.get('nonce')
+        self._cum = {}
+
+    def apply_levels(self, side: str, levels: Iterable):
+        """Merge absolute level updates into one side; zero quantity removes a level"""
+        levels = np.asarray(levels, dtype=float).reshape(-1, 2)
+        if len(levels) == 0:
+            return
+        keys = np.concatenate([self._keys[side], levels[:, 0] * self._sign(side)])
+        qty = np.concatenate([self._qty[side], levels[:, 1]])
+        # Stable sort keeps update order within equal prices; last one wins
+        order = np.argsort(keys, kind='stable')
+        keys, qty = keys[order], qty[order]
+        last = np.ones(len(keys), dtype=bool)
+        last[:-1] = keys[:-1] != keys[1:]
+        keep = last & (qty > 0)
+        self._keys[side] = keys[keep]
+        self._qty[side] = qty[keep]
+        self._cum.pop(side, None)
+
+    def _cumulative(self, side: str) -> Tuple[np.ndarray, np.ndarray]:
+        cum = self._cum.get(side)
+        if cum is None:
+            prices = self._keys[side] * self._sign(side)
+            cum = (np.cumsum(self._qty[side]), np.cumsum(prices * self._qty[side]))
+            self._cum[side] = cum
+        return cum
+
+    def best(self, side: str) -> Optional[Tuple[float, float]]:
+        """Return (price, quantity) of the best level on a side"""
+        if len(self._keys[side]) == 0:
+            return None
+        return float(self._keys[side][0] * self._sign(side)), float(self._qty[side][0])
+
+    def best_bid(self) -> Optional[float]:
+        level = self.best('bids')
+        return level[0] if level else None
+
+    def best_ask(self) -> Optional[float]:
+        level = self.best('asks')
+        return level[0] if level else None
+
+    def depth(self, side: str, price: float) -> float:
+        """Cumulative quantity available on a side at or better than price"""
+        idx = np.searchsorted(self._keys[side], price * self._sign(side), side='right')
+        if idx == 0:
+            return 0.0
+        return float(self._cumulative(side)[0][idx - 1])
+
+    def vwap(self, side: str, quantity: float) -> Tuple[Optional[float], float]:
+        """Average price to take `quantity` from a side, and the quantity available.
+
+        Buying consumes 'asks' and selling consumes 'bids'. When the book is
+        too thin the VWAP covers only the available quantity.
+        """
+        cum_qty, cum_notional = self._cumulative(side)
+        if len(cum_qty) == 0 or quantity <= 0:
+            return None, 0.0
+        idx = int(np.searchsorted(cum_qty, quantity, side='left'))
+        if idx >= len(cum_qty):
+            return float(cum_notional[-1] / cum_qty[-1]), float(cum_qty[-1])
+        prev_qty = cum_qty[idx - 1] if idx > 0 else 0.0
+        prev_notional = cum_notional[idx - 1] if idx > 0 else 0.0
+        price = self._keys[side][idx] * self._sign(side)
+        notional = prev_notional + (quantity - prev_qty) * price
+        return float(notional / quantity), float(quantity)
+
+    def to_dict(self, limit: int = 20) -> Dict[str, Any]:
+        """Return the top levels in ccxt order book format"""
+        book = {'symbol': self.symbol, 'nonce': self.nonce}
+        for side in ('bids', 'asks'):
+            book[side] = np.column_stack([
+                self._keys[side][:limit] * self._sign(side),
+                self._qty[side][:limit]
+            ]).tolist()
+        return book
+
+
+class OrderBookManager:
+    """Local L2 books kept current from depth diffs, resynced from REST on gaps.
+
+    Diff updates follow the exchange depth-stream format: ``U``/``u`` are the
+    first and last update ids covered, ``b``/``a`` (or ``bids``/``asks``) the
+    changed levels with absolute quantities. With a ``stream`` attached (see
+    DepthStream) every symbol read is subscribed to the diff stream after its
+    first snapshot and stays current without further REST calls while the
+    stream is connected. Books that are not streamed and receive no diffs for
+    ``max_age`` seconds are refreshed from REST on the next read; a reader
+    passing ``since`` (the start of its scan) reuses any book already
+    refreshed after that, so one scan costs at most one snapshot per symbol.
+    """
+
+    def __init__(self, exchange, logger: Optional[logging.Logger] = None,
+                 snapshot_limit: int = 1000, max_age: float = 5.0):
+        self.exchange = exchange
+        self.snapshot_limit = snapshot_limit
+        self.max_age = max_age
+        self.books: Dict[str, OrderBook] = {}
+        self.stream = None  # DepthStream feeding apply_update, optional
+        self._synced: Dict[str, bool] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._lock = threading.RLock()  # Diffs arrive on the stream's thread
+        self.logger = logger or logging.getLogger(__name__)
+
+    def sync(self, symbol: str) -> OrderBook:
+        """Load a full REST snapshot for a symbol"""
+        with self._lock:
+            book = self.books.setdefault(symbol, OrderBook(symbol))
+            book.load_snapshot(self.exchange.fetch_order_book(symbol, self.snapshot_limit))
+            # Without a nonce diffs cannot be sequence-checked and are applied as they come
+            self._synced[symbol] = True
+            self._updated_at[symbol] = time.monotonic()
+            return book
+            
+    def invalidate(self, symbol: str):
+        """Resync before the next diff, e.g. after the stream dropped some"""
+        with self._lock:
+            self._synced[symbol] = False
+
+    def get(self, symbol: str, since: Optional[float] = None) -> OrderBook:
+        """Return the local book, taking a snapshot if it is missing or stale"""
+        with self._lock:
+            book = self.books.get(symbol)
+            if book is None:
+                book = self.sync(symbol)
+                if self.stream is not None:
+                    self.stream.watch(symbol)
+                return book
+            if self.stream is not None and self.stream.live(symbol) and self._synced[symbol]:
+                return book
+            updated = self._updated_at[symbol]
+            if time.monotonic() - updated > self.max_age and (since is None or updated < since):
+                book = self.sync(symbol)
+            return book
+
+    def apply_update(self, symbol: str, update: Dict[str, Any]) -> bool:
+        """Apply one depth diff; returns False when it was dropped or forced a resync"""
+        with self._lock:
+            first_id = update.get('U')
+            last_id = update.get('u')
+            book = self.books.get(symbol)
+            if book is None or not self._synced.get(symbol):
+                book = self.sync(symbol)
+
+            if book.nonce is not None and last_id is not None:
+                if last_id <= book.nonce:
+                    return False  # Already contained in the snapshot
+                if first_id is not None and first_id > book.nonce + 1:
+                    self.logger.warning(
+                        "Sequence gap on %s (have %s, got %s); resyncing", symbol, book.nonce, first_id
+                    )
+                    book = self.sync(symbol)
+                    if last_id <= book.nonce:
+                        return False
+                    if first_id > book.nonce + 1:
+                        # Snapshot still behind the stream; retry on the next diff
+                        self._synced[symbol] = False
+                        return False
+
+            book.apply_levels('bids', update.get('b', update.get('bids', [])))
+            book.apply_levels('asks', update.get('a', update.get('asks', [])))
+            if last_id is not None:
+                book.nonce = last_id
+            self._updated_at[symbol] = time.monotonic()
+            return True
+
+    def estimate_fill(self, symbol: str, side: str, quantity: float,
+                      since: Optional[float] = None) -> Tuple[Optional[float], float]:
+        """Estimate average fill price and fillable quantity for a market order"""
+        with self._lock:
+            book = self.get(symbol, since)
+            return book.vwap('asks' if side == 'buy' else 'bids', quantity)
+
+
+class DepthStream:
+    """Feeds an exchange's websocket depth diffs into an OrderBookManager.
+    
+    Defaults to Binance's combined diff stream, whose ``depthUpdate`` events
+    carry the ``U``/``u``/``b``/``a`` fields apply_update expects. Symbols
+    are subscribed on the open connection as the manager first reads them.
+    The socket runs on its own asyncio loop in a daemon thread; after a
+    disconnect every book is resynced from REST before diffs apply again.
+    """
+    
+    def __init__(self, manager: OrderBookManager, url: Optional[str] = None,
+                 channel: Optional[str] = None):
+        self.manager = manager
+        self.url = url or os.getenv('DEPTH_STREAM_URL', 'wss://stream.binance.com:9443/stream')
+        self.channel = channel or os.getenv('DEPTH_STREAM_CHANNEL', 'depth@100ms')
+        self.reconnect_delay = float(os.getenv('DEPTH_STREAM_RECONNECT_SECONDS', '5'))
+        self.logger = manager.logger
+        self._symbols: Dict[str, str] = {}  # stream name -> symbol
+        self._subscribed: set = set()
+        self._ws = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        
+    def _stream_name(self, symbol: str) -> str:
+        return f"{self.manager.exchange.market_id(symbol).lower()}@{self.channel}"
+        
+    def watch(self, symbol: str):
+        """Subscribe a symbol's diffs, connecting on first use"""
+        name = self._stream_name(symbol)
+        with self._lock:
+            if name in self._symbols:
+                return
+            self._symbols[name] = symbol
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_loop, name='depth-stream', daemon=True)
+                self._thread.start()
+                return
+            loop = self._loop
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._subscribe([name]), loop)
+            
+    def live(self, symbol: str) -> bool:
+        """True while the socket is open and delivering this symbol's diffs"""
+        return self._ws is not None and self._stream_name(symbol) in self._subscribed
+        
+    def stop(self):
+        self._stop.set()
+        loop, ws = self._loop, self._ws
+        if loop is not None and ws is not None:
+            asyncio.run_coroutine_threadsafe(ws.close(), loop)
+            
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+            self._loop = None
+            
+    async def _subscribe(self, names: List[str]):
+        ws = self._ws
+        if ws is None:
+            return  # Subscribed on the next connect
+        await ws.send(json.dumps({'method': 'SUBSCRIBE', 'params': names, 'id': int(time.time() * 1000)}))
+        self._subscribed.update(names)
+        
+    async def _run(self):
+        try:
+            import websockets  # Deferred: only needed once a book is streamed
+        except ImportError:
+            self.logger.error("Depth stream needs the websockets package; books fall back to REST")
+            return
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.url) as ws:
+                    self._ws = ws
+                    with self._lock:
+                        names = list(self._symbols)
+                    if names:
+                        await self._subscribe(names)
+                    async for message in ws:
+                        self.on_message(message)
+            except Exception as e:
+                self.logger.warning("Depth stream disconnected: %s", e)
+            finally:
+                self._ws = None
+                self._subscribed.clear()
+                # Diffs sent while disconnected are lost
+                with self._lock:
+                    symbols = list(self._symbols.values())
+                for symbol in symbols:
+                    self.manager.invalidate(symbol)
+            if not self._stop.is_set():
+                await asyncio.sleep(self.reconnect_delay)
+                
+    def on_message(self, message):
+        """Route one combined-stream message to its book"""
+        try:
+            payload = json.loads(message)
+            data = payload.get('data')
+            symbol = self._symbols.get(payload.get('stream'))
+            if symbol is None or not data or data.get('e') != 'depthUpdate':
+                return  # Subscription acks and other events
+            self.manager.apply_update(symbol, data)
+        except Exception as e:
+            self.logger.error("Error applying depth update: %s", e)
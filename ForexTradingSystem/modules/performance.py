@@ -0,0 +1,166 @@
+import math
+import time
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+class BotPerformance:
+    """Running trade statistics for one bot, updated in O(1) per closed trade"""
+    
+    __slots__ = (
+        'bot_id', 'total_trades', 'wins', 'gross_profit', 'gross_loss',
+        'max_profit', 'max_loss', 'equity', 'peak_equity', 'max_drawdown',
+        'mean', 'm2', 'downside_sq', 'holding_time', 'holding_count'
+    )
+    
+    def __init__(self, bot_id: str):
+        self.bot_id = bot_id
+        self.total_trades = 0
+        self.wins = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.max_profit = 0.0
+        self.max_loss = 0.0
+        self.equity = 0.0
+        self.peak_equity = 0.0
+        self.max_drawdown = 0.0
+        self.mean = 0.0  # Welford running mean and sum of squares of trade profit
+        self.m2 = 0.0
+        self.downside_sq = 0.0
+        self.holding_time = 0.0
+        self.holding_count = 0
+        
+    def add_trade(self, profit: float, holding_seconds: Optional[float] = None):
+        self.total_trades += 1
+        if profit > 0:
+            self.wins += 1
+            self.gross_profit += profit
+            self.max_profit = max(self.max_profit, profit)
+        else:
+            self.gross_loss += profit
+            self.max_loss = min(self.max_loss, profit)
+            self.downside_sq += profit * profit
+            
+        self.equity += profit
+        if self.equity > self.peak_equity:
+            self.peak_equity = self.equity
+        else:
+            self.max_drawdown = max(self.max_drawdown, self.peak_equity - self.equity)
+            
+        delta = profit - self.mean
+        self.mean += delta / self.total_trades
+        self.m2 += delta * (profit - self.mean)
+        
+        if holding_seconds is not None:
+            self.holding_time += holding_seconds
+            self.holding_count += 1
+            
+    def metrics(self) -> Dict[str, float]:
+        n = self.total_trades
+        std = math.sqrt(self.m2 / (n - 1)) if n > 1 else 0.0
+        downside = math.sqrt(self.downside_sq / n) if n else 0.0
+        losses = n - self.wins
+        return {
+            'win_rate': self.wins / n * 100 if n else 0,
+            'drawdown': self.max_drawdown,
+            'profit_factor': self.gross_profit / abs(self.gross_loss) if self.gross_loss else 0,
+            'total_trades': n,
+            'profit': self.equity,
+            'gross_profit': self.gross_profit,
+            'gross_loss': self.gross_loss,
+            'max_profit': self.max_profit,
+            'max_loss': self.max_loss,
+            'average_win': self.gross_profit / self.wins if self.wins else 0,
+            'average_loss': self.gross_loss / losses if losses else 0,
+            'sharpe': self.mean / std if std else 0,
+            'sortino': self.mean / downside if downside else 0,
+            'expectancy': self.mean,
+            'average_holding_time': self.holding_time / self.holding_count if self.holding_count else 0
+        }
+
+
+class PerformanceTracker:
+    """Locally computed bot performance, fed by fills or closed trades.
+    
+    Fills are netted per (bot, symbol) with average-cost accounting; every
+    reduction of a position closes a trade whose realized profit and holding
+    time update that bot's running statistics.
+    """
+    
+    def __init__(self, contract_sizes: Optional[Dict[str, float]] = None):
+        self.contract_sizes = contract_sizes or {}
+        self.bots: Dict[str, BotPerformance] = {}
+        # (bot, symbol) -> [signed quantity, average price, average open time]
+        self._positions: Dict[Tuple[str, str], list] = {}
+        self._last_fill_id = 0
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self.rollups = None  # Time-bucketed analytics, set by main system
+        
+    def _bot(self, bot_id: Optional[str]) -> BotPerformance:
+        bot_id = bot_id or 'default'
+        bot = self.bots.get(bot_id)
+        if bot is None:
+            bot = self.bots[bot_id] = BotPerformance(bot_id)
+        return bot
+        
+    def record_trade(self, bot_id: Optional[str], profit: float,
+                     holding_seconds: Optional[float] = None):
+        """Add an already-closed trade with known profit"""
+        with self._lock:
+            self._bot(bot_id).add_trade(float(profit), holding_seconds)
+        if self.rollups is not None:
+            self.rollups.on_trade(bot_id, None, profit)
+            
+    def on_fill(self, bot_id: Optional[str], symbol: str, side: str, volume: float,
+                price: float, ts: Optional[float] = None):
+        """Apply a fill; side is 'buy'/'BUY'/'long' or 'sell'/'SELL'/'short'"""
+        ts = time.time() if ts is None else ts
+        sign = 1.0 if side.lower() in ('buy', 'long') else -1.0
+        volume, price = float(volume), float(price)
+        key = (bot_id or 'default', symbol)
+        if self.rollups is not None:
+            self.rollups.on_fill(bot_id, symbol, volume, ts)
+        with self._lock:
+            position = self._positions.setdefault(key, [0.0, 0.0, ts])
+            qty, avg_price, open_ts = position
+            if qty == 0 or (qty > 0) == (sign > 0):
+                total = abs(qty) + volume
+                position[1] = (abs(qty) * avg_price + volume * price) / total
+                position[2] = (abs(qty) * open_ts + volume * ts) / total
+                position[0] = qty + sign * volume
+                return
+                
+            closed = min(volume, abs(qty))
+            profit = closed * (price - avg_price) * (1.0 if qty > 0 else -1.0)
+            profit *= self.contract_sizes.get(symbol, 1.0)
+            self._bot(bot_id).add_trade(profit, ts - open_ts)
+            if self.rollups is not None:
+                self.rollups.on_trade(bot_id, symbol, profit, ts)
+            
+            remaining = volume - closed
+            position[0] = qty + sign * closed
+            if remaining > 0:
+                position[:] = [sign * remaining, price, ts]
+            elif position[0] == 0:
+                position[:] = [0.0, 0.0, ts]
+                
+    def load_from_journal(self, journal):
+        """Replay journaled fills not seen yet; cheap to call on every read"""
+        with self._replay_lock:
+            for fill in journal.query('fills', after_id=self._last_fill_id):
+                self.on_fill(fill['bot_id'], fill['symbol'], fill['side'],
+                             fill['volume'], fill['price'], fill['ts'])
+                self._last_fill_id = fill['id']
+                
+    def bot_ids(self) -> List[str]:
+        """Bots seen in fills so far, whether or not they have closed a trade"""
+        with self._lock:
+            return sorted(set(self.bots) | {bot_id for bot_id, _ in self._positions})
+            
+    def get_performance(self, bot_id: str) -> Dict[str, Any]:
+        """Return precomputed metrics for a bot in the bridge response format"""
+        bot = self.bots.get(bot_id)
+        return {
+            'bot_id': bot_id,
+            'metrics': bot.metrics() if bot else BotPerformance(bot_id).metrics()
+        }
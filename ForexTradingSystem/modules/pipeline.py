@@ -0,0 +1,267 @@
+import os
+import time
+import threading
+import multiprocessing
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from .lazy import is_enabled
+from .logger import get_logger
+from .shm_ring import ShmRing, BAR_DTYPE, SIGNAL_DTYPE, FILL_DTYPE
+
+RINGS = {'bars': BAR_DTYPE, 'signals': SIGNAL_DTYPE, 'fills': FILL_DTYPE}
+
+
+def _text(value: bytes) -> str:
+    return value.decode('utf-8', 'ignore')
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+class RingFillSink:
+    """Adapter letting MTExecution publish fills into the fills ring"""
+    
+    def __init__(self, ring: ShmRing):
+        self.ring = ring
+        
+    def publish_fill(self, bot_id: Optional[str], symbol: str, side: str, volume: float,
+                     price: float, ticket: Optional[Any] = None):
+        try:
+            ticket = int(ticket)
+        except (TypeError, ValueError):
+            ticket = -1
+        self.ring.push((time.time(), symbol.encode(), (bot_id or '').encode(), side.encode(),
+                        float(volume), float(price), ticket))
+
+
+def _ingest_worker(names: Dict[str, str], stop):
+    """Poll the exchange and publish closed bars"""
+    from .data_feed import DataFeed
+    logger = get_logger('pipeline', 'pipeline.log')
+    bars = ShmRing(names['bars'], BAR_DTYPE)
+    feed = DataFeed()
+    interval = float(os.getenv('DATA_FEED_INTERVAL', '60'))
+    last_ts = 0.0
+    while not stop.is_set():
+        try:
+            df = feed.get_data()
+            closes_by = time.time() - interval  # The forming candle is published once it closes
+            for row in df.itertuples(index=False):
+                ts = row.timestamp.timestamp()
+                if ts <= last_ts or ts > closes_by:
+                    continue
+                bars.push((ts, feed.symbol.encode(), row.open, row.high, row.low, row.close, row.volume))
+                last_ts = ts
+        except Exception as e:
+            logger.error("Ingest worker error: %s", e)
+        stop.wait(interval)
+    bars.close()
+
+
+def _signal_worker(names: Dict[str, str], stop):
+    """Run indicator math over a rolling window per symbol and publish order signals"""
+    import pandas as pd
+    from .signal_generator import SignalGenerator
+    logger = get_logger('pipeline', 'pipeline.log')
+    bars = ShmRing(names['bars'], BAR_DTYPE).reader()
+    signals = ShmRing(names['signals'], SIGNAL_DTYPE)
+    generator = SignalGenerator()
+    window = int(os.getenv('PIPELINE_BAR_WINDOW', '200'))
+    min_bars = int(os.getenv('PIPELINE_MIN_BARS', '35'))
+    volume = float(os.getenv('PIPELINE_ORDER_VOLUME', '0.01'))
+    poll = float(os.getenv('PIPELINE_POLL_INTERVAL', '0.01'))
+    history: Dict[str, deque] = {}
+    last_direction: Dict[str, Optional[str]] = {}
+    
+    while not stop.is_set():
+        records = bars.read()
+        if not len(records):
+            time.sleep(poll)
+            continue
+        updated = set()
+        for record in records:
+            symbol = _text(record['symbol'])
+            history.setdefault(symbol, deque(maxlen=window)).append(record)
+            updated.add(symbol)
+        for symbol in updated:
+            if len(history[symbol]) < min_bars:
+                continue
+            try:
+                frame = pd.DataFrame.from_records(np.array(history[symbol], dtype=BAR_DTYPE))
+                direction = generator.get_direction(generator.generate_signals(frame))
+            except Exception as e:
+                logger.error("Signal worker error for %s: %s", symbol, e)
+                continue
+            # Only a change of direction is a new trade
+            if direction and direction != last_direction.get(symbol):
+                signals.push((time.time(), symbol.encode(), b'', direction.encode(), volume,
+                              float(frame['close'].iloc[-1]), np.nan, np.nan))
+            last_direction[symbol] = direction
+    signals.close()
+
+
+def _execution_worker(names: Dict[str, str], stop):
+    """Place orders for published signals; nothing else competes for this process"""
+    from decimal import Decimal
+    from .journal import TradeJournal
+    from .mt_execution import MTExecution
+    from .performance import PerformanceTracker
+    from .risk_management import RiskManager
+    from .state_manager import StateManager
+    logger = get_logger('pipeline', 'pipeline.log')
+    signals = ShmRing(names['signals'], SIGNAL_DTYPE).reader()
+    fills = ShmRing(names['fills'], FILL_DTYPE)
+    poll = float(os.getenv('PIPELINE_POLL_INTERVAL', '0.01'))
+    
+    journal = TradeJournal(os.getenv('JOURNAL_PATH', 'trading_journal.db'))
+    execution = MTExecution(api_url=os.getenv('MT_API_URL'), api_key=os.getenv('MT_API_KEY'))
+    execution.journal = journal
+    execution.performance = PerformanceTracker()
+    execution.performance.load_from_journal(journal)
+    execution.risk_manager = RiskManager()
+    execution.risk_manager.journal = journal
+    execution.fill_sink = RingFillSink(fills)
+    # Equity for the risk gate is read from local state, reconciled with the bridge in the background
+    state = StateManager(source=execution)
+    execution.state = state
+    threading.Thread(target=state.run, args=(stop,), daemon=True).start()
+    
+    while not stop.is_set():
+        records = signals.read()
+        if not len(records):
+            time.sleep(poll)
+            continue
+        if not execution.risk_manager.update_risk_parameters():
+            logger.warning("Risk parameters exceeded, dropping %d signals", len(records))
+            continue
+        batch: List[Dict[str, Any]] = [{
+            'symbol': _text(r['symbol']),
+            'bot_id': _text(r['bot_id']) or None,
+            'direction': _text(r['direction']),
+            'volume': float(r['volume']),
+            'price': _optional(r['price']),
+            'stop_loss': _optional(r['stop_loss']),
+            'take_profit': _optional(r['take_profit'])
+        } for r in records]
+        try:
+            account = state.get_account_info()
+            execution.risk_manager.update_equity(Decimal(str(account['equity'])))
+            execution.execute_trades(batch)
+        except Exception as e:
+            logger.error("Execution worker error: %s", e)
+    journal.close()
+    fills.close()
+
+
+def _dashboard_worker(names: Dict[str, str], stop):
+    """Serve the monitoring dashboard from fills published by execution"""
+    from .monitoring import Monitoring
+    fills = ShmRing(names['fills'], FILL_DTYPE).reader()
+    monitoring = Monitoring()
+    poll = float(os.getenv('PIPELINE_POLL_INTERVAL', '0.01'))
+    
+    def follow():
+        while not stop.is_set():
+            records = fills.read()
+            if not len(records):
+                time.sleep(poll)
+                continue
+            for r in records:
+                monitoring.add_trade({
+                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(r['ts'])),
+                    'pair': _text(r['symbol']),
+                    'side': _text(r['side']),
+                    'price': float(r['price']),
+                    'quantity': float(r['volume']),
+                    'pnl': 0.0
+                })
+                
+    threading.Thread(target=follow, daemon=True).start()
+    monitoring.run()
+
+
+def _api_worker(names: Dict[str, str], stop):
+    """Run the REST/Socket.IO server; performance is read from the shared journal"""
+    from api_server import APIServer
+    APIServer().start()
+
+
+class Pipeline:
+    """Multi-process trading pipeline.
+    
+    Ingestion, signal generation, execution and the API/dashboard each run in
+    their own process, so indicator math and JSON serialization never hold the
+    GIL that order placement needs. Bars, signals and fills move between them
+    through single-writer shared memory rings (see ShmRing); each ring has
+    exactly one producing process.
+    """
+    
+    def __init__(self, capacity: Optional[int] = None):
+        self.logger = self._setup_logger()
+        self.capacity = capacity or int(os.getenv('PIPELINE_RING_CAPACITY', '8192'))
+        self.context = multiprocessing.get_context(os.getenv('PIPELINE_START_METHOD', 'spawn'))
+        self.stop_event = self.context.Event()
+        self.rings: Dict[str, ShmRing] = {}
+        self.processes: Dict[str, multiprocessing.Process] = {}
+        
+    def _setup_logger(self):
+        return get_logger('pipeline', 'pipeline.log')
+        
+    def _workers(self) -> Dict[str, Any]:
+        workers = {
+            'ingest': _ingest_worker,
+            'signals': _signal_worker,
+            'execution': _execution_worker
+        }
+        if is_enabled('ENABLE_MONITORING'):
+            workers['dashboard'] = _dashboard_worker
+        if is_enabled('ENABLE_API'):
+            workers['api'] = _api_worker
+        return workers
+        
+    def start(self):
+        """Create the rings and launch one process per stage"""
+        for name, dtype in RINGS.items():
+            self.rings[name] = ShmRing(None, dtype, self.capacity, create=True)
+        names = {name: ring.name for name, ring in self.rings.items()}
+        
+        for name, target in self._workers().items():
+            process = self.context.Process(target=target, args=(names, self.stop_event),
+                                           name=f'pipeline-{name}', daemon=True)
+            process.start()
+            self.processes[name] = process
+            self.logger.info("Started %s worker (pid %s)", name, process.pid)
+            
+    def stop(self, timeout: float = 10.0):
+        """Signal workers to stop, then release the shared memory"""
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for name, process in self.processes.items():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+        self.processes.clear()
+        for ring in self.rings.values():
+            ring.close()
+            ring.unlink()
+        self.rings.clear()
+        
+    def run(self):
+        """Start the pipeline and supervise it until interrupted"""
+        self.start()
+        try:
+            while not self.stop_event.is_set():
+                for name, process in list(self.processes.items()):
+                    if not process.is_alive():
+                        self.logger.error("%s worker exited with code %s", name, process.exitcode)
+                        del self.processes[name]
+                time.sleep(5)
+        except KeyboardInterrupt:
+            self.logger.info("Shutting down pipeline")
+        finally:
+            self.stop()
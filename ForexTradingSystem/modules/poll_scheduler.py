@@ -0,0 +1,257 @@
+import os
+import math
+import time
+import heapq
+import threading
+import statistics
+import ccxt
+from typing import Callable, Dict, Any, Iterable, List, Optional, Set
+
+from .logger import get_logger
+
+TIERS = ('position', 'watchlist', 'universe')  # Highest polling priority first
+
+
+def binance_ticker_weight(symbol_count: int) -> int:
+    """Request weight of GET /api/v3/ticker/24hr for a batch of symbols"""
+    if symbol_count <= 20:
+        return 2
+    if symbol_count <= 100:
+        return 40
+    return 80
+
+
+def _env_list(name: str) -> List[str]:
+    return [s.strip() for s in os.getenv(name, '').split(',') if s.strip()]
+
+
+class TokenBucket:
+    """Thread-safe token bucket measured in exchange request weight"""
+    
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+        
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        
+    def try_acquire(self, weight: float) -> bool:
+        """Spend `weight` tokens; a request heavier than the bucket waits for a full bucket"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= min(weight, self.capacity):
+                self.tokens -= weight
+                return True
+            return False
+            
+    def wait_time(self, weight: float) -> float:
+        """Seconds until `weight` tokens will be available"""
+        with self._lock:
+            self._refill()
+            return max(0.0, (min(weight, self.capacity) - self.tokens) / self.rate)
+            
+    def penalize(self, seconds: float):
+        """Drain the bucket so nothing is sent for roughly `seconds`"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class PollScheduler:
+    """Ticker polling for a large symbol universe within the exchange weight budget.
+    
+    Each symbol belongs to a tier (open positions, watchlist, everything else)
+    with its own base interval. That interval is scaled by how volatile the
+    symbol has been relative to the median of the universe, so quiet markets
+    are polled less. Due symbols are packed into batched fetch_tickers calls,
+    highest tier first, and every call spends its request weight from a
+    global token bucket.
+    """
+    
+    def __init__(self, exchange=None, symbols: Optional[Iterable[str]] = None,
+                 on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 weight_fn: Callable[[int], int] = binance_ticker_weight):
+        self.logger = self._setup_logger()
+        self.exchange = exchange or self._initialize_exchange()
+        self.on_update = on_update
+        self.clock = clock
+        self.weight_fn = weight_fn
+        self.base_intervals = {
+            'position': float(os.getenv('POLL_INTERVAL_POSITION', '2')),
+            'watchlist': float(os.getenv('POLL_INTERVAL_WATCHLIST', '10')),
+            'universe': float(os.getenv('POLL_INTERVAL_UNIVERSE', '60'))
+        }
+        self.batch_size = int(os.getenv('POLL_BATCH_SIZE', '20'))
+        self.min_scale = float(os.getenv('POLL_MIN_SCALE', '0.25'))
+        self.max_scale = float(os.getenv('POLL_MAX_SCALE', '4'))
+        self.vol_alpha = float(os.getenv('POLL_VOL_ALPHA', '0.1'))
+        self.backoff = float(os.getenv('POLL_RATE_LIMIT_BACKOFF', '30'))
+        weight_per_minute = float(os.getenv('POLL_WEIGHT_PER_MINUTE', '3000'))
+        self.bucket = TokenBucket(weight_per_minute / 60.0, weight_per_minute / 6.0, clock)
+        
+        self.tiers: Dict[str, str] = {}
+        self._members: Dict[str, Set[str]] = {tier: set() for tier in TIERS}
+        self.latest: Dict[str, Dict[str, Any]] = {}
+        self._due: Dict[str, float] = {}
+        self._heap: List[tuple] = []
+        self._variance: Dict[str, float] = {}  # EWMA of squared log return per second
+        self._last: Dict[str, tuple] = {}  # symbol -> (time, price)
+        self._reference_variance = 0.0  # Universe median, refreshed once per poll
+        self._lock = threading.Lock()
+        
+        self.set_universe(symbols if symbols is not None else _env_list('POLL_SYMBOLS'))
+        self.set_watchlist(_env_list('POLL_WATCHLIST'))
+        
+    def _initialize_exchange(self):
+        """Initialize exchange connection with API credentials"""
+        exchange = ccxt.binance({
+            'apiKey': os.getenv('EXCHANGE_API_KEY'),
+            'secret': os.getenv('EXCHANGE_API_SECRET'),
+            'enableRateLimit': True
+        })
+        return exchange
+        
+    def _setup_logger(self):
+        return get_logger('poll_scheduler', 'poll_scheduler.log')
+        
+    def _schedule(self, symbol: str, due: float):
+        self._due[symbol] = due
+        heapq.heappush(self._heap, (due, symbol))
+        
+    def _set_tier(self, symbols: Iterable[str], tier: str):
+        now = self.clock()
+        with self._lock:
+            symbols = set(symbols)
+            changed = self._members[tier] ^ symbols
+            self._members[tier] = symbols
+            for symbol in changed:
+                # A symbol's tier is the highest one it is a member of
+                current = self.tiers.get(symbol)
+                new = next((t for t in TIERS if symbol in self._members[t]), None)
+                if new is None:
+                    del self.tiers[symbol]
+                    self._due.pop(symbol, None)
+                    continue
+                self.tiers[symbol] = new
+                if current is None or TIERS.index(new) < TIERS.index(current):
+                    # New or promoted symbols are polled on the next pass
+                    due = self._due.get(symbol)
+                    if due is None or due > now + self.interval(symbol):
+                        self._schedule(symbol, now)
+                    
+    def set_universe(self, symbols: Iterable[str]):
+        self._set_tier(symbols, 'universe')
+        
+    def set_watchlist(self, symbols: Iterable[str]):
+        self._set_tier(symbols, 'watchlist')
+        
+    def set_positions(self, symbols: Iterable[str]):
+        self._set_tier(symbols, 'position')
+        
+    def interval(self, symbol: str) -> float:
+        """Current polling interval: tier base scaled by relative volatility"""
+        base = self.base_intervals[self.tiers.get(symbol, 'universe')]
+        variance = self._variance.get(symbol)
+        if not variance or not self._reference_variance:
+            return base
+        scale = math.sqrt(self._reference_variance / variance)
+        return base * min(self.max_scale, max(self.min_scale, scale))
+        
+    def _update_volatility(self, symbol: str, price: Optional[float], now: float):
+        if not price:
+            return
+        last = self._last.get(symbol)
+        self._last[symbol] = (now, price)
+        if last is None or now <= last[0] or last[1] <= 0:
+            return
+        sample = math.log(price / last[1]) ** 2 / (now - last[0])
+        previous = self._variance.get(symbol)
+        self._variance[symbol] = sample if previous is None else (
+            (1 - self.vol_alpha) * previous + self.vol_alpha * sample
+        )
+        
+    def _take_due(self, now: float) -> List[str]:
+        """Pop every due symbol and return the highest-priority batch"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            at, symbol = heapq.heappop(self._heap)
+            if self._due.get(symbol) == at and symbol in self.tiers:
+                del self._due[symbol]  # Skips duplicate heap entries for the same time
+                due.append((TIERS.index(self.tiers[symbol]), at, symbol))
+        due.sort()
+        batch = [symbol for _, _, symbol in due[:self.batch_size]]
+        for _, at, symbol in due[self.batch_size:]:
+            self._schedule(symbol, at)  # Keep their place in line
+        return batch
+        
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+            
+    def poll_once(self) -> int:
+        """Send at most one batched ticker request; returns the number of symbols polled"""
+        now = self.clock()
+        with self._lock:
+            batch = self._take_due(now)
+            if not batch:
+                return 0
+            weight = self.weight_fn(len(batch))
+            if not self.bucket.try_acquire(weight):
+                retry = now + self.bucket.wait_time(weight)
+                for symbol in batch:
+                    self._schedule(symbol, retry)
+                return 0
+                
+        try:
+            tickers = self.exchange.fetch_tickers(batch)
+        except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
+            self.logger.warning("Rate limited, backing off %.0fs: %s", self.backoff, e)
+            self.bucket.penalize(self.backoff)
+            with self._lock:
+                for symbol in batch:
+                    self._schedule(symbol, now + self.backoff)
+            return 0
+        except Exception as e:
+            self.logger.error("Error polling %d symbols: %s", len(batch), e)
+            with self._lock:
+                for symbol in batch:
+                    self._schedule(symbol, now + self.interval(symbol))
+            return 0
+            
+        now = self.clock()
+        with self._lock:
+            for symbol in batch:
+                ticker = tickers.get(symbol)
+                if ticker:
+                    self.latest[symbol] = ticker
+                    self._update_volatility(symbol, ticker.get('last'), now)
+            if len(self._variance) > 1:
+                self._reference_variance = statistics.median(self._variance.values())
+            for symbol in batch:
+                if symbol in self.tiers:
+                    self._schedule(symbol, now + self.interval(symbol))
+        if self.on_update is not None:
+            try:
+                self.on_update(tickers)
+            except Exception as e:
+                self.logger.error("Error in ticker callback: %s", e)
+        return len(batch)
+        
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """Poll until stop_event is set, sleeping only when nothing is due"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            if self.poll_once():
+                continue
+            due = self.next_due()
+            delay = 1.0 if due is None else min(1.0, max(0.0, due - self.clock()))
+            stop_event.wait(max(delay, 0.01))
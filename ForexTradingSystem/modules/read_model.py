@@ -0,0 +1,68 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS read_model (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_read_model_version ON read_model (version);
+"""
+
+
+class ReadModel:
+    """Latest trading state, written by the trading process and read by API workers.
+    
+    Each key holds one JSON document (status, risk, account, positions, ...)
+    in SQLite in WAL mode, so any number of worker processes read while the
+    trading loop writes. Every publish stamps its keys with a new version,
+    which lets a reader fetch only what changed since it last looked.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('READ_MODEL_PATH', 'read_model.db')
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connection().executescript(_SCHEMA)
+        
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+        
+    def publish(self, **entries: Any) -> int:
+        """Replace the given keys in one transaction; returns their version"""
+        now = time.time()
+        conn = self._connection()
+        with self._write_lock, conn:
+            version = conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM read_model").fetchone()[0]
+            conn.executemany(
+                "INSERT OR REPLACE INTO read_model VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(value, default=str), version, now) for key, value in entries.items()]
+            )
+        return version
+        
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._connection().execute("SELECT value FROM read_model WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+        
+    def snapshot(self) -> Dict[str, Any]:
+        return {key: json.loads(value) for key, value in
+                self._connection().execute("SELECT key, value FROM read_model")}
+                
+    def changes(self, since: int = 0) -> Tuple[int, Dict[str, Any]]:
+        """Keys published after version `since`, and the version to pass next time"""
+        rows = self._connection().execute(
+            "SELECT key, value, version FROM read_model WHERE version > ?", (since,)
+        ).fetchall()
+        version = max((row[2] for row in rows), default=since)
+        return version, {key: json.loads(value) for key, value, _ in rows}
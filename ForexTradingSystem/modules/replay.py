@@ -0,0 +1,311 @@
+import os
+import time
+import random
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+
+from .data_feed import DataFeed
+from .lazy import lazy_component
+from .logger import get_logger
+from .mt_execution import MTExecution
+
+_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class VirtualClock:
+    """Simulated time in epoch seconds; sleeping advances it instantly"""
+    
+    def __init__(self, start: float = 0.0):
+        self.now = float(start)
+        
+    def time(self) -> float:
+        return self.now
+        
+    def monotonic(self) -> float:
+        return self.now
+        
+    def sleep(self, seconds: float):
+        self.now += max(0.0, seconds)
+
+
+class ReplayMarket:
+    """Recorded OHLCV bars served as of the virtual clock.
+    
+    A bar becomes visible once its close time has passed on the clock, so
+    the system never sees a bar earlier than it would have live.
+    """
+    
+    def __init__(self, bars: Dict[str, pd.DataFrame], timeframe: str = '1m',
+                 clock: Optional[VirtualClock] = None):
+        from .bar_aggregator import timeframe_seconds
+        self.timeframe = timeframe
+        self.bar_ms = timeframe_seconds(timeframe) * 1000
+        self._data: Dict[str, Dict[str, np.ndarray]] = {}
+        for symbol, frame in bars.items():
+            frame = frame.sort_values('timestamp').drop_duplicates('timestamp', keep='last')
+            ts = frame['timestamp']
+            if not np.issubdtype(ts.dtype, np.integer):
+                ts = pd.to_datetime(ts).astype('datetime64[ms]').astype('int64')
+            self._data[symbol] = {'ts': ts.to_numpy(dtype=np.int64), **{
+                column: frame[column].to_numpy(dtype=float) for column in _COLUMNS[1:]
+            }}
+        self.clock = clock or VirtualClock(self.start_time())
+        
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, timeframe: str = '1m', default_symbol: str = 'BTC/USDT'):
+        """One frame with an optional 'symbol' column"""
+        if 'symbol' not in frame:
+            return cls({default_symbol: frame}, timeframe)
+        return cls({symbol: group for symbol, group in frame.groupby('symbol')}, timeframe)
+        
+    @classmethod
+    def from_csv(cls, path: str, timeframe: str = '1m'):
+        return cls.from_frame(pd.read_csv(path), timeframe)
+        
+    @classmethod
+    def from_backfill(cls, backfill, symbols: List[str], timeframe: str = '1m',
+                      start: Optional[int] = None, end: Optional[int] = None):
+        """Replay candles stored by the historical backfill"""
+        return cls({s: backfill.load(s, timeframe, start, end) for s in symbols}, timeframe)
+        
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._data)
+        
+    def start_time(self) -> float:
+        """When the first recorded bar closes"""
+        return min(d['ts'][0] for d in self._data.values() if len(d['ts'])) / 1000 + self.bar_ms / 1000
+        
+    def end_time(self) -> float:
+        return max(d['ts'][-1] for d in self._data.values() if len(d['ts'])) / 1000 + self.bar_ms / 1000
+        
+    def _closed(self, symbol: str, at: Optional[float] = None) -> int:
+        """Number of bars of `symbol` closed by time `at` (defaults to now)"""
+        at_ms = (self.clock.now if at is None else at) * 1000
+        return int(np.searchsorted(self._data[symbol]['ts'] + self.bar_ms, at_ms, side='right'))
+        
+    def fetch_ohlcv(self, symbol: str, timeframe: Optional[str] = None, since: Optional[int] = None,
+                    limit: Optional[int] = None) -> List[list]:
+        """ccxt-compatible view of the closed bars"""
+        data = self._data[symbol]
+        end = self._closed(symbol)
+        start = 0 if since is None else int(np.searchsorted(data['ts'], since, side='left'))
+        if limit is not None:
+            start = max(start, end - limit) if since is None else start
+            end = min(end, start + limit)
+        return [[int(data['ts'][i])] + [float(data[c][i]) for c in _COLUMNS[1:]]
+                for i in range(start, end)]
+                
+    def price(self, symbol: str, at: Optional[float] = None) -> Optional[float]:
+        """Last close as of `at`"""
+        closed = self._closed(symbol, at)
+        return float(self._data[symbol]['close'][closed - 1]) if closed else None
+
+
+class SimulatedBroker:
+    """Deterministic stand-in for the MT bridge with a latency and fill model.
+    
+    An order arrives after a fixed latency plus seeded random jitter and
+    fills at the recorded price at arrival. The fill is moved adversely by
+    half the spread plus slippage, both in basis points. Positions are
+    netted per symbol with average-cost accounting.
+    """
+    
+    def __init__(self, market: ReplayMarket, balance: float = 10000.0, latency: float = 0.05,
+                 latency_jitter: float = 0.0, spread_bps: float = 0.0, slippage_bps: float = 0.0,
+                 commission: float = 0.0, contract_sizes: Optional[Dict[str, float]] = None,
+                 seed: int = 0):
+        self.market = market
+        self.clock = market.clock
+        self.balance = balance
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.spread_bps = spread_bps
+        self.slippage_bps = slippage_bps
+        self.commission = commission
+        self.contract_sizes = contract_sizes or {}
+        self.positions: Dict[str, List[float]] = {}  # symbol -> [signed volume, average price]
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self._rng = random.Random(seed)
+        self._next_ticket = 1
+        
+    def place_order(self, symbol: str, order_type: str, volume: float, price: Optional[float] = None,
+                    stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> Dict:
+        latency = self.latency + self._rng.uniform(0, self.latency_jitter)
+        arrival = self.clock.now + latency
+        mid = self.market.price(symbol, arrival)
+        if mid is None:
+            raise ValueError(f"No recorded price for {symbol} at {arrival}")
+        sign = 1.0 if order_type.upper() == 'BUY' else -1.0
+        fill = mid * (1 + sign * (self.spread_bps / 2 + self.slippage_bps) / 10000)
+        
+        position = self.positions.setdefault(symbol, [0.0, 0.0])
+        qty, avg = position
+        size = self.contract_sizes.get(symbol, 1.0)
+        if qty == 0 or (qty > 0) == (sign > 0):
+            position[1] = (abs(qty) * avg + volume * fill) / (abs(qty) + volume)
+            position[0] = qty + sign * volume
+        else:
+            closed = min(volume, abs(qty))
+            self.balance += closed * (fill - avg) * (1.0 if qty > 0 else -1.0) * size
+            position[0] = qty + sign * volume
+            if volume > closed:
+                position[1] = fill
+            elif position[0] == 0:
+                position[1] = 0.0
+        self.balance -= self.commission * volume
+        
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        order = {
+            'ticket': ticket, 'symbol': symbol, 'type': order_type.upper(), 'volume': volume,
+            'price': fill, 'stoploss': stop_loss, 'takeprofit': take_profit,
+            'time': arrival, 'latency': latency
+        }
+        self.orders[ticket] = order
+        return dict(order)
+        
+    def close_order(self, ticket: int) -> Dict:
+        order = self.orders.pop(ticket)
+        opposite = 'SELL' if order['type'] == 'BUY' else 'BUY'
+        return self.place_order(order['symbol'], opposite, order['volume'])
+        
+    def _unrealized(self, symbol: str) -> float:
+        qty, avg = self.positions[symbol]
+        mark = self.market.price(symbol)
+        if not qty or mark is None:
+            return 0.0
+        return qty * (mark - avg) * self.contract_sizes.get(symbol, 1.0)
+        
+    def get_positions(self) -> Dict:
+        return {
+            symbol: {'volume': qty, 'price': avg, 'profit': self._unrealized(symbol)}
+            for symbol, (qty, avg) in self.positions.items() if qty
+        }
+        
+    def get_account_info(self) -> Dict:
+        equity = self.balance + sum(self._unrealized(s) for s in self.positions)
+        return {'balance': self.balance, 'equity': equity, 'time': self.clock.now}
+
+
+class SimulatedExecution(MTExecution):
+    """MTExecution whose bridge calls go to a SimulatedBroker"""
+    
+    def __init__(self, broker: SimulatedBroker):
+        super().__init__(api_url='sim://', api_key='')
+        self.broker = broker
+        self.clock = broker.clock.time
+        
+    def place_order(self, symbol: str, order_type: str, volume: float,
+                    price: Optional[float] = None, stop_loss: Optional[float] = None,
+                    take_profit: Optional[float] = None) -> Dict:
+        return self.broker.place_order(symbol, order_type, volume, price, stop_loss, take_profit)
+        
+    def close_order(self, ticket: int) -> Dict:
+        return self.broker.close_order(ticket)
+        
+    def get_account_info(self) -> Dict:
+        return self.broker.get_account_info()
+        
+    def get_positions(self) -> Dict:
+        return self.broker.get_positions()
+
+
+class ReplayDataFeed(DataFeed):
+    """DataFeed reading closed bars from a ReplayMarket instead of the exchange"""
+    
+    def __init__(self, market: ReplayMarket, symbol: Optional[str] = None,
+                 history_bars: Optional[int] = None):
+        # No exchange connection: the recording plays the exchange's part
+        self.exchange = market
+        self.symbol = symbol or market.symbols[0]
+        self.historical_data = None
+        self.history_bars = history_bars or int(os.getenv('REPLAY_HISTORY_BARS', '500'))
+        self._last_ts: Optional[int] = None
+        
+    def get_data(self):
+        """Bars closed since the previous call"""
+        since = None if self._last_ts is None else self._last_ts + 1
+        candles = self.exchange.fetch_ohlcv(self.symbol, since=since)
+        df = pd.DataFrame(candles, columns=_COLUMNS)
+        if len(df):
+            self._last_ts = int(df['timestamp'].iloc[-1])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        self._update_historical_data(df)
+        return df
+        
+    def _update_historical_data(self, new_data):
+        """Keep the last history_bars bars; the live version trims by wall-clock age"""
+        if self.historical_data is None:
+            self.historical_data = new_data
+        elif len(new_data):
+            self.historical_data = pd.concat([self.historical_data, new_data], ignore_index=True)
+        self.historical_data = self.historical_data.iloc[-self.history_bars:].reset_index(drop=True)
+
+
+class ReplayRunner:
+    """Drives a trading system through a recording on a virtual clock.
+    
+    attach() swaps the system's data feed and MT bridge for replay versions
+    and points every clock the pipeline reads at the virtual one. It also
+    switches off subsystems that would reach live venues. run() then calls
+    the system's run_cycle() back to back, advancing the clock by the cycle
+    interval instead of sleeping.
+    """
+    
+    def __init__(self, market: ReplayMarket, interval: Optional[float] = None,
+                 journal_path: Optional[str] = None, **broker_options):
+        self.logger = self._setup_logger()
+        self.market = market
+        self.clock = market.clock
+        self.interval = interval or float(os.getenv('TRADING_CYCLE_SECONDS', '60'))
+        self.journal_path = journal_path or os.getenv('REPLAY_JOURNAL_PATH', 'replay_journal.db')
+        self.broker = SimulatedBroker(market, **broker_options)
+        self.system = None
+        
+    def _setup_logger(self):
+        return get_logger('replay', 'replay.log')
+        
+    def attach(self, system):
+        """Point a TradingSystem-like object at the recording"""
+        if not lazy_component.is_loaded(system, 'journal'):
+            from .journal import TradeJournal
+            system.journal = TradeJournal(self.journal_path)  # Keep replays out of the live journal
+        system.data_feed = ReplayDataFeed(self.market)
+        system.enable_monitoring = False  # No dashboard for replayed fills
+        system.execution = system.wire_execution(SimulatedExecution(self.broker))
+        system.risk_manager.clock = self.clock.monotonic
+        system.sleep = self.clock.sleep
+        system.cycle_interval = self.interval
+        system.enable_hedging = False
+        system.enable_arbitrage = False
+        self.system = system
+        return system
+        
+    def run(self, until: Optional[float] = None, max_cycles: Optional[int] = None) -> Dict[str, Any]:
+        """Replay until the recording (or `until`) ends; returns run statistics"""
+        end = until or self.market.end_time()
+        started_at = self.clock.now
+        wall_start = time.perf_counter()
+        cycles = 0
+        while self.clock.now <= end and (max_cycles is None or cycles < max_cycles):
+            try:
+                if not self.system.run_cycle():
+                    break
+            except Exception as e:
+                self.logger.error("Replay cycle failed at %s: %s", self.clock.now, e)
+            cycles += 1
+            self.clock.sleep(self.interval)
+        wall = time.perf_counter() - wall_start
+        simulated = self.clock.now - started_at
+        account = self.broker.get_account_info()
+        return {
+            'cycles': cycles,
+            'orders': self.broker._next_ticket - 1,
+            'simulated_seconds': simulated,
+            'wall_seconds': wall,
+            'speedup': simulated / wall if wall else float('inf'),
+            'balance': account['balance'],
+            'equity': account['equity']
+        }
@@ -1,7 +1,25 @@
 import os
-import logging
+import time
+from collections import deque
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .logger import get_logger
+
+# Reason codes returned by RiskManager.check_orders (0 means approved)
+REJECT_REASONS = (
+    None,
+    'daily_loss',
+    'no_equity',
+    'no_price',
+    'position_size',
+    'symbol_exposure',
+    'total_exposure',
+    'leverage',
+    'order_rate',
+)
 
 class RiskManager:
     def __init__(self):
@@ -9,17 +27,27 @@ class RiskManager:
         self.daily_loss_limit = Decimal(os.getenv('MAX_DAILY_LOSS'))
         self.risk_per_trade = Decimal(os.getenv('RISK_PER_TRADE'))
         self.max_position_size = Decimal(os.getenv('MAX_POSITION_SIZE'))
+        self.max_leverage = Decimal(os.getenv('MAX_LEVERAGE', '20'))
+        self.max_symbol_exposure = Decimal(os.getenv('MAX_SYMBOL_EXPOSURE', '2'))
+        self.max_total_exposure = Decimal(os.getenv('MAX_TOTAL_EXPOSURE', '5'))
+        self.max_orders_per_minute = int(os.getenv('MAX_ORDERS_PER_MINUTE', '30'))
         self.daily_pnl = Decimal('0')
+        self.equity = Decimal('0')
+        self.journal = None  # Trade journal, set by main system
+        self.clock = time.monotonic  # Order-rate window clock; virtual in replay
+
+        # Pre-trade state: one slot per symbol, grown on first sight
+        self._symbol_ids: Dict[str, int] = {}
+        self._exposure = np.zeros(0)
+        self._mark_price = np.zeros(0)
+        self._contract_size = np.zeros(0)
+        self._symbol_limit_override = np.zeros(0)
+        self._order_times = deque()
+        self._compile_limits()
         
     def _setup_logger(self):
         """Configure risk management logger"""
-        logger = logging.getLogger('risk_management')
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('risk_management.log')
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('risk_management', 'risk_management.log')
         
     def update_risk_parameters(self):
         """Update risk parameters based on current market conditions"""
@@ -32,7 +60,7 @@ class RiskManager:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error updating risk parameters: {e}")
+            self.logger.error("Error updating risk parameters: %s", e)
             return False
             
     def calculate_position_size(self, balance: Decimal, atr: Decimal) -> Decimal:
@@ -47,13 +75,162 @@ class RiskManager:
             return min(position_size, max_size)
             
         except Exception as e:
-            self.logger.error(f"Error calculating position size: {e}")
+            self.logger.error("Error calculating position size: %s", e)
             return Decimal('0')
             
+    def _compile_limits(self):
+        """Precompute float limit tables used by the pre-trade check"""
+        equity = float(self.equity)
+        self._equity_f = equity
+        self._daily_loss_f = -float(self.daily_loss_limit)
+        self._max_order_notional = equity * float(self.max_position_size)
+        self._max_net_exposure = equity * float(self.max_total_exposure)
+        self._max_gross_exposure = equity * float(self.max_leverage)
+        self._symbol_limit = np.where(
+            np.isnan(self._symbol_limit_override),
+            equity * float(self.max_symbol_exposure),
+            self._symbol_limit_override
+        )
+
+    def _symbol_id(self, symbol: str) -> int:
+        """Return the table slot for a symbol, growing the tables if needed"""
+        sid = self._symbol_ids.get(symbol)
+        if sid is None:
+            sid = len(self._symbol_ids)
+            self._symbol_ids[symbol] = sid
+            if sid >= len(self._exposure):
+                grow = max(8, len(self._exposure))
+                self._exposure = np.concatenate([self._exposure, np.zeros(grow)])
+                self._mark_price = np.concatenate([self._mark_price, np.zeros(grow)])
+                self._contract_size = np.concatenate([self._contract_size, np.ones(grow)])
+                self._symbol_limit_override = np.concatenate(
+                    [self._symbol_limit_override, np.full(grow, np.nan)]
+                )
+                self._compile_limits()
+        return sid
+
+    def update_equity(self, equity: Decimal):
+        """Set account equity and recompute equity-relative limits"""
+        self.equity = Decimal(str(equity))
+        self._compile_limits()
+
+    def set_symbol_limits(self, symbol: str, max_exposure: Optional[float] = None,
+                          contract_size: Optional[float] = None):
+        """Override the exposure limit or contract size for a single symbol"""
+        sid = self._symbol_id(symbol)
+        if max_exposure is not None:
+            self._symbol_limit_override[sid] = float(max_exposure)
+        if contract_size is not None:
+            self._contract_size[sid] = float(contract_size)
+        self._compile_limits()
+
+    def update_price(self, symbol: str, price: float):
+        """Update the mark price used for orders that carry no price"""
+        self._mark_price[self._symbol_id(symbol)] = float(price)
+
+    def record_fill(self, symbol: str, direction: str, volume: float,
+                    price: Optional[float] = None):
+        """Apply a fill to the incrementally maintained exposure state"""
+        sid = self._symbol_id(symbol)
+        if price:
+            self._mark_price[sid] = float(price)
+        sign = 1.0 if direction == 'long' else -1.0
+        self._exposure[sid] += sign * float(volume) * self._mark_price[sid] * self._contract_size[sid]
+
+    def get_exposure(self) -> Dict[str, float]:
+        """Get signed notional exposure per symbol"""
+        return {symbol: float(self._exposure[sid]) for symbol, sid in self._symbol_ids.items()}
+
+    def check_orders(self, orders: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Check a batch of candidate orders against all pre-trade limits.
+
+        Orders are evaluated in batch order as if every earlier approved order
+        in the batch were filled. Returns a boolean approval mask and an array
+        of reason codes indexing REJECT_REASONS.
+        """
+        n = len(orders)
+        if n == 0:
+            return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int8)
+
+        sids = np.fromiter((self._symbol_id(o['symbol']) for o in orders), dtype=np.intp, count=n)
+        sign = np.fromiter((1.0 if o['direction'] == 'long' else -1.0 for o in orders), dtype=float, count=n)
+        volume = np.fromiter((float(o['volume']) for o in orders), dtype=float, count=n)
+        price = np.fromiter((float(o.get('price') or 0.0) for o in orders), dtype=float, count=n)
+        price = np.where(price > 0, price, self._mark_price[sids])
+        signed = sign * volume * price * self._contract_size[sids]
+
+        now = self.clock()
+        while self._order_times and self._order_times[0] <= now - 60:
+            self._order_times.popleft()
+
+        # Per-symbol grouping for in-batch cumulative exposure
+        by_symbol = np.argsort(sids, kind='stable')
+        sorted_sids = sids[by_symbol]
+        group_start = np.ones(n, dtype=bool)
+        group_start[1:] = sorted_sids[1:] != sorted_sids[:-1]
+        start_idx = np.maximum.accumulate(np.where(group_start, np.arange(n), 0))
+
+        # An order's limits depend only on earlier orders, so everything before the
+        # first rejection is final; drop that order and re-evaluate the rest
+        approved = np.ones(n, dtype=bool)
+        reasons = np.zeros(n, dtype=np.int8)
+        first = 0
+        while first < n:
+            evaluated = self._evaluate(sids, signed, price, approved, by_symbol, start_idx)
+            rejected = np.flatnonzero(evaluated[first:])
+            if not rejected.size:
+                break
+            first += int(rejected[0])
+            reasons[first] = evaluated[first]
+            approved[first] = False
+            first += 1
+
+        self._order_times.extend([now] * int(approved.sum()))
+        return approved, reasons
+
+    def _evaluate(self, sids, signed, price, live, by_symbol, start_idx) -> np.ndarray:
+        """Evaluate all limits for a batch given the set of orders assumed filled"""
+        n = len(signed)
+        live_signed = np.where(live, signed, 0.0)
+
+        # Symbol exposure before and after each order
+        cum = np.cumsum(live_signed[by_symbol])
+        offset = np.where(start_idx > 0, cum[start_idx - 1], 0.0)
+        before_sorted = self._exposure[sids[by_symbol]] + cum - offset - live_signed[by_symbol]
+        before = np.empty(n)
+        before[by_symbol] = before_sorted
+        after = before + signed
+        gross_delta = np.abs(after) - np.abs(before)
+
+        # Portfolio net and gross exposure before and after each order
+        net_before = self._exposure.sum() + np.cumsum(live_signed) - live_signed
+        net_after = net_before + signed
+        live_delta = np.where(live, gross_delta, 0.0)
+        gross_after = np.abs(self._exposure).sum() + np.cumsum(live_delta) - live_delta + gross_delta
+
+        prior_orders = len(self._order_times) + np.cumsum(live) - live
+
+        return np.select(
+            [
+                np.full(n, float(self.daily_pnl) <= self._daily_loss_f),
+                np.full(n, self._equity_f <= 0),
+                ~(price > 0),
+                np.abs(signed) > self._max_order_notional,
+                (np.abs(after) > self._symbol_limit[sids]) & (gross_delta > 0),
+                (np.abs(net_after) > self._max_net_exposure) & (np.abs(net_after) > np.abs(net_before)),
+                (gross_after > self._max_gross_exposure) & (gross_delta > 0),
+                prior_orders >= self.max_orders_per_minute,
+            ],
+            list(range(1, len(REJECT_REASONS))),
+            default=0
+        ).astype(np.int8)
+
     def update_pnl(self, pnl_change: Decimal):
         """Update daily PnL tracking"""
         self.daily_pnl += pnl_change
-        self.logger.info(f"Updated daily PnL: {self.daily_pnl}")
+        self.logger.info("Updated daily PnL: %s", self.daily_pnl)
+        if self.journal is not None:
+            self.journal.record_pnl(float(pnl_change), data={'daily_pnl': float(self.daily_pnl)})
         
     def get_risk_status(self) -> Dict[str, Any]:
         """Get current risk status"""
@@ -61,5 +238,8 @@ class RiskManager:
             'daily_pnl': float(self.daily_pnl),
             'daily_loss_limit': float(self.daily_loss_limit),
             'risk_per_trade': float(self.risk_per_trade),
-            'max_position_size': float(self.max_position_size)
+            'max_position_size': float(self.max_position_size),
+            'max_leverage': float(self.max_leverage),
+            'equity': float(self.equity),
+            'gross_exposure': float(np.abs(self._exposure).sum())
         }
@@ -0,0 +1,120 @@
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Optional
+
+# Record layouts exchanged between pipeline processes
+BAR_DTYPE = np.dtype([
+    ('ts', 'f8'), ('symbol', 'S16'),
+    ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'), ('volume', 'f8')
+])
+SIGNAL_DTYPE = np.dtype([
+    ('ts', 'f8'), ('symbol', 'S16'), ('bot_id', 'S32'), ('direction', 'S8'),
+    ('volume', 'f8'), ('price', 'f8'), ('stop_loss', 'f8'), ('take_profit', 'f8')
+])
+FILL_DTYPE = np.dtype([
+    ('ts', 'f8'), ('symbol', 'S16'), ('bot_id', 'S32'), ('side', 'S8'),
+    ('volume', 'f8'), ('price', 'f8'), ('ticket', 'i8')
+])
+
+_HEADER = 64  # write sequence, capacity and record size, padded to a cache line
+
+
+class ShmRing:
+    """Fixed-size records in a shared memory ring with one writer and any number of readers.
+    
+    The writer copies a record into slot ``seq % capacity`` and only then
+    publishes ``seq + 1`` as the write sequence, so readers never take a lock:
+    they copy the slots between their own cursor and the write sequence, then
+    re-read the sequence and discard anything the writer may have lapped
+    while they were copying.
+    """
+    
+    def __init__(self, name: Optional[str], dtype: np.dtype, capacity: int = 4096,
+                 create: bool = False):
+        self.dtype = np.dtype(dtype)
+        if create:
+            size = _HEADER + capacity * self.dtype.itemsize
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self.owner = create
+        
+        self._header = np.ndarray((3,), dtype=np.uint64, buffer=self._shm.buf)
+        if create:
+            self._header[:] = (0, capacity, self.dtype.itemsize)
+        elif int(self._header[2]) != self.dtype.itemsize:
+            itemsize = int(self._header[2])
+            self.close()
+            raise ValueError(f"Ring {name} holds {itemsize}-byte records, not {self.dtype.itemsize}")
+        self.capacity = int(self._header[1])
+        self._slots = np.ndarray((self.capacity,), dtype=self.dtype,
+                                 buffer=self._shm.buf, offset=_HEADER)
+                                 
+    @property
+    def write_seq(self) -> int:
+        return int(self._header[0])
+        
+    def push(self, record) -> int:
+        """Append one record (tuple in dtype field order); returns its sequence"""
+        seq = int(self._header[0])
+        self._slots[seq % self.capacity] = record
+        self._header[0] = seq + 1
+        return seq
+        
+    def push_many(self, records: np.ndarray) -> int:
+        """Append a structured array of records and publish them at once"""
+        records = np.asarray(records, dtype=self.dtype)[-self.capacity:]
+        seq = int(self._header[0])
+        index = (seq + np.arange(len(records))) % self.capacity
+        self._slots[index] = records
+        self._header[0] = seq + len(records)
+        return seq
+        
+    def reader(self, from_start: bool = False) -> 'RingReader':
+        """Cursor over this ring starting at the oldest retained or the next record"""
+        seq = self.write_seq
+        return RingReader(self, max(0, seq - self.capacity) if from_start else seq)
+        
+    def close(self):
+        self._header = None
+        self._slots = None
+        self._shm.close()
+        
+    def unlink(self):
+        """Remove the segment; only the creating process should call this"""
+        self._shm.unlink()
+
+
+class RingReader:
+    """One consumer's position in a ShmRing"""
+    
+    def __init__(self, ring: ShmRing, cursor: int = 0):
+        self.ring = ring
+        self.cursor = cursor
+        self.lost = 0  # Records overwritten before this reader got to them
+        
+    def pending(self) -> int:
+        return self.ring.write_seq - self.cursor
+        
+    def read(self, max_items: Optional[int] = None) -> np.ndarray:
+        """Copy out records published since the last read, oldest first"""
+        ring = self.ring
+        end = ring.write_seq
+        start = max(self.cursor, end - ring.capacity)
+        if max_items is not None:
+            end = min(end, start + max_items)
+        if end <= start:
+            return np.empty(0, dtype=ring.dtype)
+            
+        index = np.arange(start, end) % ring.capacity
+        records = ring._slots[index]  # Fancy indexing copies
+        
+        # Slots the writer may have reused while we were copying are unreliable
+        safe_start = ring.write_seq - ring.capacity + 1
+        if safe_start > start:
+            records = records[min(safe_start, end) - start:]
+            
+        self.lost += end - len(records) - self.cursor
+        self.cursor = end
+        return records
@@ -1,6 +1,5 @@
 import pandas as pd
-import pandas_ta as ta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class SignalGenerator:
     def __init__(self):
@@ -10,6 +9,7 @@ class SignalGenerator:
             'macd': {'fast': 12, 'slow': 26, 'signal': 9},
             'atr': {'length': 14}
         }
+        self.min_bars = 35  # Enough history for MACD's slow EMA plus signal line
         
     def generate_signals(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Generate trading signals based on technical indicators"""
@@ -17,6 +17,7 @@ class SignalGenerator:
             return {}
             
         signals = {}
+        import pandas_ta as ta  # Deferred: importing pandas_ta dominates startup time
         
         # Calculate indicators
         for indicator, params in self.indicators.items():
@@ -44,6 +45,16 @@ class SignalGenerator:
         
         return signals
         
+    def get_direction(self, signals: Dict[str, Any]) -> Optional[str]:
+        """Collapse indicator signals into 'long', 'short' or None when they disagree"""
+        if not signals:
+            return None
+        if signals['ema'] == signals['macd'] == 'bullish' and signals['rsi'] != 'overbought':
+            return 'long'
+        if signals['ema'] == signals['macd'] == 'bearish' and signals['rsi'] != 'oversold':
+            return 'short'
+        return None
+        
     def _generate_rsi_signal(self, data: pd.DataFrame) -> str:
         """Generate RSI-based signal"""
         last_rsi = data['rsi'].iloc[-1]
@@ -63,6 +74,8 @@ class SignalGenerator:
         
     def _generate_macd_signal(self, data: pd.DataFrame) -> str:
         """Generate MACD-based signal"""
-        if data['MACD_12_26_9'].iloc[-1] > data['MACDs_12_26_9'].iloc[-1]:
+        params = self.indicators['macd']
+        suffix = f"{params['fast']}_{params['slow']}_{params['signal']}"  # pandas_ta's column naming
+        if data[f'MACD_{suffix}'].iloc[-1] > data[f'MACDs_{suffix}'].iloc[-1]:
             return 'bullish'
         return 'bearish'
@@ -0,0 +1,146 @@
+import os
+import errno
+import queue
+import socket
+import threading
+from typing import Dict, Any, List, Optional
+
+import socketio
+
+from .logger import get_logger
+
+CHANNEL = 'flask-socketio'  # Flask-SocketIO's default channel, shared with its own queue backends
+
+
+class MemoryManager(socketio.PubSubManager):
+    """Socket.IO pub/sub over in-process queues, for several servers in one test process"""
+    
+    name = 'memory'
+    _subscribers: Dict[str, List[queue.Queue]] = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, url: str = 'memory://', channel: str = CHANNEL, write_only: bool = False,
+                 logger=None):
+        super().__init__(channel=url[len('memory://'):] or channel, write_only=write_only, logger=logger)
+        self.queue: queue.Queue = queue.Queue()
+        if not write_only:
+            with self._lock:
+                self._subscribers.setdefault(self.channel, []).append(self.queue)
+                
+    def _publish(self, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(self.channel, ()))
+        for subscriber in subscribers:
+            subscriber.put(data)
+            
+    def _listen(self):
+        while True:
+            yield self.queue.get()
+
+
+class UnixSocketManager(socketio.PubSubManager):
+    """Socket.IO pub/sub between processes on one host over Unix datagram sockets.
+    
+    Every listening server binds one socket in the queue directory; a
+    publisher sends each message to all of them, the way _Notifier wakes
+    market data consumers. A local stand-in for Redis or AMQP.
+    """
+    
+    name = 'unix'
+    
+    def __init__(self, url: str = 'unix:///tmp/socketio-queue', channel: str = CHANNEL,
+                 write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.directory = os.path.join(url[len('unix://'):], channel)
+        os.makedirs(self.directory, exist_ok=True)
+        # A worker that stops reading must not block the publisher (the trading loop)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self.dropped = 0
+        self._receiver = None
+        if not write_only:
+            self.address = os.path.join(self.directory, f'{self.host_id[:16]}.sock')  # sun_path is ~100 bytes
+            self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            self._receiver.bind(self.address)
+            
+    def _publish(self, data):
+        message = self.json.dumps(data).encode()
+        for name in os.listdir(self.directory):
+            address = os.path.join(self.directory, name)
+            try:
+                self._sender.sendto(message, address)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(address)  # Server exited without closing
+                except OSError:
+                    pass
+            except BlockingIOError:
+                self.dropped += 1
+                self._get_logger().warning("Socket.IO queue full at %s; message dropped", address)
+            except OSError as e:
+                if e.errno != errno.EMSGSIZE:
+                    raise
+                self.dropped += 1
+                self._get_logger().error("Socket.IO message of %d bytes too large; dropped", len(message))
+                return
+                    
+    def _listen(self):
+        while True:
+            yield self._receiver.recv(1 << 20)
+            
+    def close(self):
+        if self._receiver is not None:
+            self._receiver.close()
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+        self._sender.close()
+
+
+def client_manager(url: str, channel: str = CHANNEL, write_only: bool = False):
+    """Socket.IO client manager for a message queue URL.
+    
+    memory:// and unix:// are the local stand-ins; redis, kafka, zmq and
+    AMQP URLs use the python-socketio backends Flask-SocketIO would pick.
+    """
+    if url.startswith('memory://'):
+        return MemoryManager(url, channel, write_only)
+    if url.startswith('unix://'):
+        return UnixSocketManager(url, channel, write_only)
+    if url.startswith(('redis://', 'rediss://')):
+        manager_class = socketio.RedisManager
+    elif url.startswith('kafka://'):
+        manager_class = socketio.KafkaManager
+    elif url.startswith('zmq'):
+        manager_class = socketio.ZmqManager
+    else:
+        manager_class = socketio.KombuManager
+    return manager_class(url, channel=channel, write_only=write_only)
+
+
+def socketio_options(url: Optional[str] = None) -> Dict[str, Any]:
+    """SocketIO(...) keyword arguments for SOCKETIO_MESSAGE_QUEUE; empty for a single process"""
+    url = url if url is not None else os.getenv('SOCKETIO_MESSAGE_QUEUE', '')
+    return {'client_manager': client_manager(url)} if url else {}
+
+
+class EventPublisher:
+    """Emits Socket.IO events to API worker rooms from a process that serves no clients"""
+    
+    def __init__(self, url: Optional[str] = None):
+        self.logger = self._setup_logger()
+        self.url = url if url is not None else os.getenv('SOCKETIO_MESSAGE_QUEUE', '')
+        self.manager = client_manager(self.url, write_only=True) if self.url else None
+        
+    def _setup_logger(self):
+        return get_logger('socket_queue', 'socket_queue.log')
+        
+    def emit(self, event: str, data: Any, room: Optional[str] = None, namespace: str = '/'):
+        if self.manager is None:
+            return
+        try:
+            self.manager.emit(event, data, namespace=namespace, room=room)
+        except Exception as e:
+            self.logger.error("Error publishing %s event: %s", event, e)
@@ -0,0 +1,194 @@
+import os
+import threading
+from typing import Dict, Any, List, Optional
+
+from .logger import get_logger
+
+
+def _normalize_positions(positions) -> Dict[str, List[float]]:
+    """Bridge positions as symbol -> [signed volume, average price].
+    
+    Accepts a dict keyed by symbol or a list of per-ticket positions, where a
+    'type' of 1 or SELL marks a short.
+    """
+    if isinstance(positions, dict):
+        positions = [dict(p, symbol=s) for s, p in positions.items()]
+    netted: Dict[str, List[float]] = {}
+    for position in positions or ():
+        volume = float(position.get('volume', position.get('lots', 0)) or 0)
+        if position.get('type') in (1, 'SELL', 'sell'):
+            volume = -abs(volume)
+        price = float(position.get('price', position.get('open_price', 0)) or 0)
+        qty, avg = netted.get(position['symbol'], [0.0, 0.0])
+        total = qty + volume
+        if total and (qty == 0 or (qty > 0) == (volume > 0)):
+            avg = (abs(qty) * avg + abs(volume) * price) / abs(total)
+        netted[position['symbol']] = [total, avg]
+    return {s: p for s, p in netted.items() if p[0]}
+
+
+class StateManager:
+    """Orders, positions, account equity and exchange balances kept in memory.
+    
+    State is updated from our own order acks and fills as they happen, and
+    marked to market from price updates, so reads never touch the network.
+    reconcile() compares the local view with the bridge (and the exchange
+    balances, when an exchange is attached), logs every difference and
+    adopts the remote state. run() does that every STATE_RECONCILE_SECONDS
+    in the background.
+    """
+    
+    def __init__(self, source=None, exchange=None, contract_sizes: Optional[Dict[str, float]] = None):
+        self.logger = self._setup_logger()
+        self.source = source  # Execution backend with get_positions/get_account_info, set by main system
+        self.exchange = exchange  # ccxt exchange whose balances are tracked, set by main system
+        self.contract_sizes = contract_sizes or {}
+        self.interval = float(os.getenv('STATE_RECONCILE_SECONDS', '60'))
+        self.tolerance = float(os.getenv('STATE_VOLUME_TOLERANCE', '1e-8'))
+        self.orders: Dict[Any, Dict[str, Any]] = {}
+        self.divergences = 0
+        self.last_diffs: List[Dict[str, Any]] = []
+        self._positions: Dict[str, List[float]] = {}  # symbol -> [signed volume, average price]
+        self._marks: Dict[str, float] = {}
+        self._balances: Optional[Dict[str, float]] = None
+        self._balance: Optional[float] = None
+        self._synced = False
+        self._equity_offset = 0.0  # Remote equity minus our estimate at the last reconciliation
+        self._lock = threading.RLock()
+        
+    def _setup_logger(self):
+        return get_logger('state_manager', 'state_manager.log')
+        
+    def _unrealized(self, symbol: str) -> float:
+        qty, avg = self._positions[symbol]
+        mark = self._marks.get(symbol)
+        if not qty or mark is None:
+            return 0.0
+        return qty * (mark - avg) * self.contract_sizes.get(symbol, 1.0)
+        
+    def _estimated_equity(self) -> float:
+        return (self._balance or 0.0) + sum(self._unrealized(s) for s in self._positions)
+        
+    def on_order(self, ticket, order: Dict[str, Any]):
+        """Record an acknowledged order"""
+        if ticket is not None:
+            with self._lock:
+                self.orders[ticket] = dict(order)
+                
+    def on_close(self, ticket):
+        with self._lock:
+            self.orders.pop(ticket, None)
+            
+    def on_fill(self, symbol: str, order_type: str, volume: float, price: float):
+        """Net a bridge fill into the symbol's position, realizing P&L on reductions"""
+        sign = 1.0 if order_type.upper() == 'BUY' else -1.0
+        with self._lock:
+            qty, avg = self._positions.get(symbol, [0.0, 0.0])
+            if qty == 0 or (qty > 0) == (sign > 0):
+                avg = (abs(qty) * avg + volume * price) / (abs(qty) + volume)
+            else:
+                closed = min(volume, abs(qty))
+                realized = closed * (price - avg) * (1.0 if qty > 0 else -1.0)
+                self._balance = (self._balance or 0.0) + realized * self.contract_sizes.get(symbol, 1.0)
+                if volume > closed:
+                    avg = price
+            qty += sign * volume
+            if abs(qty) <= self.tolerance:
+                self._positions.pop(symbol, None)
+            else:
+                self._positions[symbol] = [qty, avg]
+            self._marks[symbol] = price
+            
+    def on_exchange_fill(self, symbol: str, side: str, amount: float, cost: Optional[float] = None):
+        """Apply an exchange trade to the tracked balances; fees wait for reconciliation"""
+        with self._lock:
+            if self._balances is None:
+                return
+            base, quote = symbol.split('/')
+            sign = 1.0 if side == 'buy' else -1.0
+            self._balances[base] = self._balances.get(base, 0.0) + sign * amount
+            if cost:
+                self._balances[quote] = self._balances.get(quote, 0.0) - sign * cost
+                
+    def on_price(self, symbol: str, price: float):
+        with self._lock:
+            self._marks[symbol] = float(price)
+            
+    def get_positions(self) -> Dict[str, Dict[str, float]]:
+        """Open positions from memory, in the SimulatedBroker/bridge dict shape"""
+        with self._lock:
+            return {
+                symbol: {'volume': qty, 'price': avg, 'profit': self._unrealized(symbol)}
+                for symbol, (qty, avg) in self._positions.items()
+            }
+            
+    def get_account_info(self) -> Dict[str, float]:
+        """Balance and marked-to-market equity; syncs from the bridge on first use"""
+        if not self._synced and self.source is not None:
+            self.reconcile()
+        with self._lock:
+            return {
+                'balance': self._balance or 0.0,
+                'equity': self._estimated_equity() + self._equity_offset
+            }
+            
+    def get_balances(self) -> Dict[str, float]:
+        """Non-zero exchange balances; syncs from the exchange on first use"""
+        if self._balances is None and self.exchange is not None:
+            self.reconcile()
+        with self._lock:
+            return {c: a for c, a in (self._balances or {}).items() if abs(a) > self.tolerance}
+            
+    def _diff(self, kind: str, key: str, local: float, remote: float) -> Dict[str, Any]:
+        self.logger.warning("State drift in %s %s: local %s, remote %s", kind, key, local, remote)
+        return {'kind': kind, 'key': key, 'local': local, 'remote': remote}
+        
+    def reconcile(self) -> List[Dict[str, Any]]:
+        """Fetch remote state, record where it differs from ours, and adopt it"""
+        diffs = []
+        if self.source is not None:
+            try:
+                remote_positions = _normalize_positions(self.source.get_positions())
+                account = self.source.get_account_info()
+            except Exception as e:
+                self.logger.error("Error reconciling positions: %s", e)
+            else:
+                with self._lock:
+                    first_sync = not self._synced
+                    for symbol in sorted(set(self._positions) | set(remote_positions)):
+                        local = self._positions.get(symbol, [0.0, 0.0])[0]
+                        remote = remote_positions.get(symbol, [0.0, 0.0])[0]
+                        if abs(local - remote) > self.tolerance and not first_sync:
+                            diffs.append(self._diff('position', symbol, local, remote))
+                    self._positions = remote_positions
+                    self._balance = float(account['balance'])
+                    self._equity_offset = float(account['equity']) - self._estimated_equity()
+                    self._synced = True
+                    
+        if self.exchange is not None:
+            try:
+                totals = self.exchange.fetch_balance()['total']
+            except Exception as e:
+                self.logger.error("Error reconciling balances: %s", e)
+            else:
+                remote_balances = {c: float(a) for c, a in totals.items() if a}
+                with self._lock:
+                    if self._balances is not None:
+                        for currency in sorted(set(self._balances) | set(remote_balances)):
+                            local = self._balances.get(currency, 0.0)
+                            remote = remote_balances.get(currency, 0.0)
+                            if abs(local - remote) > max(self.tolerance, 1e-6 * abs(remote)):
+                                diffs.append(self._diff('balance', currency, local, remote))
+                    self._balances = remote_balances
+                    
+        with self._lock:
+            self.divergences += len(diffs)
+            self.last_diffs = diffs
+        return diffs
+        
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """Reconcile every `interval` seconds until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.reconcile()
+            stop_event.wait(self.interval)
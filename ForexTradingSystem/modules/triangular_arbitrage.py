@@ -0,0 +1,221 @@
+import math
+import numpy as np
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+class TriangularArbitrageScanner:
+    """Currency graph over exchange markets with incremental cycle scoring.
+
+    Every market BASE/QUOTE contributes two directed edges: QUOTE -> BASE
+    (buy at the ask) and BASE -> QUOTE (sell at the bid), each weighted by the
+    log of its fee-adjusted conversion rate. All simple cycles up to
+    ``max_cycle_length`` legs are enumerated once when markets are loaded, so a
+    price update only rescores the cycles that use the touched edges.
+    """
+
+    def __init__(self, max_cycle_length: int = 3, default_fee: float = 0.001):
+        if max_cycle_length < 3:
+            raise ValueError("max_cycle_length must be at least 3")
+        self.max_cycle_length = max_cycle_length
+        self.default_fee = default_fee
+        self.currencies: List[str] = []
+        self._currency_ids: Dict[str, int] = {}
+        self._market_edges: Dict[str, Tuple[int, int]] = {}
+
+        self._edge_src = np.zeros(0, dtype=np.intp)
+        self._edge_dst = np.zeros(0, dtype=np.intp)
+        self._edge_symbol: List[str] = []
+        self._edge_side: List[str] = []
+        self._edge_fee = np.zeros(0)
+        self._log_rate = np.zeros(0)
+
+        self._cycles = np.zeros((0, max_cycle_length), dtype=np.intp)
+        self._cycle_score = np.zeros(0)
+        self._edge_cycle_ptr = np.zeros(1, dtype=np.intp)
+        self._edge_cycle_idx = np.zeros(0, dtype=np.intp)
+        self._dirty = np.zeros(0, dtype=bool)
+
+    def load_markets(self, markets: Dict[str, Dict[str, Any]]):
+        """Build the currency graph and enumerate cycles from ccxt markets"""
+        src, dst, fees = [], [], []
+        self.currencies = []
+        self._currency_ids = {}
+        self._market_edges = {}
+        self._edge_symbol = []
+        self._edge_side = []
+
+        for symbol, market in markets.items():
+            if not market.get('active', True) or not market.get('spot', True):
+                continue
+            base, quote = market['base'], market['quote']
+            b, q = self._currency_id(base), self._currency_id(quote)
+            fee = market.get('taker')
+            fee = self.default_fee if fee is None else float(fee)
+
+            # Buy edge (quote -> base) followed by sell edge (base -> quote)
+            self._market_edges[symbol] = (len(src), len(src) + 1)
+            src += [q, b]
+            dst += [b, q]
+            fees += [fee, fee]
+            self._edge_symbol += [symbol, symbol]
+            self._edge_side += ['buy', 'sell']
+
+        n_edges = len(src)
+        self._edge_src = np.array(src, dtype=np.intp)
+        self._edge_dst = np.array(dst, dtype=np.intp)
+        self._edge_fee = np.array(fees, dtype=float)
+        # Trailing pad edge with rate 1 lets shorter cycles share one array
+        self._log_rate = np.full(n_edges + 1, -np.inf)
+        self._log_rate[n_edges] = 0.0
+        self._dirty = np.zeros(n_edges + 1, dtype=bool)
+
+        self._build_cycles(n_edges)
+
+    def _currency_id(self, currency: str) -> int:
+        cid = self._currency_ids.get(currency)
+        if cid is None:
+            cid = len(self.currencies)
+            self._currency_ids[currency] = cid
+            self.currencies.append(currency)
+        return cid
+
+    def _build_cycles(self, n_edges: int):
+        """Enumerate simple cycles, each anchored at its smallest currency id"""
+        out_edges: List[List[int]] = [[] for _ in self.currencies]
+        for e in range(n_edges):
+            out_edges[self._edge_src[e]].append(e)
+
+        cycles = []
+        pad = n_edges
+        length = self.max_cycle_length
+
+        def extend(start, node, path, visited):
+            for e in out_edges[node]:
+                nxt = self._edge_dst[e]
+                if nxt == start and len(path) >= 2:
+                    cycles.append(path + [e] + [pad] * (length - len(path) - 1))
+                elif nxt > start and nxt not in visited and len(path) + 1 < length:
+                    visited.add(nxt)
+                    extend(start, nxt, path + [e], visited)
+                    visited.discard(nxt)
+
+        for start in range(len(self.currencies)):
+            extend(start, start, [], {start})
+
+        self._cycles = np.array(cycles, dtype=np.intp).reshape(-1, length)
+        self._cycle_score = np.full(len(self._cycles), -np.inf)
+
+        # Edge -> cycle incidence in CSR form, excluding the pad edge
+        flat_edges = self._cycles.ravel()
+        flat_cycles = np.repeat(np.arange(len(self._cycles)), length)
+        keep = flat_edges != pad
+        flat_edges, flat_cycles = flat_edges[keep], flat_cycles[keep]
+        order = np.argsort(flat_edges, kind='stable')
+        self._edge_cycle_idx = flat_cycles[order]
+        self._edge_cycle_ptr = np.zeros(n_edges + 1, dtype=np.intp)
+        np.cumsum(np.bincount(flat_edges, minlength=n_edges), out=self._edge_cycle_ptr[1:])
+
+    @property
+    def cycle_count(self) -> int:
+        return len(self._cycles)
+
+    def update_prices(self, symbols: Iterable[str], bids: Iterable[float], asks: Iterable[float]):
+        """Update top-of-book prices for many markets in one vectorized step"""
+        buy_edges, sell_edges, keep = [], [], []
+        for i, symbol in enumerate(symbols):
+            edges = self._market_edges.get(symbol)
+            if edges is not None:
+                buy_edges.append(edges[0])
+                sell_edges.append(edges[1])
+                keep.append(i)
+        if not keep:
+            return
+
+        bids = np.asarray(bids, dtype=float)[keep]
+        asks = np.asarray(asks, dtype=float)[keep]
+        buy_edges = np.array(buy_edges, dtype=np.intp)
+        sell_edges = np.array(sell_edges, dtype=np.intp)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            buy_rate = np.where(asks > 0, np.log1p(-self._edge_fee[buy_edges]) - np.log(asks), -np.inf)
+            sell_rate = np.where(bids > 0, np.log(bids) + np.log1p(-self._edge_fee[sell_edges]), -np.inf)
+        self._log_rate[buy_edges] = buy_rate
+        self._log_rate[sell_edges] = sell_rate
+        self._dirty[buy_edges] = True
+        self._dirty[sell_edges] = True
+
+    def update_from_tickers(self, tickers: Dict[str, Dict[str, Any]]):
+        """Update prices from a ccxt fetch_tickers() result"""
+        symbols = list(tickers)
+        self.update_prices(
+            symbols,
+            [tickers[s].get('bid') or 0.0 for s in symbols],
+            [tickers[s].get('ask') or 0.0 for s in symbols]
+        )
+
+    def update_from_order_books(self, order_books: Dict[str, Dict[str, Any]]):
+        """Update prices from top-of-book of many ccxt order books"""
+        symbols = list(order_books)
+        self.update_prices(
+            symbols,
+            [order_books[s]['bids'][0][0] if order_books[s]['bids'] else 0.0 for s in symbols],
+            [order_books[s]['asks'][0][0] if order_books[s]['asks'] else 0.0 for s in symbols]
+        )
+
+    def _rescore(self):
+        """Recompute scores only for cycles touching edges changed since last scan"""
+        dirty = np.flatnonzero(self._dirty)
+        if len(dirty) == 0:
+            return
+        self._dirty[:] = False
+        starts = self._edge_cycle_ptr[dirty]
+        counts = self._edge_cycle_ptr[dirty + 1] - starts
+        if counts.sum() == 0:
+            return
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        affected = np.unique(self._edge_cycle_idx[positions])
+        self._cycle_score[affected] = self._log_rate[self._cycles[affected]].sum(axis=1)
+
+    def _leg(self, e: int) -> Dict[str, Any]:
+        """Describe an edge as an order leg with its top-of-book price and taker fee"""
+        fee_log = math.log1p(-self._edge_fee[e])
+        if self._edge_side[e] == 'buy':
+            price = math.exp(fee_log - self._log_rate[e])
+        else:
+            price = math.exp(self._log_rate[e] - fee_log)
+        return {'symbol': self._edge_symbol[e], 'side': self._edge_side[e], 'price': price,
+                'fee': float(self._edge_fee[e])}
+
+    def find_opportunities(self, min_profit: float = 0.0,
+                           start_currency: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return profitable cycles, most profitable first.
+
+        ``min_profit`` is the minimum net return after fees (0.005 = 0.5%).
+        When ``start_currency`` is given only cycles through it are returned,
+        rotated so their first leg spends that currency.
+        """
+        self._rescore()
+        hits = np.flatnonzero(self._cycle_score > math.log1p(min_profit))
+        if len(hits) == 0:
+            return []
+        hits = hits[np.argsort(-self._cycle_score[hits])]
+
+        start_id = self._currency_ids.get(start_currency) if start_currency else None
+        if start_currency and start_id is None:
+            return []
+
+        pad = len(self._log_rate) - 1
+        opportunities = []
+        for c in hits:
+            edges = [e for e in self._cycles[c] if e != pad]
+            if start_id is not None:
+                sources = [self._edge_src[e] for e in edges]
+                if start_id not in sources:
+                    continue
+                i = sources.index(start_id)
+                edges = edges[i:] + edges[:i]
+            opportunities.append({
+                'path': [self.currencies[self._edge_src[e]] for e in edges] + [self.currencies[self._edge_src[edges[0]]]],
+                'legs': [self._leg(e) for e in edges],
+                'profit': math.expm1(self._cycle_score[c])
+            })
+        return opportunities
@@ -0,0 +1,228 @@
+import os
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from .logger import get_logger
+from .indicators import INDICATORS
+
+OVERBOUGHT, OVERSOLD = 70.0, 30.0  # SignalGenerator's RSI levels
+
+FeatureKey = Tuple[str, Tuple[Tuple[str, int], ...]]
+
+
+def param_grid(rsi: Sequence[int] = (14,), ema: Sequence[int] = (20,),
+               macd: Sequence[Tuple[int, int, int]] = ((12, 26, 9),)) -> List[Dict[str, Dict[str, int]]]:
+    """Every combination, each shaped like SignalGenerator.indicators so the winner can be assigned to it"""
+    return [
+        {
+            'rsi': {'length': r},
+            'ema': {'length': e},
+            'macd': {'fast': fast, 'slow': slow, 'signal': signal},
+            'atr': {'length': 14}
+        }
+        for r, e, (fast, slow, signal) in itertools.product(rsi, ema, macd)
+        if fast < slow
+    ]
+
+
+def _feature_keys(params: Dict[str, Dict[str, int]]) -> Dict[str, FeatureKey]:
+    """The indicator computations one parameter set needs, as cache keys"""
+    macd = params['macd']
+    return {
+        'rsi': ('rsi', (('period', params['rsi']['length']),)),
+        'ema': ('ema', (('period', params['ema']['length']),)),
+        'macd': ('macd', (('fast', macd['fast']), ('signal', macd['signal']), ('slow', macd['slow'])))
+    }
+
+
+def _compute_feature(key: FeatureKey, bars: Dict[str, np.ndarray]) -> Tuple[FeatureKey, Dict[str, np.ndarray]]:
+    """One indicator over the whole history; runs in a worker process"""
+    indicator, params = key
+    return key, INDICATORS[indicator](bars, **dict(params))
+
+
+def _positions(close: np.ndarray, features: Dict[str, np.ndarray]) -> np.ndarray:
+    """Position held after each bar: SignalGenerator.get_direction, kept until the direction flips"""
+    rsi, ema = features['rsi'], features['ema']
+    macd, signal = features['macd']['main'], features['macd']['signal']
+    ready = ~(np.isnan(rsi) | np.isnan(ema) | np.isnan(signal))
+    bullish = (close > ema) & (macd > signal)
+    bearish = (close <= ema) & (macd <= signal)
+    direction = np.where(ready & bullish & ~(rsi > OVERBOUGHT), 1,
+                         np.where(ready & bearish & ~(rsi < OVERSOLD), -1, 0))
+    last = np.maximum.accumulate(np.where(direction != 0, np.arange(len(direction)), 0))
+    return direction[last].astype(np.int8)
+
+
+def _window_returns(positions: np.ndarray, bar_returns: np.ndarray, cost: float) -> np.ndarray:
+    """Per-bar strategy returns; positions carry one extra leading column, the position held before"""
+    held = positions[:, 1:].astype(float)
+    return held * bar_returns - cost * np.abs(np.diff(positions, axis=1))
+
+
+def _score(returns: np.ndarray, objective: str) -> np.ndarray:
+    if objective == 'return':
+        return returns.sum(axis=-1)
+    std = returns.std(axis=-1)
+    return np.where(std > 0, returns.mean(axis=-1) / np.where(std > 0, std, 1.0), 0.0)
+
+
+def _optimize_window(train_positions: np.ndarray, train_returns: np.ndarray,
+                     test_positions: np.ndarray, test_returns: np.ndarray,
+                     cost: float, objective: str) -> Dict[str, Any]:
+    """Pick the best parameter set in-sample and trade it out of sample; runs in a worker process"""
+    scores = _score(_window_returns(train_positions, train_returns, cost), objective)
+    best = int(np.argmax(scores))
+    oos = _window_returns(test_positions[best:best + 1], test_returns, cost)[0]
+    return {'best': best, 'train_score': float(scores[best]), 'returns': oos}
+
+
+class WalkForward:
+    """Walk-forward optimization of SignalGenerator parameters.
+    
+    History is split into rolling (or anchored) train windows, each
+    followed by a test window. Every indicator the grid needs is computed
+    once over the whole history and cached: the indicators only look back,
+    so slicing them per window matches recomputing them inside it, with
+    warm-up taken from earlier bars. Parameter sets then share indicators
+    (one EMA for every RSI length) and windows share everything. The
+    indicator computations and the window optimizations are spread across
+    WF_WORKERS processes. The test windows' returns, each traded with its
+    own window's winner, are stitched into one out-of-sample equity curve.
+    """
+    
+    def __init__(self, history: pd.DataFrame, cost_bps: Optional[float] = None,
+                 workers: Optional[int] = None):
+        self.logger = self._setup_logger()
+        if len(history) < 3:
+            raise ValueError("Not enough history for walk-forward")
+        self.history = history.reset_index(drop=True)
+        self.bars = {column: self.history[column].to_numpy(dtype=float) for column in ('open', 'high', 'low', 'close')}
+        close = self.bars['close']
+        self.bar_returns = close[1:] / close[:-1] - 1.0  # Return of holding from bar t's close to t + 1's
+        self.cost = (cost_bps if cost_bps is not None else float(os.getenv('WF_COST_BPS', '1.0'))) / 10000.0
+        self.workers = workers or int(os.getenv('WF_WORKERS', str(os.cpu_count() or 1)))
+        self.train_bars = int(os.getenv('WF_TRAIN_BARS', '5000'))
+        self.test_bars = int(os.getenv('WF_TEST_BARS', '1000'))
+        self.cache: Dict[FeatureKey, Dict[str, np.ndarray]] = {}
+        self._positions: Dict[tuple, np.ndarray] = {}
+        
+    @classmethod
+    def from_backfill(cls, backfill, symbol: str, timeframe: str = '1m', start: Optional[int] = None,
+                      end: Optional[int] = None, **kwargs):
+        """Walk forward over candles stored by the historical backfill"""
+        return cls(backfill.load(symbol, timeframe, start, end), **kwargs)
+        
+    def _setup_logger(self):
+        return get_logger('walk_forward', 'walk_forward.log')
+        
+    def _map(self, fn, jobs: List[tuple], workers: int) -> list:
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                return list(pool.map(fn, *zip(*jobs), chunksize=max(1, len(jobs) // (workers * 4))))
+        return [fn(*job) for job in jobs]
+        
+    def positions(self, grid: List[Dict[str, Dict[str, int]]], workers: Optional[int] = None) -> np.ndarray:
+        """Position matrix (parameter set x bar), computing only indicators not cached yet"""
+        keys = [_feature_keys(params) for params in grid]
+        missing = sorted({key for needed in keys for key in needed.values()} - set(self.cache))
+        if missing:
+            for key, buffers in self._map(_compute_feature, [(key, self.bars) for key in missing],
+                                          workers or self.workers):
+                self.cache[key] = buffers
+        matrix = np.empty((len(grid), len(self.history)), dtype=np.int8)
+        for row, needed in enumerate(keys):
+            cache_key = tuple(needed.values())
+            if cache_key not in self._positions:
+                features = {
+                    'rsi': self.cache[needed['rsi']]['main'],
+                    'ema': self.cache[needed['ema']]['main'],
+                    'macd': self.cache[needed['macd']]
+                }
+                self._positions[cache_key] = _positions(self.bars['close'], features)
+            matrix[row] = self._positions[cache_key]
+        return matrix
+        
+    def windows(self, train_bars: int, test_bars: int, anchored: bool = False) -> List[Tuple[int, int, int]]:
+        """(train start, test start, test end) bar indices; test windows tile the history without overlap"""
+        last = len(self.bar_returns)
+        return [
+            (0 if anchored else start - train_bars, start, min(start + test_bars, last))
+            for start in range(train_bars, last, test_bars)
+        ]
+        
+    def _timestamp(self, index: int) -> Any:
+        if 'timestamp' not in self.history:
+            return index
+        return str(self.history['timestamp'].iloc[min(index, len(self.history) - 1)])
+        
+    def run(self, grid: Optional[List[Dict[str, Dict[str, int]]]] = None, train_bars: Optional[int] = None,
+            test_bars: Optional[int] = None, anchored: bool = False, objective: Optional[str] = None,
+            initial_equity: float = 10000.0, workers: Optional[int] = None) -> Dict[str, Any]:
+        """Optimize every window over the grid and report the stitched out-of-sample result"""
+        started = time.perf_counter()
+        grid = grid or param_grid(rsi=(7, 14, 21), ema=(10, 20, 50), macd=((8, 21, 5), (12, 26, 9)))
+        objective = objective or os.getenv('WF_OBJECTIVE', 'sharpe')
+        if objective not in ('sharpe', 'return'):
+            raise ValueError(f"Unknown objective: {objective}")
+        train_bars, test_bars = train_bars or self.train_bars, test_bars or self.test_bars
+        workers = workers or self.workers
+        windows = self.windows(train_bars, test_bars, anchored)
+        if not windows:
+            raise ValueError(f"Need more than {train_bars} bars for one train window")
+            
+        positions = self.positions(grid, workers)
+        # Each slice carries the position held before it, so entering at a window start is charged
+        jobs = [(
+            positions[:, max(train_start - 1, 0):test_start] if train_start else
+            np.concatenate([np.zeros((len(grid), 1), np.int8), positions[:, :test_start]], axis=1),
+            self.bar_returns[train_start:test_start],
+            positions[:, test_start - 1:test_end],
+            self.bar_returns[test_start:test_end],
+            self.cost, objective
+        ) for train_start, test_start, test_end in windows]
+        results = self._map(_optimize_window, jobs, workers)
+        
+        folds, oos = [], []
+        for (train_start, test_start, test_end), result in zip(windows, results):
+            returns = result['returns']
+            oos.append(returns)
+            folds.append({
+                'train': (self._timestamp(train_start), self._timestamp(test_start)),
+                'test': (self._timestamp(test_start), self._timestamp(test_end)),
+                'params': grid[result['best']],
+                'train_score': result['train_score'],
+                'test_return': float(np.prod(1.0 + returns) - 1.0),
+                'test_score': float(_score(returns, objective))
+            })
+        returns = np.concatenate(oos)
+        equity = initial_equity * np.cumprod(1.0 + returns)
+        peak = np.maximum.accumulate(np.concatenate(([initial_equity], equity)))[1:]
+        first = windows[0][1]
+        elapsed = time.perf_counter() - started
+        summary = {
+            'folds': len(folds),
+            'param_sets': len(grid),
+            'bars': len(returns),
+            'objective': objective,
+            'total_return': float(equity[-1] / initial_equity - 1.0),
+            'sharpe': float(_score(returns, 'sharpe')),
+            'max_drawdown': float(((peak - equity) / peak).max()),
+            'cached_indicators': len(self.cache),
+            'seconds': elapsed,
+            'evaluations_per_second': len(grid) * len(folds) / elapsed if elapsed else None
+        }
+        self.logger.info("Walk-forward: %d folds x %d parameter sets, OOS return %.4f in %.2fs",
+                         len(folds), len(grid), summary['total_return'], elapsed)
+        return {
+            'summary': summary,
+            'folds': folds,
+            'equity': [
+                {'timestamp': self._timestamp(first + i + 1), 'equity': float(value)}
+                for i, value in enumerate(equity)
+            ]
+        }
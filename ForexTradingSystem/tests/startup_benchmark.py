@@ -0,0 +1,62 @@
+"""Import and construction time of the trading system entry points.
+
+Each measurement runs in a fresh interpreter so module caches from earlier
+runs do not hide import cost:
+
+    python tests/startup_benchmark.py --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+module = __import__({module!r})
+imported = time.perf_counter()
+instance = getattr(module, {cls!r})()
+built = time.perf_counter()
+print(json.dumps({{
+    'import': imported - start,
+    'construct': built - imported,
+    'modules': len(sys.modules)
+}}))
+"""
+
+TARGETS = {
+    'main': 'TradingSystem',
+    'api_server': 'APIServer',
+}
+
+
+def measure(module: str, cls: str) -> dict:
+    """Run one cold import + construct of module.cls in a subprocess"""
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(module=module, cls=cls)],
+        cwd=ROOT, capture_output=True, text=True, timeout=300
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} failed to start:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('targets', nargs='*', default=list(TARGETS))
+    args = parser.parse_args()
+    
+    for module in args.targets:
+        samples = [measure(module, TARGETS[module]) for _ in range(args.runs)]
+        print(f"{module}: import {statistics.median(s['import'] for s in samples) * 1000:.1f} ms, "
+              f"construct {statistics.median(s['construct'] for s in samples) * 1000:.1f} ms, "
+              f"{samples[-1]['modules']} modules loaded")
+
+
+if __name__ == '__main__':
+    main()
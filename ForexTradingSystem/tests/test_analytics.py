@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from ForexTradingSystem.modules.analytics import AnalyticsRollups, parse_timeframe, resolution_for
+from ForexTradingSystem.modules.performance import PerformanceTracker
+
+DAY = 86400.0
+
+
+def max_drawdown(profits):
+    equity = np.concatenate([[0.0], np.cumsum(profits)])
+    return float(np.max(np.maximum.accumulate(equity) - equity))
+
+
+@pytest.mark.parametrize('resolution', ['1m', '1h', '1d'])
+def test_merged_buckets_match_a_scan_of_the_trades(resolution):
+    rng = np.random.default_rng(7)
+    times = np.sort(rng.uniform(0, 3 * DAY, 500))
+    profits = rng.normal(0.5, 10.0, 500).round(2)
+    rollups = AnalyticsRollups()
+    for ts, profit in zip(times, profits):
+        rollups.on_trade('bot-1', 'EURUSD', profit, ts)
+        
+    # Whole buckets at every resolution: the last two days
+    result = rollups.query('2d', resolution=resolution, end=3 * DAY)
+    window = profits[times >= DAY]
+    summary = result['summary']
+    assert summary['trades'] == len(window)
+    assert summary['wins'] == int((window > 0).sum())
+    assert summary['pnl'] == pytest.approx(window.sum())
+    assert summary['max_drawdown'] == pytest.approx(max_drawdown(window))
+    assert result['series'][-1]['cumulative_pnl'] == pytest.approx(window.sum())
+
+
+def test_fills_roll_up_per_bot_and_symbol():
+    rollups = AnalyticsRollups()
+    tracker = PerformanceTracker()
+    tracker.rollups = rollups
+    tracker.on_fill('bot-1', 'EURUSD', 'BUY', 1.0, 1.10, ts=100)
+    tracker.on_fill('bot-1', 'EURUSD', 'SELL', 1.0, 1.12, ts=200)
+    tracker.on_fill('bot-2', 'GBPUSD', 'SELL', 2.0, 1.30, ts=300)
+    tracker.on_fill('bot-2', 'GBPUSD', 'BUY', 2.0, 1.31, ts=4000)
+    
+    everything = rollups.query('1d', end=DAY)
+    assert everything['resolution'] == '1h'
+    assert (everything['summary']['fills'], everything['summary']['volume']) == (4, 6.0)
+    assert everything['summary']['pnl'] == pytest.approx(0.02 - 0.02)
+    assert everything['winRate'] == [{'name': 'Wins', 'value': 1}, {'name': 'Losses', 'value': 1}]
+    assert [point['value'] for point in everything['tradeVolume']] == [4.0, 2.0]
+    
+    bot2 = rollups.query('1d', bot_id='bot-2', end=DAY)['summary']
+    assert (bot2['trades'], bot2['wins'], bot2['max_drawdown']) == (1, 0, pytest.approx(0.02))
+    assert rollups.query('1d', symbol='EURUSD', end=DAY)['summary']['win_rate'] == 100
+    assert rollups.query('1d', bot_id='bot-1', symbol='GBPUSD', end=DAY)['series'] == []
+
+
+def test_timeframes_and_retention(monkeypatch):
+    assert parse_timeframe('15m') == 900 and parse_timeframe('1w') == 7 * DAY
+    assert parse_timeframe('all') is None
+    with pytest.raises(ValueError):
+        parse_timeframe('yesterday')
+    assert [resolution_for(parse_timeframe(t)) for t in ('1h', '1d', '1M', 'all')] == ['1m', '1h', '1d', '1d']
+    
+    monkeypatch.setenv('ANALYTICS_RETENTION_1M', '3600')
+    rollups = AnalyticsRollups()
+    rollups.on_trade('bot-1', 'EURUSD', 5.0, ts=0)
+    rollups.on_trade('bot-1', 'EURUSD', 5.0, ts=DAY)
+    assert rollups.query('all', resolution='1m', end=DAY)['summary']['trades'] == 1
+    assert rollups.query('all', end=DAY)['summary']['trades'] == 2
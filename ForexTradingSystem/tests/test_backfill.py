@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from ForexTradingSystem.modules.backfill import Backfill
+from ForexTradingSystem.modules.poll_scheduler import TokenBucket
+
+MINUTE = 60000
+
+
+class FakeExchange:
+    def __init__(self, first, last, fail_after=None):
+        self.first, self.last = first, last  # Listed candle range, inclusive
+        self.calls = 0
+        self.fail_after = fail_after
+        
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise IOError('connection reset')
+        start = max(since, self.first)
+        return [[t, 1.0, 2.0, 0.5, t / MINUTE, 1.0]
+                for t in range(start, min(self.last + MINUTE, start + limit * MINUTE), MINUTE)]
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv('BACKFILL_PAGE_LIMIT', '10')
+    monkeypatch.setenv('BACKFILL_CHUNK_PAGES', '3')
+    monkeypatch.setenv('BACKFILL_WORKERS', '3')
+
+
+def make(tmp_path, exchange):
+    return Backfill(exchange, str(tmp_path / 'history.db'), bucket=TokenBucket(1e6, 1e6))
+
+
+def _end():
+    # A fixed minute well in the past keeps every chunk closed
+    now = int(time.time() * 1000)
+    return now - now % MINUTE - 100 * MINUTE
+
+
+def test_backfill_paginates_and_deduplicates(tmp_path, env):
+    end = _end()
+    start = end - 95 * MINUTE
+    backfill = make(tmp_path, FakeExchange(start, end))
+    stored = backfill.run(['BTC/USDT'], ['1m'], days=95 / 1440, end=end)
+    assert stored == {('BTC/USDT', '1m'): 95}
+    df = backfill.load('BTC/USDT', '1m')
+    assert len(df) == 95
+    assert df['timestamp'].is_monotonic_increasing
+    
+    # Everything is checkpointed; a second run fetches nothing
+    calls = backfill.exchange.calls
+    assert backfill.run(['BTC/USDT'], ['1m'], days=95 / 1440, end=end) == {}
+    assert backfill.exchange.calls == calls
+
+
+def test_resume_after_failure_only_fetches_missing_chunks(tmp_path, env):
+    end = _end()
+    start = end - 120 * MINUTE
+    backfill = make(tmp_path, FakeExchange(start, end, fail_after=5))
+    backfill.workers = 1
+    backfill.run(['BTC/USDT'], ['1m'], days=120 / 1440, end=end)
+    partial = len(backfill.load('BTC/USDT', '1m'))
+    assert 0 < partial < 120
+    
+    backfill.exchange = FakeExchange(start, end)
+    backfill.run(['BTC/USDT'], ['1m'], days=120 / 1440, end=end)
+    assert len(backfill.load('BTC/USDT', '1m')) == 120
+    assert backfill.exchange.calls == (120 - partial) // 10
+
+
+def test_downtime_gap_is_filled_and_empty_ranges_are_not_refetched(tmp_path, env):
+    end = _end() - 30 * MINUTE
+    start = end - 60 * MINUTE
+    # Listing began 20 minutes into the range
+    backfill = make(tmp_path, FakeExchange(start + 20 * MINUTE, end + 30 * MINUTE))
+    backfill.run(['BTC/USDT'], ['1m'], days=60 / 1440, end=end)
+    assert len(backfill.load('BTC/USDT', '1m')) == 40
+    
+    # Restart 30 minutes later: only the downtime is missing
+    assert backfill.missing_ranges('BTC/USDT', '1m', start, end + 30 * MINUTE) == [
+        (end, end + 30 * MINUTE)
+    ]
+    backfill.exchange.calls = 0
+    backfill.run(['BTC/USDT'], ['1m'], days=90 / 1440, end=end + 30 * MINUTE)
+    assert len(backfill.load('BTC/USDT', '1m')) == 70
+    assert backfill.exchange.calls == 3
@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+
+from ForexTradingSystem.modules.bar_aggregator import BarAggregator
+
+MINUTE = 60000
+
+
+def feed(aggregator, minutes, symbol='EUR/USD', start=0):
+    for i in minutes:
+        price = float(i)
+        aggregator.on_bar(symbol, start + i * MINUTE, price, price + 2, price - 1, price + 1, 1.0)
+
+
+def test_five_minute_bars_close_on_their_last_base_bar():
+    aggregator = BarAggregator('1m', ['5m', '15m'])
+    closed = []
+    aggregator.subscribe('5m', lambda s, tf, bar: closed.append(bar))
+    feed(aggregator, range(7))
+    assert len(closed) == 1
+    bar = closed[0]
+    assert (bar['timestamp'], bar['open'], bar['high'], bar['low'], bar['close'], bar['volume']) == \
+        (0, 0.0, 6.0, -1.0, 5.0, 5.0)
+    assert bar['complete']
+    
+    partial = aggregator.partial('EUR/USD', '5m')
+    assert partial['timestamp'] == 5 * MINUTE and partial['bars'] == 2
+    assert aggregator.partial('EUR/USD', '15m')['bars'] == 7
+
+
+def test_gap_closes_incomplete_bar_and_duplicates_are_ignored():
+    aggregator = BarAggregator('1m', ['5m'])
+    feed(aggregator, [0, 1, 1, 7])
+    history = aggregator.history('EUR/USD', '5m')
+    assert list(history['bars']) == [2]
+    assert not history['complete'].iloc[0]
+    assert len(aggregator.history('EUR/USD', '5m', include_partial=True)) == 2
+
+
+def test_symbol_filter_and_unsupported_timeframe():
+    aggregator = BarAggregator('1m', ['5m'])
+    seen = []
+    aggregator.subscribe('5m', lambda s, tf, bar: seen.append(s), symbol='GBP/USD')
+    feed(aggregator, range(5), symbol='EUR/USD')
+    feed(aggregator, range(5), symbol='GBP/USD')
+    assert seen == ['GBP/USD']
+    with pytest.raises(ValueError):
+        aggregator.subscribe('1h', print)
+    with pytest.raises(ValueError):
+        BarAggregator('5m', ['7m'])
+
+
+def test_on_frame_accepts_datafeed_rows():
+    aggregator = BarAggregator('1m', ['5m'])
+    frame = pd.DataFrame({
+        'timestamp': pd.to_datetime([i * MINUTE for i in range(10)], unit='ms'),
+        'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 3.0
+    })
+    aggregator.on_frame('EUR/USD', frame)
+    aggregator.on_frame('EUR/USD', frame)
+    history = aggregator.history('EUR/USD', '5m')
+    assert list(history['volume']) == [15.0, 15.0]
+    assert history['timestamp'].iloc[1] == pd.Timestamp(5 * MINUTE, unit='ms')
+
+
+def test_on_frame_waits_for_the_forming_candle_to_close():
+    aggregator = BarAggregator('1m', ['5m'])
+    frame = pd.DataFrame({
+        'timestamp': pd.to_datetime([3 * MINUTE, 4 * MINUTE], unit='ms'),
+        'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': [1.5, 1.6], 'volume': 3.0
+    })
+    aggregator.on_frame('EUR/USD', frame, now=4.5 * MINUTE / 1000)
+    assert list(aggregator.history('EUR/USD', '1m')['close']) == [1.5]
+    
+    frame.loc[1, ['close', 'volume']] = (1.8, 7.0)  # The 4th minute's final snapshot
+    aggregator.on_frame('EUR/USD', frame, now=5 * MINUTE / 1000)
+    assert list(aggregator.history('EUR/USD', '1m')['close']) == [1.5, 1.8]
+    assert list(aggregator.history('EUR/USD', '5m')['volume']) == [10.0]
+
+
+def test_on_frame_skips_rows_already_fed(monkeypatch):
+    aggregator = BarAggregator('1m', ['5m'])
+    frame = pd.DataFrame({
+        'timestamp': pd.to_datetime([i * MINUTE for i in range(10)], unit='ms'),
+        'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 3.0
+    })
+    aggregator.on_frame('EUR/USD', frame.iloc[:8])
+    fed = []
+    monkeypatch.setattr(aggregator, 'on_bar', lambda symbol, ts, *row: fed.append(ts))
+    aggregator.on_frame('EUR/USD', frame)
+    assert fed == [8 * MINUTE, 9 * MINUTE]
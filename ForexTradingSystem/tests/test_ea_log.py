@@ -0,0 +1,83 @@
+import os
+
+from ForexTradingSystem.modules.ea_log import EALogIngester, EALogTail
+from ForexTradingSystem.modules.journal import TradeJournal
+
+HEADER = 'Time\tSymbol\tType\tVolume\tPrice\tStop Loss\tTake Profit\tProfit\r\n'
+TRADE = '2024.01.15 10:30:45\tEURUSD\tBUY\t0.1\t1.0950\t1.0900\t1.1050\t0\r\n'
+
+
+def append(path, text, encoding='utf-16-le'):
+    with open(path, 'ab') as f:
+        f.write(text.encode(encoding))
+
+
+def update_profit(path, profit, encoding='utf-16-le'):
+    """What UpdateMonitoring() does: seek one byte back from the end and write"""
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(f'{profit}\r\n'.encode(encoding))
+
+
+def test_utf16_log_is_read_incrementally_with_profit_rewrites(tmp_path):
+    path = str(tmp_path / 'PUR_EA_Log.csv')
+    with open(path, 'wb') as f:
+        f.write(b'\xff\xfe')
+    append(path, HEADER + TRADE + TRADE[:20])
+    tail = EALogTail(path)
+    [trade] = tail.poll()
+    assert trade['bot_id'] == 'PUR_EA_Log'
+    assert (trade['symbol'], trade['side'], trade['volume'], trade['price']) == ('EURUSD', 'BUY', 0.1, 1.095)
+    assert trade['ts'] == 1705314645.0
+    
+    # The rest of the partial line arrives, then profit overwrites its last byte
+    append(path, TRADE[20:].replace('BUY', 'SELL'))
+    update_profit(path, 12.5)
+    append(path, 'Statistics:\r\nTotal Trades:\t2\r\n')
+    sell, profit = tail.poll()
+    assert sell['side'] == 'SELL'
+    assert (profit['type'], profit['symbol'], profit['profit']) == ('profit', 'EURUSD', 12.5)
+    assert tail.poll() == []
+
+
+def test_truncation_and_rotation_restart_from_the_new_file(tmp_path):
+    path = str(tmp_path / 'terminal1.csv')
+    rows = [TRADE.replace('\t', ';').replace('EURUSD', symbol) for symbol in ('EURUSD', 'GBPUSD', 'USDJPY')]
+    append(path, rows[0] + rows[1], 'cp1252')
+    tail = EALogTail(path)
+    assert [r['symbol'] for r in tail.poll()] == ['EURUSD', 'GBPUSD']
+    
+    # The EA reopens its log with FILE_WRITE
+    with open(path, 'wb') as f:
+        f.write(rows[2].encode())
+    assert [r['symbol'] for r in tail.poll()] == ['USDJPY']
+    
+    # Rotated: the old file's last rows are read before following the new one
+    append(path, rows[0], 'cp1252')
+    os.rename(path, path + '.1')
+    append(path, rows[1], 'cp1252')
+    assert [r['symbol'] for r in tail.poll()] == ['EURUSD', 'GBPUSD']
+
+
+def test_ingester_journals_records_and_resumes_from_checkpoint(tmp_path):
+    logs = tmp_path / 'logs'
+    logs.mkdir()
+    for name in ('terminal1', 'terminal2'):
+        append(str(logs / f'{name}.csv'), HEADER + TRADE)
+    update_profit(str(logs / 'terminal2.csv'), -3.25)
+    
+    journal = TradeJournal(str(tmp_path / 'journal.db'))
+    pattern, state = str(logs / '*.csv'), str(tmp_path / 'state.json')
+    assert len(EALogIngester(journal, [pattern], state_path=state).poll()) == 3
+    append(str(logs / 'terminal1.csv'), TRADE)
+    # A restarted ingester only picks up the new row
+    assert len(EALogIngester(journal, [pattern], state_path=state).poll()) == 1
+    journal.flush()
+    
+    fills = journal.query('fills')
+    assert sorted(f['bot_id'] for f in fills) == ['terminal1', 'terminal1', 'terminal2']
+    assert fills[0]['data']['stop_loss'] == 1.09
+    assert journal.query('pnl') == []  # Open-position profit is not realized PnL
+    [pnl] = journal.query('position_pnl')
+    assert (pnl['bot_id'], pnl['symbol'], pnl['amount']) == ('terminal2', 'EURUSD', -3.25)
+    journal.close()
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from ForexTradingSystem.modules.hedge_optimizer import HedgeOptimizer
+
+@pytest.fixture
+def optimizer():
+    rng = np.random.default_rng(7)
+    btc = rng.normal(0, 0.02, 400)
+    eth = 1.5 * btc + rng.normal(0, 0.005, 400)
+    closes = np.exp(np.cumsum(np.column_stack([btc, eth]), axis=0))
+    opt = HedgeOptimizer(['BTC/USDT', 'ETH/USDT'], cost_aversion=0.0)
+    opt.update_returns(closes)
+    return opt
+
+def test_self_hedge_matches_ratio(optimizer):
+    target = optimizer.solve({'BTC/USDT': 1000.0}, ['BTC/USDT'], [0.0], 0.5)
+    assert target[0] == pytest.approx(-500.0)
+
+def test_cross_hedge_uses_beta(optimizer):
+    beta = optimizer.betas(['ETH/USDT'], ['BTC/USDT'])[0, 0]
+    assert beta == pytest.approx(1.5, rel=0.05)
+    target = optimizer.solve({'ETH/USDT': 1000.0}, ['BTC/USDT'], [0.0], 1.0)
+    assert target[0] == pytest.approx(-1000.0 * beta)
+
+def test_cost_shrinks_hedge(optimizer):
+    free = optimizer.solve({'BTC/USDT': 1000.0}, ['BTC/USDT'], [0.0], 1.0)
+    optimizer.cost_aversion = 1.0
+    costly = optimizer.solve({'BTC/USDT': 1000.0}, ['BTC/USDT'], [0.5], 1.0)
+    assert abs(costly[0]) < abs(free[0])
+
+def test_unknown_assets_need_no_hedge(optimizer):
+    assert optimizer.solve({'XRP/USDT': 1000.0}, ['BTC/USDT'], [0.0], 1.0).tolist() == [0.0]
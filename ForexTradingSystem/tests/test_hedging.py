@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+import numpy as np
+
+from ForexTradingSystem.modules.hedging import Hedging
+
+HOUR = 3600000
+
+
+class FakeExchange:
+    markets = {'BTC/USDT': {'taker': 0.001}, 'ETH/USDT': {'taker': 0.001}}
+    has = {}
+    
+    def __init__(self):
+        self.ticker_requests = []
+        
+    def load_markets(self):
+        return self.markets
+        
+    def fetch_balance(self):
+        return {'total': {'USDT': 1000.0, 'ETH': 2.0, 'LDBTC': 0.5, 'DUST': 0.0001, 'XRP': 0.0}}
+        
+    def fetch_tickers(self, symbols):
+        unknown = set(symbols) - set(self.markets)
+        if unknown:
+            raise ValueError(f"BadSymbol: {unknown}")
+        self.ticker_requests.append(symbols)
+        return {s: {'last': 100.0, 'bid': 99.9, 'ask': 100.1} for s in symbols}
+        
+    def fetch_ohlcv(self, symbol, timeframe, limit=500):
+        # ETH moves with BTC but was listed later: 300 candles against BTC's 500
+        closes = 100 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.01, 500)))
+        start = 200 if symbol == 'ETH/USDT' else 0
+        return [[i * HOUR, 0, 0, 0, closes[i], 0] for i in range(start, 500)]
+
+
+def test_unlisted_balances_and_short_histories_do_not_stop_hedging(monkeypatch):
+    monkeypatch.setenv('HEDGE_INSTRUMENTS', 'BTC/USDT')
+    hedging = Hedging()
+    hedging.exchange = FakeExchange()
+    positions = hedging._get_positions()
+    assert hedging._asset_symbols(positions) == ['ETH/USDT']
+    
+    placed = []
+    hedging._place_hedge_orders = placed.extend
+    hedging.manage_hedges()
+    assert hedging.exchange.ticker_requests == [['BTC/USDT', 'ETH/USDT']]
+    assert hedging._optimizer.symbols == ['BTC/USDT', 'ETH/USDT']
+    assert placed and placed[0]['symbol'] == 'BTC/USDT' and placed[0]['side'] == 'sell'
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from ForexTradingSystem.modules import indicators
+from ForexTradingSystem.modules.bar_aggregator import BarAggregator
+from ForexTradingSystem.modules.indicators import IndicatorCache, compute, rsi, sma
+from ForexTradingSystem.modules.mt_execution import MTExecution
+
+MINUTE = 60000
+
+
+def feed(aggregator, minutes, symbol='EUR/USD'):
+    for i in minutes:
+        price = 1.1 + 0.001 * np.sin(i / 3.0) + 0.0001 * i
+        aggregator.on_bar(symbol, i * MINUTE, price, price + 0.0005, price - 0.0005, price, 1.0)
+
+
+def test_vectorized_indicators_match_reference():
+    close = np.linspace(1.0, 2.0, 50) + 0.05 * np.sin(np.arange(50))
+    expected = pd.Series(close).rolling(10).mean().to_numpy()
+    np.testing.assert_allclose(sma(close, 10), expected, equal_nan=True)
+    
+    assert np.isnan(rsi(close, 14)[:14]).all()
+    assert rsi(np.arange(30.0), 14)[-1] == 100.0
+    
+    frame = pd.DataFrame({'open': close, 'high': close + 0.1, 'low': close - 0.1, 'close': close})
+    pur = compute('PUR', frame)
+    assert set(pur) == {'main', 'trend', 'overbought', 'oversold'}
+    assert pur['trend'][-1] == 1.0 and -1.0 <= pur['main'][-1] <= 1.0
+    macd = compute('macd', frame, {'fast': 12, 'slow': 26, 'signal': 9})
+    np.testing.assert_allclose(macd['histogram'][-1], macd['main'][-1] - macd['signal'][-1])
+
+
+def test_cache_serves_until_next_bar_close(monkeypatch):
+    aggregator = BarAggregator('1m', ['5m'])
+    cache = IndicatorCache(aggregator)
+    calls = []
+    original = indicators.compute
+    monkeypatch.setattr(indicators, 'compute', lambda *a: calls.append(a) or original(*a))
+    
+    feed(aggregator, range(5 * 20))
+    assert cache.get('EUR/USD', 'M5', 'rsi', {'period': 14})['source'] == 'local'
+    first = cache.get('EUR/USD', '5m', 'rsi', {'period': 14})
+    assert len(calls) == 1
+    
+    feed(aggregator, range(100, 104))  # Still inside the forming 5m bar
+    assert cache.get('EUR/USD', '5m', 'rsi', {'period': 14}) == first
+    assert len(calls) == 1
+    
+    feed(aggregator, [104])
+    second = cache.get('EUR/USD', '5m', 'rsi', {'period': 14})
+    assert len(calls) == 2 and second['timestamp'] == first['timestamp'] + 5 * MINUTE
+
+
+def test_cache_declines_what_it_cannot_compute():
+    aggregator = BarAggregator('1m', ['5m'])
+    cache = IndicatorCache(aggregator)
+    feed(aggregator, range(20))
+    assert cache.get('EUR/USD', '5m', 'rsi', {'period': 14}) is None  # Not enough 5m bars
+    assert cache.get('EUR/USD', '1h', 'rsi', {'period': 14}) is None  # Not aggregated
+    assert cache.get('EUR/USD', '1m', 'ichimoku', {}) is None
+    assert cache.get('EUR/USD', '1m', 'rsi', {'length': 14}) is None
+
+
+def test_calculate_indicator_falls_back_to_bridge():
+    class Response:
+        def raise_for_status(self):
+            pass
+            
+        def json(self):
+            return {'value': 42.0}
+            
+    class Session:
+        posts = []
+        
+        def post(self, url, data=None):
+            self.posts.append(url)
+            return Response()
+            
+    mt = MTExecution('http://bridge', 'key')
+    mt.session = Session()
+    aggregator = BarAggregator('1m', ['5m'])
+    mt.indicators = IndicatorCache(aggregator)
+    feed(aggregator, range(40))
+    
+    assert mt.calculate_indicator('EUR/USD', 'M1', 'RSI', {'period': 14})['source'] == 'local'
+    assert mt.session.posts == []
+    assert mt.calculate_indicator('EUR/USD', 'M1', 'Ichimoku', {}) == {'value': 42.0}
+    assert mt.session.posts == ['http://bridge/mql/indicator']
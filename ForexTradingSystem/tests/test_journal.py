@@ -0,0 +1,53 @@
+import pytest
+from ForexTradingSystem.modules.journal import TradeJournal
+
+@pytest.fixture
+def journal(tmp_path):
+    j = TradeJournal(str(tmp_path / 'journal.db'), flush_interval=0.01)
+    yield j
+    j.close()
+
+def test_wal_mode(journal):
+    assert journal._reader().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+def test_records_are_written_behind_and_queryable(journal):
+    journal.record_signal({'symbol': 'EURUSD', 'direction': 'long', 'volume': 0.1, 'bot_id': 'bot-1'}, ts=100.0)
+    journal.record_order('EURUSD', 'BUY', 0.1, 1.1, ref=12345, bot_id='bot-1', data={'ticket': 12345}, ts=101.0)
+    journal.record_fill('EURUSD', 'BUY', 0.1, 1.1001, ref=12345, bot_id='bot-1', ts=102.0)
+    journal.record_fill('GBPUSD', 'SELL', 0.2, 1.25, bot_id='bot-2', ts=103.0)
+    journal.record_pnl(12.5, symbol='EURUSD', bot_id='bot-1', ts=104.0)
+    assert journal.flush()
+    
+    signal, = journal.query('signals')
+    assert signal['bot_id'] == 'bot-1' and signal['data']['direction'] == 'long'
+    order, = journal.query('orders', bot_id='bot-1')
+    assert order['ref'] == '12345' and order['data'] == {'ticket': 12345}
+    assert [f['symbol'] for f in journal.query('fills')] == ['EURUSD', 'GBPUSD']
+    assert [f['symbol'] for f in journal.query('fills', start=102.5)] == ['GBPUSD']
+    assert [f['symbol'] for f in journal.query('fills', symbol='EURUSD', end=102.5)] == ['EURUSD']
+    assert journal.query('pnl')[0]['amount'] == 12.5
+
+def test_persists_across_restart(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    first = TradeJournal(path)
+    first.record_fill('EURUSD', 'BUY', 0.1, 1.1)
+    first.close()
+    second = TradeJournal(path)
+    assert len(second.query('fills')) == 1
+    second.close()
+
+def test_unknown_table(journal):
+    with pytest.raises(ValueError):
+        journal.query('trades')
+
+def test_bad_rows_are_dropped_without_stopping_the_writer(journal):
+    from decimal import Decimal
+    journal.record_fill('EURUSD', 'BUY', Decimal('0.1'), Decimal('1.1'), ts=100.0)
+    journal._enqueue('fills', (101.0, None, object(), 'BUY', 0.1, 1.1, None, None, None))
+    journal.record_fill('GBPUSD', 'SELL', 0.2, 1.25, ts=102.0)
+    assert journal.flush()
+    fills = journal.query('fills')
+    assert [(f['symbol'], f['volume']) for f in fills] == [('EURUSD', 0.1), ('GBPUSD', 0.2)]
+    assert journal.dropped == 1
+    journal.record_pnl(Decimal('-3.5'), ts=103.0)
+    assert journal.flush() and journal.query('pnl')[0]['amount'] == -3.5
@@ -0,0 +1,63 @@
+import pytest
+
+from ForexTradingSystem.modules.journal import TradeJournal
+from ForexTradingSystem.modules.latency import LatencyTracker, order_timeline
+from ForexTradingSystem.modules.mt_execution import MTExecution
+
+
+def test_timeline_segments_and_adverse_slippage():
+    stamps = {'signal': 10.0, 'risk': 10.001, 'submit': 10.002, 'ack': 10.052, 'fill': 10.052}
+    timeline = order_timeline(stamps, 'BUY', 1.1000, 1.1001)
+    assert timeline['latency_ms']['bridge'] == pytest.approx(50.0)
+    assert timeline['latency_ms']['total'] == pytest.approx(52.0)
+    assert timeline['slippage_bps'] == pytest.approx(0.909, abs=1e-3)
+    assert order_timeline(stamps, 'SELL', 1.1000, 1.1001)['slippage_bps'] < 0
+    assert 'fill' not in order_timeline(dict(stamps, fill=None), 'BUY')['latency_ms']
+
+
+def test_query_filters_by_symbol_bot_and_window():
+    tracker = LatencyTracker()
+    for i in range(100):
+        tracker.record('EUR/USD', 'bot1', {'latency_ms': {'bridge': 20.0 + i}, 'slippage_bps': 1.0}, ts=60.0 * i)
+    tracker.record('GBP/USD', 'bot2', {'latency_ms': {'bridge': 5000.0}, 'slippage_bps': None}, ts=30.0)
+    
+    everything = tracker.query()
+    assert everything['latency_ms']['bridge']['count'] == 101
+    assert everything['latency_ms']['bridge']['buckets'][-1] == {'lt': pytest.approx(5011.87, rel=1e-4), 'count': 1}
+    
+    eur = tracker.query(symbol='EUR/USD', start=0, end=60.0 * 50)
+    bridge = eur['latency_ms']['bridge']
+    assert bridge['count'] == 50
+    assert bridge['mean'] == pytest.approx(44.5)
+    assert 44.0 <= bridge['p50'] <= 51.0  # Bucket resolution is about 26%
+    assert eur['slippage_bps']['count'] == 50
+    assert tracker.query(bot_id='bot2')['slippage_bps'] is None
+
+
+def test_execution_journals_timelines_for_the_api(tmp_path):
+    class Response:
+        def raise_for_status(self):
+            pass
+            
+        def json(self):
+            return {'ticket': 7, 'price': 1.1002}
+            
+    class Session:
+        def post(self, url, data=None):
+            return Response()
+            
+    journal = TradeJournal(str(tmp_path / 'journal.db'), flush_interval=0.01)
+    mt = MTExecution('http://bridge', 'key')
+    mt.session = Session()
+    mt.journal = journal
+    mt.execute_trades([{'symbol': 'EUR/USD', 'direction': 'long', 'volume': 1.0, 'price': 1.1, 'bot_id': 'b'}])
+    assert journal.flush()
+    
+    tracker = LatencyTracker()
+    tracker.load_from_journal(journal)
+    result = tracker.query(bot_id='b')
+    assert set(result['latency_ms']) == {'risk_check', 'queue', 'bridge', 'fill', 'total'}
+    assert result['slippage_bps']['mean'] == pytest.approx(2 / 1.1, rel=1e-6)
+    tracker.load_from_journal(journal)
+    assert tracker.query()['latency_ms']['total']['count'] == 1
+    journal.close()
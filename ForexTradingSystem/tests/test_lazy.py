@@ -0,0 +1,53 @@
+import threading
+import time
+
+from ForexTradingSystem.modules.lazy import lazy_component, is_enabled
+
+
+class Holder:
+    def __init__(self):
+        self.builds = 0
+        
+    @lazy_component
+    def component(self):
+        self.builds += 1
+        time.sleep(0.01)
+        return object()
+
+
+def test_component_is_built_once_on_first_access():
+    holder = Holder()
+    assert not lazy_component.is_loaded(holder, 'component')
+    first = holder.component
+    assert holder.component is first
+    assert holder.builds == 1
+    assert lazy_component.is_loaded(holder, 'component')
+
+
+def test_concurrent_first_access_builds_once():
+    holder = Holder()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(holder.component)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert holder.builds == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_component_can_be_replaced():
+    holder = Holder()
+    holder.component = 'stub'
+    assert holder.component == 'stub'
+    assert holder.builds == 0
+
+
+def test_is_enabled(monkeypatch):
+    monkeypatch.delenv('ENABLE_SOMETHING', raising=False)
+    assert is_enabled('ENABLE_SOMETHING')
+    assert not is_enabled('ENABLE_SOMETHING', default=False)
+    monkeypatch.setenv('ENABLE_SOMETHING', 'false')
+    assert not is_enabled('ENABLE_SOMETHING')
+    monkeypatch.setenv('ENABLE_SOMETHING', 'On')
+    assert is_enabled('ENABLE_SOMETHING')
@@ -0,0 +1,85 @@
+import sys
+import json
+import queue
+import logging
+import pytest
+from ForexTradingSystem.modules import logger as log_module
+from ForexTradingSystem.modules.logger import get_logger, flush_logs, shutdown_logging
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    shutdown_logging()
+    monkeypatch.setenv('LOG_DIR', str(tmp_path))
+    yield tmp_path
+    shutdown_logging()
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_json_lines_with_lazy_args_and_extras(log_dir):
+    logger = get_logger('test_json', 'json.log')
+    logger.info("Order %s filled at %.2f", 42, 1.23456, extra={'symbol': 'EURUSD'})
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logger.exception("Failed")
+    assert flush_logs()
+    
+    first, second = read_lines(log_dir / 'json.log')
+    assert first['message'] == 'Order 42 filled at 1.23'
+    assert first['level'] == 'INFO' and first['logger'] == 'test_json'
+    assert first['symbol'] == 'EURUSD'
+    assert 'ValueError: boom' in second['exc']
+
+def test_handler_attached_once(log_dir):
+    logger = get_logger('test_once', 'once.log')
+    get_logger('test_once', 'once.log')
+    assert len(logger.handlers) == 1
+    logger.info("single")
+    assert flush_logs()
+    assert len(read_lines(log_dir / 'once.log')) == 1
+
+def test_size_rotation(log_dir, monkeypatch):
+    monkeypatch.setenv('LOG_MAX_BYTES', '400')  # Read when the first logger starts the writer
+    logger = get_logger('test_rotate', 'rotate.log')
+    for i in range(20):
+        logger.info("message number %d", i)
+        flush_logs()
+    rotated = [p for p in log_dir.iterdir() if p.name.startswith('rotate.log.')]
+    assert rotated
+    total = sum(len(read_lines(p)) for p in [log_dir / 'rotate.log'] + rotated)
+    assert total == 20
+
+def test_full_queue_drops_instead_of_blocking():
+    full = queue.Queue(maxsize=1)
+    full.put_nowait(('other.log', None))
+    handler = log_module._NonBlockingQueueHandler(full, 'drop.log')
+    handler.emit(logging.LogRecord('test_drop', logging.INFO, __file__, 1, "dropped", None, None))
+    assert handler.dropped == 1
+
+def test_bad_record_does_not_stop_the_writer(log_dir, monkeypatch):
+    logger = get_logger('test_bad', 'bad.log')
+    monkeypatch.setattr(logger, 'propagate', False)  # pytest's capture handler re-raises
+    logger.info('bad %d', 'x')
+    log_module._get_writer().queue.put_nowait(('bad.log', object()))  # Not a LogRecord at all
+    logger.info('still %s', 'running')
+    assert flush_logs()
+    assert log_module._writer.is_alive()
+    messages = [line['message'] for line in read_lines(log_dir / 'bad.log')]
+    assert messages[0].startswith("Unformattable log message 'bad %d'")
+    assert messages[1].startswith('Unformattable log record')
+    assert messages[2] == 'still running'
+
+def test_records_are_rendered_before_queueing():
+    handler = log_module._NonBlockingQueueHandler(queue.Queue(), 'prepared.log')
+    args = {'fills': [1]}
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        record = logging.LogRecord('test_prepare', logging.ERROR, __file__, 1, "state %s", (args,), sys.exc_info())
+    prepared = handler.prepare(record)
+    args['fills'].append(2)
+    assert prepared.getMessage() == "state {'fills': [1]}"
+    assert prepared.args is None and prepared.exc_info is None
+    assert 'ValueError: boom' in prepared.exc_text
+    assert record.args is args  # Other handlers still see the original
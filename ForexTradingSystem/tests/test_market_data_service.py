@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+from ForexTradingSystem.modules.market_data_service import (
+    MarketDataService, MarketDataClient, producer_running
+)
+from ForexTradingSystem.modules.signal_generator import SignalGenerator
+
+
+class FakeExchange:
+    def __init__(self):
+        self.minute = 10
+        self.calls = 0
+        
+    def fetch_tickers(self, symbols):
+        self.calls += 1
+        return {s: {'timestamp': self.minute * 60000, 'bid': 99.0, 'ask': 101.0,
+                    'last': 100.0 + self.minute, 'baseVolume': 5.0} for s in symbols}
+                    
+    def fetch_ohlcv(self, symbol, timeframe, limit=3):
+        return [[(self.minute - i) * 60000, 1.0, 2.0, 0.5, float(self.minute - i), 3.0]
+                for i in reversed(range(limit))]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setenv('MARKET_DATA_WEIGHT_PER_MINUTE', '100000')
+    service = MarketDataService(str(tmp_path / 'md.seg'), symbols=['BTC/USDT', 'ETH/USDT'],
+                                exchange=FakeExchange())
+    yield service
+    service.close()
+
+
+def test_clients_read_quotes_and_closed_bars(service):
+    service.poll_once()
+    client = MarketDataClient(service.path, symbol='BTC/USDT')
+    assert client.get_quote()['last'] == 110.0
+    assert client.get_quote('XRP/USDT') is None
+    bars = client.get_data()
+    # The forming candle (minute 10) is not published
+    assert list(bars['close']) == [8.0, 9.0]
+    
+    service.exchange.minute = 11
+    service.poll_once()
+    assert list(client.get_data()['close']) == [8.0, 9.0, 10.0]
+    assert list(client.get_data('ETH/USDT')['close']) == [8.0, 9.0, 10.0]
+
+
+def test_stuck_writer_does_not_hang_readers(service):
+    service.poll_once()
+    segment = service.segment
+    segment.quotes['seq'][segment.symbol_id('BTC/USDT')] += 1  # Producer died mid-update
+    client = MarketDataClient(service.path, symbol='BTC/USDT')
+    assert client.get_quote() is None
+    service.poll_once()  # A restarted producer publishes a consistent quote again
+    assert client.get_quote()['last'] == 110.0
+
+
+def test_candles_are_fetched_once_per_bar_within_the_weight_budget(tmp_path, monkeypatch):
+    class LiveExchange(FakeExchange):
+        def __init__(self):
+            super().__init__()
+            self.minute = int(time.time() // 60)
+            self.candle_requests = 0
+            
+        def fetch_ohlcv(self, symbol, timeframe, limit=3):
+            self.candle_requests += 1
+            return super().fetch_ohlcv(symbol, timeframe, limit)
+            
+    monkeypatch.setenv('MARKET_DATA_WEIGHT_PER_MINUTE', '60')  # A bucket of 10 weight
+    service = MarketDataService(str(tmp_path / 'md.seg'), symbols=['BTC/USDT', 'ETH/USDT'],
+                                exchange=LiveExchange())
+    try:
+        for _ in range(5):
+            service.poll_once()
+        # The closed bar is current, so only the first pass fetched candles
+        assert service.exchange.candle_requests == 2
+        # The first pass spent 2 + 2 * 2 weight; the rest leaves room for two ticker requests
+        assert service.exchange.calls == 3
+    finally:
+        service.close()
+
+
+def test_single_producer_per_segment(service):
+    assert producer_running(service.path)
+    with pytest.raises(RuntimeError):
+        MarketDataService(service.path, symbols=['BTC/USDT'], exchange=FakeExchange())
+
+
+def test_wait_wakes_subscribers_on_publish(service):
+    service.poll_once()
+    client = MarketDataClient(service.path)
+    client.subscribe()
+    try:
+        assert not client.wait(timeout=0.05)
+        service.exchange.minute = 11
+        timer = threading.Timer(0.05, service.poll_once)
+        timer.start()
+        assert client.wait(timeout=5)
+        timer.join()
+    finally:
+        client.unsubscribe()
+
+
+def test_restarted_producer_continues_sequences(tmp_path):
+    path = str(tmp_path / 'md.seg')
+    first = MarketDataService(path, symbols=['BTC/USDT'], exchange=FakeExchange())
+    first.poll_once()
+    first.close()
+    assert not producer_running(path)
+    client = MarketDataClient(path)
+    
+    second = MarketDataService(path, symbols=['BTC/USDT'], exchange=FakeExchange())
+    second.exchange.minute = 11
+    second.poll_once()
+    second.close()
+    assert list(client.get_data()['close']) == [8.0, 9.0, 10.0]
+
+
+def test_client_history_drives_signal_generation(service):
+    # The data path of TradingSystem.run_cycle, which cannot be imported here
+    service.poll_once()
+    client = MarketDataClient(service.path, symbol='BTC/USDT')
+    generator = SignalGenerator()
+    assert client.historical_data is None
+    for minute in range(11, 11 + generator.min_bars):
+        service.exchange.minute = minute
+        service.poll_once()
+        client.get_data()
+        history = client.historical_data
+        assert {'timestamp', 'open', 'high', 'low', 'close', 'volume'} <= set(history.columns)
+    assert len(history) >= generator.min_bars
+    pytest.importorskip('pandas_ta')
+    assert {'rsi', 'ema', 'macd'} <= set(generator.generate_signals(history))
@@ -0,0 +1,103 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ForexTradingSystem.modules.ml_scoring import (
+    FEATURES, FeatureCache, LinearModel, ScoringService, StandInModel, bar_features, load_model
+)
+
+
+def bars(n=60, drift=0.0005, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(drift, 0.001, n)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='1min'),
+        'open': close, 'high': close * 1.0005, 'low': close * 0.9995, 'close': close,
+        'volume': np.arange(n, dtype=float)
+    })
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = []
+        
+    def predict(self, rows):
+        self.calls.append(len(rows))
+        return rows[:, 0] * 2
+
+
+def test_concurrent_requests_share_model_calls():
+    model = CountingModel()
+    service = ScoringService(model, max_batch=16, max_wait_ms=20)
+    results = {}
+    start = threading.Barrier(40)
+    
+    def request(i):
+        start.wait()
+        results[i] = service.score([i, 0, 0, 0, 0, 0, 0])
+        
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {i: 2.0 * i for i in range(40)}
+    assert sum(model.calls) == 40 and max(model.calls) <= 16
+    assert service.stats()['batches'] < 40
+    service.close()
+
+
+def test_model_errors_reach_every_caller_in_the_batch():
+    class Broken:
+        def predict(self, rows):
+            raise ValueError('bad input')
+            
+    service = ScoringService(Broken(), max_wait_ms=0)
+    with pytest.raises(ValueError):
+        service.score([0.0] * len(FEATURES))
+    service.close()
+
+
+def test_malformed_rows_are_rejected_before_batching():
+    model = CountingModel()
+    service = ScoringService(model, max_wait_ms=50)
+    good = service.submit([1, 0, 0, 0, 0, 0, 0])
+    with pytest.raises(ValueError):
+        service.submit([1, 2, 3])
+    with pytest.raises(ValueError):
+        service.score_many([[1] * 7, [[1] * 7]])
+    assert good.result(1.0) == 2.0
+    assert sum(model.calls) == 1
+    service.close()
+
+
+def test_features_follow_the_ea_layout_and_are_cached_per_bar():
+    history = bars()
+    features = bar_features(history, quote={'bid': 1.1000, 'ask': 1.1002})
+    assert len(features) == len(FEATURES)
+    assert features[FEATURES.index('spread')] == pytest.approx(0.0002)
+    assert features[FEATURES.index('volume')] == 59.0
+    
+    cache = FeatureCache()
+    first = cache.update('EURUSD', '1m', history)
+    assert cache.update('EURUSD', '1m', history) is first
+    assert cache.update('EURUSD', '1m', bars(61)) is not first
+    assert cache.get('EURUSD', '1m') is not first
+    assert cache.update('EURUSD', '1m', bars(20)) is None  # Long MA not warmed up
+
+
+def test_models_score_uptrends_positive(tmp_path):
+    up, down = bar_features(bars(drift=0.001)), bar_features(bars(drift=-0.001))
+    stand_in = StandInModel()
+    assert stand_in.predict(up)[0] > 0 > stand_in.predict(down)[0]
+    assert isinstance(load_model(''), StandInModel)
+    
+    path = tmp_path / 'model.json'
+    path.write_text(json.dumps({'weights': [0, 1000, 0, 0, 0, 0, 0]}))
+    model = load_model(str(path))
+    assert isinstance(model, LinearModel)
+    scores = model.predict(np.vstack([up, down]))
+    assert scores[0] > 0 > scores[1] and np.all(np.abs(scores) <= 1)
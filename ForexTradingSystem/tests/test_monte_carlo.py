@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from ForexTradingSystem.modules.monte_carlo import MonteCarloRisk
+
+
+def history(n=200, seed=1):
+    rng = np.random.default_rng(seed)
+    return np.where(rng.random(n) < 0.5, 150.0, -100.0)
+
+
+def test_permutation_keeps_final_equity_and_varies_drawdown():
+    mc = MonteCarloRisk(history(), trades_per_day=5)
+    result = mc.run(risk_per_trade=0.01, max_position_size=0.15, daily_loss_limit=1e9,
+                    paths=500, method='permutation', workers=1)
+    final = result['final_equity']
+    assert final['p5'] == pytest.approx(final['p95'])
+    assert result['max_drawdown']['p99'] > result['max_drawdown']['p50'] > 0
+    assert result['daily_stop_probability'] == 0.0
+
+
+def test_results_do_not_depend_on_worker_count(monkeypatch):
+    monkeypatch.setenv('MC_CHUNK_SIZE', '250')
+    mc = MonteCarloRisk(history(), trades_per_day=5)
+    single = mc.run(risk_per_trade=0.02, daily_loss_limit=500, paths=1000, horizon=300, workers=1)
+    parallel = mc.run(risk_per_trade=0.02, daily_loss_limit=500, paths=1000, horizon=300, workers=2)
+    assert single == parallel
+
+
+def test_larger_risk_per_trade_raises_ruin_and_stops_sooner():
+    mc = MonteCarloRisk(history(), trades_per_day=5)
+    low, high = mc.sweep([{'risk_per_trade': 0.005}, {'risk_per_trade': 0.1}],
+                         max_position_size=1.0, daily_loss_limit=400, paths=2000, workers=1)
+    assert low['risk_of_ruin'] < high['risk_of_ruin']
+    assert low['max_drawdown']['p95'] < high['max_drawdown']['p95']
+    assert high['days_to_daily_stop']['p50'] < (low['days_to_daily_stop'] or {'p50': np.inf})['p50']
+
+
+def test_losing_streak_hits_daily_limit_on_third_trade():
+    mc = MonteCarloRisk([-100.0] * 10, trades_per_day=5)
+    result = mc.run(risk_per_trade=0.01, daily_loss_limit=250, initial_equity=10000,
+                    paths=10, method='permutation', workers=1)
+    assert result['daily_stop_probability'] == 1.0
+    assert result['days_to_daily_stop']['p50'] == pytest.approx(3 / 5)
+
+
+def test_from_journal_uses_realized_pnl_only(tmp_path):
+    from ForexTradingSystem.modules.journal import TradeJournal
+    journal = TradeJournal(str(tmp_path / 'journal.db'))
+    for ts, amount in enumerate([150.0, -100.0, 150.0]):
+        journal.record_pnl(amount, ts=ts * 3600.0)
+    journal.record_position_pnl(-500.0, ts=5400.0)
+    journal.flush()
+    mc = MonteCarloRisk.from_journal(journal)
+    journal.close()
+    assert mc.risk_unit == 100.0
+    assert list(mc.r_multiples) == [1.5, -1.0, 1.5]
+    assert mc.trades_per_day == pytest.approx(3 / (2 / 24))
@@ -0,0 +1,60 @@
+from ForexTradingSystem.modules.news import NewsIngester, NewsStore
+
+
+def article(i, symbols=('AAPL',), headline=None):
+    return {
+        'id': i,
+        'headline': headline or f'Headline {i}',
+        'summary': 'Quarterly earnings beat estimates' if i % 2 else 'Rates on hold',
+        'source': 'benzinga',
+        'created_at': f'2024-01-01T00:{i:02d}:00Z',
+        'url': f'https://example.com/{i}',
+        'symbols': list(symbols)
+    }
+
+
+def test_duplicates_are_stored_once_and_other_processes_see_new_rows(tmp_path):
+    path = str(tmp_path / 'news.db')
+    writer, reader = NewsStore(path), NewsStore(path)
+    assert writer.add([article(1), article(2)]) == 2
+    assert writer.add([article(2), article(3)]) == 1
+    page = reader.query()
+    assert [a['id'] for a in page['items']] == ['3', '2', '1']
+    assert page['items'][0]['publishedAt'] == '2024-01-01T00:03:00+00:00'
+
+
+def test_cursor_pages_through_filtered_results(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'))
+    store.add(article(i, symbols=('AAPL',) if i < 20 else ('MSFT',)) for i in range(30))
+    
+    first = store.query(symbol='aapl', q='earnings', limit=4)
+    assert [a['id'] for a in first['items']] == ['19', '17', '15', '13']
+    assert first['total'] == 10
+    # Articles arriving between pages don't shift the next one
+    store.add([article(40, headline='Earnings surprise')])
+    second = store.query(symbol='AAPL', q='earnings', cursor=first['next_cursor'], limit=4)
+    assert [a['id'] for a in second['items']] == ['11', '9', '7', '5']
+    last = store.query(symbol='AAPL', q='earnings', cursor=second['next_cursor'], limit=4)
+    assert [a['id'] for a in last['items']] == ['3', '1'] and last['next_cursor'] is None
+    
+    assert [a['id'] for a in store.query(symbol='MSFT,TSLA', limit=2)['items']] == ['29', '28']
+    assert store.query(q='unknownword')['items'] == []
+
+
+def test_store_keeps_newest_articles_and_ingester_survives_errors(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'), max_articles=5)
+    calls = []
+    
+    def fetch():
+        calls.append(1)
+        if len(calls) == 2:
+            raise ConnectionError('rate limited')
+        return [article(i) for i in range(len(calls) * 4)]
+        
+    ingester = NewsIngester(store, fetch=fetch)
+    assert ingester.poll() == 4
+    assert ingester.poll() == 0 and ingester.last_error == 'rate limited'
+    assert ingester.poll() == 8
+    ids = [a['id'] for a in store.query(limit=100)['items']]
+    assert ids == ['11', '10', '9', '8', '7']
+    assert store.query(symbol='AAPL', limit=100)['total'] == 5
@@ -0,0 +1,100 @@
+import json
+import pytest
+from ForexTradingSystem.modules.order_book import DepthStream, OrderBook, OrderBookManager
+
+SNAPSHOT = {
+    'bids': [[99.0, 1.0], [100.0, 2.0], [98.0, 5.0]],
+    'asks': [[101.0, 1.0], [102.0, 3.0]],
+    'nonce': 10,
+}
+
+class FakeExchange:
+    def __init__(self, snapshots):
+        self.snapshots = list(snapshots)
+        self.calls = 0
+
+    def fetch_order_book(self, symbol, limit=None):
+        self.calls += 1
+        return self.snapshots.pop(0)
+
+@pytest.fixture
+def book():
+    b = OrderBook('BTC/USDT')
+    b.load_snapshot(SNAPSHOT)
+    return b
+
+def test_top_of_book_and_depth(book):
+    assert book.best_bid() == 100.0
+    assert book.best_ask() == 101.0
+    assert book.depth('bids', 99.0) == 3.0
+    assert book.depth('asks', 100.0) == 0.0
+
+def test_vwap_walks_levels(book):
+    price, filled = book.vwap('asks', 2.0)
+    assert price == pytest.approx((101.0 + 102.0) / 2)
+    assert filled == 2.0
+    price, filled = book.vwap('asks', 10.0)
+    assert filled == 4.0
+    assert price == pytest.approx((101.0 + 3 * 102.0) / 4)
+
+def test_apply_levels_updates_and_removes(book):
+    book.apply_levels('bids', [[100.0, 0.0], [99.5, 4.0], [99.5, 3.0]])
+    assert book.to_dict()['bids'] == [[99.5, 3.0], [99.0, 1.0], [98.0, 5.0]]
+    assert book.vwap('bids', 4.0)[0] == pytest.approx((3 * 99.5 + 99.0) / 4)
+
+def test_manager_sequence_and_gap_resync():
+    newer = dict(SNAPSHOT, bids=[[90.0, 1.0]], nonce=20)
+    exchange = FakeExchange([SNAPSHOT, newer])
+    manager = OrderBookManager(exchange, max_age=60)
+
+    assert manager.apply_update('BTC/USDT', {'U': 5, 'u': 10, 'b': [[1.0, 1.0]]}) is False
+    assert manager.apply_update('BTC/USDT', {'U': 9, 'u': 12, 'a': [[101.0, 0]]}) is True
+    assert manager.get('BTC/USDT').best_ask() == 102.0
+
+    # Update 13 is missing, forcing a resync to the newer snapshot
+    assert manager.apply_update('BTC/USDT', {'U': 14, 'u': 21, 'b': [[91.0, 2.0]]}) is True
+    assert exchange.calls == 2
+    assert manager.get('BTC/USDT').best_bid() == 91.0
+    assert manager.estimate_fill('BTC/USDT', 'sell', 3.0) == (pytest.approx((2 * 91.0 + 90.0) / 3), 3.0)
+
+def test_books_without_nonce_take_diffs_and_scans_reuse_snapshots():
+    plain = {k: v for k, v in SNAPSHOT.items() if k != 'nonce'}
+    exchange = FakeExchange([plain, dict(plain), dict(plain)])
+    manager = OrderBookManager(exchange, max_age=0)
+    
+    assert manager.apply_update('BTC/USDT', {'b': [[100.5, 1.0]]}) is True
+    assert manager.apply_update('BTC/USDT', {'a': [[101.0, 0]]}) is True
+    assert exchange.calls == 1
+    
+    scan = manager._updated_at['BTC/USDT']
+    for _ in range(3):
+        manager.estimate_fill('BTC/USDT', 'buy', 1.0, since=scan)
+    assert exchange.calls == 1
+    manager.estimate_fill('BTC/USDT', 'buy', 1.0)
+    assert exchange.calls == 2
+
+class StreamExchange(FakeExchange):
+    def market_id(self, symbol):
+        return symbol.replace('/', '')
+
+def test_depth_stream_keeps_books_current_without_snapshots(monkeypatch):
+    exchange = StreamExchange([SNAPSHOT, dict(SNAPSHOT, nonce=30)])
+    manager = OrderBookManager(exchange, max_age=0)
+    stream = manager.stream = DepthStream(manager)
+    monkeypatch.setattr(stream, '_run_loop', lambda: None)  # No socket in tests
+    monkeypatch.setattr(stream, 'live', lambda symbol: True)
+    
+    manager.get('BTC/USDT')
+    assert stream._symbols == {'btcusdt@depth@100ms': 'BTC/USDT'}
+    stream.on_message('{"result": null, "id": 1}')
+    stream.on_message(json.dumps({'stream': 'btcusdt@depth@100ms', 'data': {
+        'e': 'depthUpdate', 's': 'BTCUSDT', 'U': 11, 'u': 12, 'b': [['100.5', '1.0']], 'a': []
+    }}))
+    assert manager.get('BTC/USDT').best_bid() == 100.5
+    assert exchange.calls == 1
+    
+    # Diffs missed during a disconnect force a snapshot before the next one applies
+    manager.invalidate('BTC/USDT')
+    assert manager.apply_update('BTC/USDT', {'U': 31, 'u': 31, 'a': [[101.0, 0]]}) is True
+    assert exchange.calls == 2
+    assert manager.get('BTC/USDT').best_ask() == 102.0
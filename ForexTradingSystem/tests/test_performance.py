@@ -0,0 +1,63 @@
+import math
+import pytest
+from ForexTradingSystem.modules.performance import PerformanceTracker
+from ForexTradingSystem.modules.journal import TradeJournal
+
+@pytest.fixture
+def tracker():
+    return PerformanceTracker()
+
+def test_round_trips_close_trades(tracker):
+    tracker.on_fill('bot-1', 'EURUSD', 'BUY', 2, 1.10, ts=0)
+    tracker.on_fill('bot-1', 'EURUSD', 'BUY', 2, 1.20, ts=100)
+    tracker.on_fill('bot-1', 'EURUSD', 'SELL', 4, 1.25, ts=200)
+    metrics = tracker.get_performance('bot-1')['metrics']
+    assert metrics['total_trades'] == 1
+    assert metrics['profit'] == pytest.approx(4 * (1.25 - 1.15))
+    assert metrics['average_holding_time'] == pytest.approx(150)
+
+def test_position_flip_opens_opposite_side(tracker):
+    tracker.on_fill('bot-1', 'EURUSD', 'buy', 1, 100, ts=0)
+    tracker.on_fill('bot-1', 'EURUSD', 'sell', 3, 110, ts=10)
+    tracker.on_fill('bot-1', 'EURUSD', 'buy', 2, 105, ts=20)
+    metrics = tracker.get_performance('bot-1')['metrics']
+    assert metrics['total_trades'] == 2
+    assert metrics['profit'] == pytest.approx(10 + 2 * 5)
+
+def test_metrics_match_batch_computation(tracker):
+    profits = [10.0, -5.0, 20.0, -15.0, 5.0]
+    for p in profits:
+        tracker.record_trade('bot-2', p, holding_seconds=60)
+    metrics = tracker.get_performance('bot-2')['metrics']
+    
+    n = len(profits)
+    mean = sum(profits) / n
+    std = math.sqrt(sum((p - mean) ** 2 for p in profits) / (n - 1))
+    downside = math.sqrt(sum(min(p, 0) ** 2 for p in profits) / n)
+    assert metrics['win_rate'] == pytest.approx(60)
+    assert metrics['profit_factor'] == pytest.approx(35 / 20)
+    assert metrics['drawdown'] == pytest.approx(15)
+    assert metrics['sharpe'] == pytest.approx(mean / std)
+    assert metrics['sortino'] == pytest.approx(mean / downside)
+    assert metrics['expectancy'] == pytest.approx(mean)
+
+def test_unknown_bot_returns_zeros(tracker):
+    metrics = tracker.get_performance('missing')['metrics']
+    assert metrics['total_trades'] == 0 and metrics['win_rate'] == 0
+
+def test_journal_catch_up_is_incremental(tmp_path, tracker):
+    journal = TradeJournal(str(tmp_path / 'journal.db'))
+    journal.record_fill('EURUSD', 'BUY', 1, 1.0, bot_id='bot-1', ts=1)
+    journal.record_fill('EURUSD', 'SELL', 1, 1.5, bot_id='bot-1', ts=2)
+    journal.flush()
+    tracker.load_from_journal(journal)
+    tracker.load_from_journal(journal)
+    assert tracker.get_performance('bot-1')['metrics']['total_trades'] == 1
+    journal.close()
+
+def test_bot_ids_include_bots_with_open_positions(tracker):
+    tracker.on_fill('bot-1', 'EURUSD', 'BUY', 1, 1.0, ts=1)
+    tracker.on_fill('bot-1', 'EURUSD', 'SELL', 1, 1.5, ts=2)
+    tracker.on_fill('bot-2', 'GBPUSD', 'BUY', 1, 1.2, ts=3)
+    tracker.on_fill(None, 'USDJPY', 'SELL', 1, 150.0, ts=4)
+    assert tracker.bot_ids() == ['bot-1', 'bot-2', 'default']
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ForexTradingSystem.modules import pipeline
+from ForexTradingSystem.modules.mt_execution import MTExecution
+from ForexTradingSystem.modules.shm_ring import ShmRing, SIGNAL_DTYPE, FILL_DTYPE
+
+
+@pytest.fixture
+def rings():
+    rings = {
+        'signals': ShmRing(None, SIGNAL_DTYPE, capacity=16, create=True),
+        'fills': ShmRing(None, FILL_DTYPE, capacity=16, create=True)
+    }
+    yield rings
+    for ring in rings.values():
+        ring.close()
+        ring.unlink()
+
+
+@pytest.fixture
+def bridge(monkeypatch, tmp_path):
+    monkeypatch.setenv('MAX_DAILY_LOSS', '500')
+    monkeypatch.setenv('RISK_PER_TRADE', '0.015')
+    monkeypatch.setenv('MAX_POSITION_SIZE', '5')
+    monkeypatch.setenv('JOURNAL_PATH', str(tmp_path / 'pipeline.db'))
+    monkeypatch.setenv('PIPELINE_POLL_INTERVAL', '0.001')
+    orders = []
+    synced = threading.Event()
+    
+    def get_account_info(self):
+        synced.set()
+        return {'balance': 10000.0, 'equity': 10000.0}
+        
+    def place_order(self, symbol, order_type, volume, price=None, stop_loss=None, take_profit=None):
+        orders.append((symbol, order_type, volume))
+        return {'ticket': len(orders), 'price': price}
+        
+    monkeypatch.setattr(MTExecution, 'place_order', place_order)
+    monkeypatch.setattr(MTExecution, 'get_account_info', get_account_info)
+    monkeypatch.setattr(MTExecution, 'get_positions', lambda self: {})
+    return orders, synced
+
+
+def test_execution_worker_places_orders_against_bridge_equity(rings, bridge):
+    names = {name: ring.name for name, ring in rings.items()}
+    fills = ShmRing(names['fills'], FILL_DTYPE).reader()
+    stop = threading.Event()
+    worker = threading.Thread(target=pipeline._execution_worker, args=(names, stop), daemon=True)
+    worker.start()
+    orders, synced = bridge
+    try:
+        # The worker reads the bridge once its signal reader is in place
+        assert synced.wait(5)
+        rings['signals'].push((time.time(), b'EUR/USD', b'', b'long', 0.1, 1.1, np.nan, np.nan))
+        deadline = time.monotonic() + 5
+        records = fills.read()
+        while not len(records) and time.monotonic() < deadline:
+            time.sleep(0.01)
+            records = fills.read()
+    finally:
+        stop.set()
+        worker.join(5)
+        
+    # Without equity from the bridge every order was rejected as no_equity
+    assert orders == [('EUR/USD', 'BUY', 0.1)]
+    assert records['symbol'][0] == b'EUR/USD'
+    assert records['price'][0] == pytest.approx(1.1)
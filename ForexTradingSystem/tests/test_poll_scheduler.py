@@ -0,0 +1,106 @@
+import ccxt
+import pytest
+
+from ForexTradingSystem.modules.poll_scheduler import PollScheduler, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        
+    def __call__(self):
+        return self.now
+
+
+class FakeExchange:
+    def __init__(self):
+        self.requests = []
+        self.prices = {}
+        self.error = None
+        
+    def fetch_tickers(self, symbols):
+        if self.error:
+            raise self.error
+        self.requests.append(list(symbols))
+        return {s: {'symbol': s, 'last': self.prices.get(s, 100.0)} for s in symbols}
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv('POLL_BATCH_SIZE', '2')
+    monkeypatch.setenv('POLL_WEIGHT_PER_MINUTE', '1200')
+    monkeypatch.delenv('POLL_WATCHLIST', raising=False)
+
+
+def make(symbols, clock=None, weight=lambda n: 2):
+    return PollScheduler(FakeExchange(), symbols, clock=clock or Clock(), weight_fn=weight)
+
+
+def test_token_bucket_refills_over_time():
+    clock = Clock()
+    bucket = TokenBucket(rate=10, capacity=20, clock=clock)
+    assert bucket.try_acquire(20)
+    assert not bucket.try_acquire(1)
+    assert bucket.wait_time(5) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire(5)
+    bucket.penalize(3)
+    assert bucket.wait_time(1) == pytest.approx(3.1)
+
+
+def test_higher_tiers_are_polled_first(env):
+    scheduler = make(['A', 'B', 'C', 'D'])
+    scheduler.set_watchlist(['C'])
+    scheduler.set_positions(['D'])
+    assert scheduler.poll_once() == 2
+    assert scheduler.exchange.requests[0] == ['D', 'C']
+    scheduler.poll_once()
+    assert sorted(scheduler.exchange.requests[1]) == ['A', 'B']
+    assert scheduler.poll_once() == 0
+
+
+
+def test_closing_a_position_restores_the_watchlist_tier(env):
+    scheduler = make(['BTC/USDT', 'ETH/USDT'])
+    scheduler.set_watchlist(['ETH/USDT'])
+    scheduler.set_positions(['ETH/USDT', 'SOL/USDT'])
+    assert scheduler.tiers == {'BTC/USDT': 'universe', 'ETH/USDT': 'position', 'SOL/USDT': 'position'}
+    scheduler.set_positions([])
+    assert scheduler.tiers == {'BTC/USDT': 'universe', 'ETH/USDT': 'watchlist'}
+    scheduler.set_universe(['BTC/USDT'])
+    assert scheduler.tiers == {'BTC/USDT': 'universe', 'ETH/USDT': 'watchlist'}
+
+
+def test_intervals_follow_tier_and_volatility(env):
+    clock = Clock()
+    scheduler = make(['QUIET', 'BUSY'], clock)
+    for step in range(5):
+        scheduler.exchange.prices = {'QUIET': 100.0 + step * 0.01, 'BUSY': 100.0 * (1.05 if step % 2 else 0.95)}
+        scheduler._schedule('QUIET', clock.now)
+        scheduler._schedule('BUSY', clock.now)
+        scheduler.poll_once()
+        clock.now += 10
+    assert scheduler.interval('BUSY') < scheduler.base_intervals['universe'] < scheduler.interval('QUIET')
+    scheduler.set_positions(['BUSY'])
+    assert scheduler.interval('BUSY') < scheduler.base_intervals['position']
+
+
+def test_requests_wait_for_budget(env):
+    clock = Clock()
+    scheduler = make(['A', 'B', 'C', 'D'], clock, weight=lambda n: 150)
+    assert scheduler.poll_once() == 2  # Bucket holds 200 weight, refilling 20 per second
+    assert scheduler.poll_once() == 0
+    assert len(scheduler.exchange.requests) == 1
+    clock.now += 5
+    assert scheduler.poll_once() == 2
+
+
+def test_rate_limit_backs_off(env):
+    clock = Clock()
+    scheduler = make(['A'], clock)
+    scheduler.exchange.error = ccxt.RateLimitExceeded('429')
+    assert scheduler.poll_once() == 0
+    scheduler.exchange.error = None
+    clock.now += 1
+    assert scheduler.poll_once() == 0
+    assert scheduler.next_due() == pytest.approx(1000.0 + scheduler.backoff)
@@ -0,0 +1,126 @@
+import importlib
+import os
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ForexTradingSystem.modules.lazy import lazy_component
+from ForexTradingSystem.modules.replay import ReplayMarket, ReplayRunner, SimulatedBroker
+from ForexTradingSystem.modules.risk_management import RiskManager
+
+MINUTE = 60000
+
+
+def recording(closes, start=1_700_000_000_000):
+    return pd.DataFrame({
+        'timestamp': start + np.arange(len(closes)) * MINUTE,
+        'open': closes, 'high': closes, 'low': closes, 'close': closes, 'volume': 1.0
+    })
+
+
+class MiniSystem:
+    """The TradingSystem surface ReplayRunner relies on, without live venues"""
+    
+    def __init__(self):
+        self.orders = []
+        
+    @lazy_component
+    def risk_manager(self):
+        rm = RiskManager()
+        rm.update_equity(Decimal('10000'))
+        return rm
+        
+    @lazy_component
+    def journal(self):
+        raise AssertionError('replay must not open the live journal')
+        
+    def wire_execution(self, execution):
+        execution.risk_manager = self.risk_manager
+        return execution
+        
+    def run_cycle(self):
+        data = self.data_feed.get_data()
+        history = self.data_feed.historical_data
+        if len(data) and len(history) >= 3:
+            # Buy on three rising closes, sell on three falling ones
+            diff = np.diff(history['close'].iloc[-3:])
+            direction = 'long' if (diff > 0).all() else 'short' if (diff < 0).all() else None
+            if direction:
+                order = {'symbol': self.data_feed.symbol, 'direction': direction, 'volume': 1.0,
+                         'price': float(history['close'].iloc[-1])}
+                self.orders.append(order)
+                self.execution.execute_trades([order])
+        return True
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv('MAX_DAILY_LOSS', '500')
+    monkeypatch.setenv('RISK_PER_TRADE', '0.015')
+    monkeypatch.setenv('MAX_POSITION_SIZE', '5')
+    monkeypatch.setenv('MAX_ORDERS_PER_MINUTE', '1')
+
+
+def test_market_only_shows_closed_bars():
+    market = ReplayMarket({'EUR/USD': recording([1.0, 2.0, 3.0])})
+    assert [c[4] for c in market.fetch_ohlcv('EUR/USD')] == [1.0]
+    market.clock.sleep(59)
+    assert market.price('EUR/USD') == 1.0
+    market.clock.sleep(1)
+    assert [c[4] for c in market.fetch_ohlcv('EUR/USD', limit=1)] == [2.0]
+    assert market.price('EUR/USD', at=market.end_time()) == 3.0
+
+
+def test_broker_latency_and_fill_model():
+    market = ReplayMarket({'EUR/USD': recording([100.0, 110.0])})
+    broker = SimulatedBroker(market, latency=59.5, spread_bps=20, slippage_bps=5)
+    market.clock.sleep(1)  # Arrives after the second bar closes
+    buy = broker.place_order('EUR/USD', 'BUY', 2.0)
+    assert buy['price'] == pytest.approx(110.0 * 1.0015)
+    sell = broker.place_order('EUR/USD', 'SELL', 2.0)
+    assert sell['price'] == pytest.approx(110.0 * 0.9985)
+    assert broker.get_account_info()['balance'] == pytest.approx(10000 - 2 * 110.0 * 0.003)
+    assert broker.get_positions() == {}
+
+
+def test_replay_drives_pipeline_on_virtual_clock(env, tmp_path):
+    closes = [1.0, 1.1, 1.2, 1.3, 1.2, 1.1, 1.0, 1.1, 1.2, 1.3]
+    market = ReplayMarket({'EUR/USD': recording(closes)})
+    runner = ReplayRunner(market, interval=60, journal_path=str(tmp_path / 'replay.db'))
+    system = runner.attach(MiniSystem())
+    result = runner.run()
+    
+    assert result['cycles'] == len(closes)
+    assert result['simulated_seconds'] == len(closes) * 60
+    # One order per virtual minute passes MAX_ORDERS_PER_MINUTE=1; on the
+    # wall clock every order after the first would have been rejected
+    assert [o['direction'] for o in system.orders] == ['long', 'long', 'short', 'short', 'long', 'long']
+    assert result['orders'] == 6
+    assert system.risk_manager.clock() == runner.clock.now
+    assert system.execution.clock() == runner.clock.now
+    system.journal.close()
+
+
+def test_replay_runs_trading_system(env, tmp_path, monkeypatch):
+    pytest.importorskip('eventlet')
+    pytest.importorskip('pandas_ta')
+    monkeypatch.syspath_prepend(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    monkeypatch.setenv('ENABLE_MONITORING', 'true')  # Must not reach the replayed execution
+    main = importlib.import_module('main')
+    replay = importlib.import_module('modules.replay')
+    
+    closes = 1.1 + 0.01 * np.sin(np.arange(240) / 15.0)
+    market = replay.ReplayMarket({'EUR/USD': recording(closes)})
+    runner = replay.ReplayRunner(market, interval=60, journal_path=str(tmp_path / 'replay.db'))
+    system = runner.attach(main.TradingSystem())
+    result = runner.run()
+    
+    assert result['cycles'] == len(closes)
+    assert system.execution.monitoring is None
+    # Every placed order was journaled through to its fill, none aborted mid-batch
+    assert result['orders'] > 1
+    assert system.journal.flush()
+    assert len(system.journal.query('fills')) == result['orders']
+    system.journal.close()
@@ -0,0 +1,89 @@
+import pytest
+from decimal import Decimal
+from ForexTradingSystem.modules.risk_management import RiskManager, REJECT_REASONS
+
+@pytest.fixture
+def risk_manager(monkeypatch):
+    monkeypatch.setenv('MAX_DAILY_LOSS', '500')
+    monkeypatch.setenv('RISK_PER_TRADE', '0.015')
+    monkeypatch.setenv('MAX_POSITION_SIZE', '0.5')
+    monkeypatch.setenv('MAX_LEVERAGE', '3')
+    monkeypatch.setenv('MAX_SYMBOL_EXPOSURE', '1')
+    monkeypatch.setenv('MAX_TOTAL_EXPOSURE', '2')
+    monkeypatch.setenv('MAX_ORDERS_PER_MINUTE', '100')
+    rm = RiskManager()
+    rm.update_equity(Decimal('10000'))
+    return rm
+
+def order(symbol, direction, volume, price=1.0):
+    return {'symbol': symbol, 'direction': direction, 'volume': volume, 'price': price}
+
+def reasons_of(rm, orders):
+    approved, reasons = rm.check_orders(orders)
+    return [REJECT_REASONS[r] for r in reasons]
+
+def test_empty_batch(risk_manager):
+    approved, reasons = risk_manager.check_orders([])
+    assert len(approved) == 0 and len(reasons) == 0
+
+def test_position_size_limit(risk_manager):
+    assert reasons_of(risk_manager, [
+        order('EURUSD', 'long', 4000),
+        order('EURUSD', 'long', 6000),
+    ]) == [None, 'position_size']
+
+def test_symbol_exposure_accumulates_within_batch(risk_manager):
+    assert reasons_of(risk_manager, [
+        order('EURUSD', 'long', 5000),
+        order('EURUSD', 'long', 5000),
+        order('EURUSD', 'long', 1000),
+        order('EURUSD', 'short', 1000),
+    ]) == [None, None, 'symbol_exposure', None]
+
+def test_rejected_orders_do_not_consume_limits(risk_manager):
+    risk_manager.record_fill('EURUSD', 'long', 9000, 1.0)
+    assert reasons_of(risk_manager, [
+        order('EURUSD', 'long', 5000),
+        order('EURUSD', 'long', 1000),
+    ]) == ['symbol_exposure', None]
+
+def test_reducing_orders_pass_over_limit(risk_manager):
+    risk_manager.record_fill('EURUSD', 'long', 9000, 1.0)
+    risk_manager.set_symbol_limits('EURUSD', max_exposure=1000)
+    assert reasons_of(risk_manager, [order('EURUSD', 'short', 2000)]) == [None]
+
+def test_total_and_leverage(risk_manager):
+    for symbol in ('EURUSD', 'GBPUSD'):
+        risk_manager.record_fill(symbol, 'long', 9000, 1.0)
+    assert reasons_of(risk_manager, [order('USDJPY', 'long', 4000)]) == ['total_exposure']
+    risk_manager.record_fill('USDJPY', 'short', 9000, 1.0)
+    assert reasons_of(risk_manager, [order('AUDUSD', 'short', 4000)]) == ['leverage']
+
+def test_missing_price_and_mark_fallback(risk_manager):
+    assert reasons_of(risk_manager, [order('EURUSD', 'long', 100, None)]) == ['no_price']
+    risk_manager.update_price('EURUSD', 1.1)
+    assert reasons_of(risk_manager, [order('EURUSD', 'long', 100, None)]) == [None]
+
+def test_daily_loss_blocks_batch(risk_manager):
+    risk_manager.update_pnl(Decimal('-600'))
+    assert reasons_of(risk_manager, [order('EURUSD', 'long', 1)]) == ['daily_loss']
+
+def test_order_rate(risk_manager):
+    risk_manager.max_orders_per_minute = 3
+    assert reasons_of(risk_manager, [order('EURUSD', 'long', 1)] * 2) == [None, None]
+    assert reasons_of(risk_manager, [order('EURUSD', 'long', 1)] * 2) == [None, 'order_rate']
+
+def test_later_orders_pass_against_the_approved_set(risk_manager, monkeypatch):
+    monkeypatch.setenv('MAX_SYMBOL_EXPOSURE', '2')
+    monkeypatch.setenv('MAX_TOTAL_EXPOSURE', '1')
+    rm = RiskManager()
+    rm.update_equity(Decimal('10000'))
+    rm.record_fill('EURUSD', 'long', 9000, 1.0)
+    rm.set_symbol_limits('GBPUSD', max_exposure=500)
+    approved, reasons = rm.check_orders([
+        order('GBPUSD', 'short', 1000),
+        order('EURUSD', 'long', 1500),
+        order('USDJPY', 'long', 600),
+    ])
+    assert list(approved) == [False, False, True]
+    assert [REJECT_REASONS[r] for r in reasons] == ['symbol_exposure', 'total_exposure', None]
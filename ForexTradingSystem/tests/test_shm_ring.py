@@ -0,0 +1,68 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from ForexTradingSystem.modules.shm_ring import ShmRing, BAR_DTYPE, FILL_DTYPE
+
+
+@pytest.fixture
+def ring():
+    ring = ShmRing(None, BAR_DTYPE, capacity=8, create=True)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def _bar(i):
+    return (float(i), b'BTC/USDT', 1.0, 2.0, 0.5, float(i), 10.0)
+
+
+def test_reader_sees_records_in_order(ring):
+    reader = ring.reader()
+    for i in range(5):
+        ring.push(_bar(i))
+    records = reader.read()
+    assert list(records['close']) == [0, 1, 2, 3, 4]
+    assert records['symbol'][0] == b'BTC/USDT'
+    assert len(reader.read()) == 0
+
+
+def test_independent_readers_and_max_items(ring):
+    first, second = ring.reader(), ring.reader()
+    ring.push_many(np.array([_bar(i) for i in range(6)], dtype=BAR_DTYPE))
+    assert list(first.read(max_items=4)['ts']) == [0, 1, 2, 3]
+    assert list(first.read()['ts']) == [4, 5]
+    assert list(second.read()['ts']) == [0, 1, 2, 3, 4, 5]
+
+
+def test_lapped_reader_skips_overwritten_records(ring):
+    reader = ring.reader()
+    for i in range(20):
+        ring.push(_bar(i))
+    records = reader.read()
+    # The slot the writer would reuse next is not handed out
+    assert list(records['ts']) == list(range(13, 20))
+    assert reader.lost == 13
+    assert reader.cursor == 20
+
+
+def test_attach_checks_record_size(ring):
+    with pytest.raises(ValueError):
+        ShmRing(ring.name, FILL_DTYPE)
+
+
+def _produce(name, count):
+    ring = ShmRing(name, BAR_DTYPE)
+    for i in range(count):
+        ring.push(_bar(i))
+    ring.close()
+
+
+def test_records_cross_process_boundary(ring):
+    reader = ring.reader()
+    process = multiprocessing.get_context('spawn').Process(target=_produce, args=(ring.name, 6))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    assert list(reader.read()['ts']) == [0, 1, 2, 3, 4, 5]
@@ -0,0 +1,79 @@
+import tempfile
+import time
+import uuid
+
+import pytest
+import socketio
+
+from ForexTradingSystem.modules.read_model import ReadModel
+from ForexTradingSystem.modules.socket_queue import EventPublisher, client_manager
+
+
+def worker(url):
+    """A minimal API worker with the queue backend and a send hook instead of sockets"""
+    server = socketio.Server(client_manager=client_manager(url), async_mode='threading')
+    sent = []
+    server._send_eio_packet = lambda eio_sid, eio_packet: sent.append(
+        (eio_sid, server.packet_class(encoded_packet=eio_packet.data).data))
+    server.manager.initialize()  # Starts the queue listener
+    return server.manager, sent
+
+
+def connect(manager, eio_sid, room=None):
+    sid = manager.connect(eio_sid, '/')
+    if room:
+        manager.enter_room(sid, '/', room)
+
+
+def wait_for(sent, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while len(sent) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return sent
+
+
+@pytest.mark.parametrize('scheme', ['memory', 'unix'])
+def test_rooms_are_shared_across_workers(scheme):
+    # pytest's tmp_path can exceed the Unix socket path limit
+    url = f'memory://{uuid.uuid4().hex}' if scheme == 'memory' else f'unix://{tempfile.mkdtemp()}'
+    (manager_a, sent_a), (manager_b, sent_b) = worker(url), worker(url)
+    connect(manager_a, 'a1', 'trades')
+    connect(manager_b, 'b1', 'trades')
+    connect(manager_b, 'b2')
+    
+    # The trading process publishes without serving any clients
+    EventPublisher(url).emit('positions', {'EUR/USD': {'volume': 1.0}}, room='trades')
+    event = ['positions', {'EUR/USD': {'volume': 1.0}}]
+    assert wait_for(sent_a, 1) == [('a1', event)]
+    assert wait_for(sent_b, 1) == [('b1', event)]
+    time.sleep(0.05)
+    assert len(sent_b) == 1  # b2 never joined the room
+
+
+
+def test_stalled_worker_does_not_block_the_publisher():
+    url = f'unix://{tempfile.mkdtemp()}'
+    stalled = client_manager(url)  # Bound but never reads
+    publisher = client_manager(url, write_only=True)
+    started = time.monotonic()
+    for _ in range(2000):
+        publisher._publish({'method': 'emit', 'data': 'x' * 10000})
+    assert time.monotonic() - started < 5
+    assert publisher.dropped > 0
+    publisher._publish({'method': 'emit', 'data': 'x' * (1 << 22)})  # Over the datagram limit
+    publisher.close()
+    stalled.close()
+
+
+def test_read_model_versions_changes(tmp_path):
+    writer = ReadModel(str(tmp_path / 'read_model.db'))
+    reader = ReadModel(str(tmp_path / 'read_model.db'))
+    first = writer.publish(status={'trading_active': True}, account={'equity': 1000.0})
+    assert reader.snapshot() == {'status': {'trading_active': True}, 'account': {'equity': 1000.0}}
+    
+    second = writer.publish(account={'equity': 1010.0})
+    assert second == first + 1
+    version, changed = reader.changes(first)
+    assert (version, changed) == (second, {'account': {'equity': 1010.0}})
+    assert reader.changes(version) == (version, {})
+    assert reader.get('missing', 'default') == 'default'
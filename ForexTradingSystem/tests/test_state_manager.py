@@ -0,0 +1,78 @@
+from ForexTradingSystem.modules.state_manager import StateManager
+
+
+class Bridge:
+    def __init__(self, positions=None, balance=1000.0, equity=1000.0):
+        self.positions = positions or {}
+        self.account = {'balance': balance, 'equity': equity}
+        self.calls = 0
+        
+    def get_positions(self):
+        self.calls += 1
+        return self.positions
+        
+    def get_account_info(self):
+        return dict(self.account)
+
+
+class Exchange:
+    def __init__(self, totals):
+        self.totals = totals
+        self.calls = 0
+        
+    def fetch_balance(self):
+        self.calls += 1
+        return {'total': dict(self.totals)}
+
+
+def test_reads_are_local_after_first_sync():
+    bridge = Bridge()
+    state = StateManager(source=bridge)
+    assert state.get_account_info() == {'balance': 1000.0, 'equity': 1000.0}
+    
+    state.on_fill('EUR/USD', 'BUY', 2.0, 1.0)
+    state.on_price('EUR/USD', 1.25)
+    assert state.get_positions()['EUR/USD'] == {'volume': 2.0, 'price': 1.0, 'profit': 0.5}
+    assert state.get_account_info()['equity'] == 1000.5
+    
+    state.on_fill('EUR/USD', 'SELL', 1.0, 1.5)
+    assert state.get_account_info()['balance'] == 1000.5
+    assert state.get_positions()['EUR/USD']['volume'] == 1.0
+    assert bridge.calls == 1
+
+
+def test_reconcile_reports_and_adopts_remote_positions():
+    bridge = Bridge()
+    state = StateManager(source=bridge)
+    state.reconcile()
+    state.on_fill('EUR/USD', 'BUY', 1.0, 1.1)
+    
+    # The bridge shows the position per ticket, and a short we never saw
+    bridge.positions = [
+        {'symbol': 'EUR/USD', 'type': 0, 'volume': 1.0, 'price': 1.1},
+        {'symbol': 'GBP/USD', 'type': 'SELL', 'volume': 0.5, 'price': 1.3}
+    ]
+    bridge.account = {'balance': 1000.0, 'equity': 990.0}
+    diffs = state.reconcile()
+    assert [(d['kind'], d['key'], d['local'], d['remote']) for d in diffs] == [
+        ('position', 'GBP/USD', 0.0, -0.5)
+    ]
+    assert state.get_positions()['GBP/USD']['volume'] == -0.5
+    assert state.get_account_info()['equity'] == 990.0
+    assert state.divergences == 1
+    assert state.reconcile() == []
+
+
+def test_exchange_balances_track_fills_between_reconciliations():
+    exchange = Exchange({'BTC': 0.0, 'USDT': 1000.0})
+    state = StateManager(exchange=exchange)
+    assert state.get_balances() == {'USDT': 1000.0}
+    
+    state.on_exchange_fill('BTC/USDT', 'buy', 0.01, cost=500.0)
+    assert state.get_balances() == {'BTC': 0.01, 'USDT': 500.0}
+    assert exchange.calls == 1
+    
+    exchange.totals = {'BTC': 0.00999, 'USDT': 500.0}  # Fee taken in the base asset
+    diffs = state.reconcile()
+    assert [(d['kind'], d['key']) for d in diffs] == [('balance', 'BTC')]
+    assert state.get_balances()['BTC'] == 0.00999
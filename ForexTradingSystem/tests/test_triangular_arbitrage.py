@@ -0,0 +1,52 @@
+import pytest
+from ForexTradingSystem.modules.triangular_arbitrage import TriangularArbitrageScanner
+
+MARKETS = {
+    'BTC/USDT': {'base': 'BTC', 'quote': 'USDT', 'taker': 0.001},
+    'ETH/USDT': {'base': 'ETH', 'quote': 'USDT', 'taker': 0.001},
+    'ETH/BTC': {'base': 'ETH', 'quote': 'BTC', 'taker': 0.001},
+    'BNB/USDT': {'base': 'BNB', 'quote': 'USDT', 'taker': 0.001},
+    'BNB/BTC': {'base': 'BNB', 'quote': 'BTC', 'taker': 0.001},
+    'BTC/USDT:USDT': {'base': 'BTC', 'quote': 'USDT', 'spot': False},
+}
+
+@pytest.fixture
+def scanner():
+    s = TriangularArbitrageScanner(max_cycle_length=3)
+    s.load_markets(MARKETS)
+    return s
+
+def consistent_prices(scanner):
+    scanner.update_prices(
+        ['BTC/USDT', 'ETH/USDT', 'ETH/BTC', 'BNB/USDT', 'BNB/BTC'],
+        [50000, 2500, 0.05, 500, 0.01],
+        [50001, 2500.5, 0.05001, 500.1, 0.01001]
+    )
+
+def test_cycle_enumeration(scanner):
+    # USDT-BTC-ETH and USDT-BTC-BNB triangles, each in both directions
+    assert scanner.cycle_count == 4
+
+def test_no_opportunity_on_consistent_prices(scanner):
+    consistent_prices(scanner)
+    assert scanner.find_opportunities() == []
+
+def test_detects_mispriced_cross_after_incremental_update(scanner):
+    consistent_prices(scanner)
+    scanner.find_opportunities()
+    scanner.update_from_tickers({'ETH/BTC': {'bid': 0.052, 'ask': 0.05201}})
+    opportunities = scanner.find_opportunities(min_profit=0.01, start_currency='USDT')
+    assert len(opportunities) == 1
+    opp = opportunities[0]
+    assert opp['path'] == ['USDT', 'ETH', 'BTC', 'USDT']
+    assert [leg['side'] for leg in opp['legs']] == ['buy', 'sell', 'sell']
+    assert opp['legs'][1]['price'] == pytest.approx(0.052)
+    assert [leg['fee'] for leg in opp['legs']] == [0.001] * 3
+    expected = (1 / 2500.5) * 0.052 * 50000 * 0.999 ** 3 - 1
+    assert opp['profit'] == pytest.approx(expected)
+
+def test_longer_cycles():
+    s = TriangularArbitrageScanner(max_cycle_length=4)
+    s.load_markets(MARKETS)
+    # Adds USDT-ETH-BTC-BNB style four-leg cycles in both directions
+    assert s.cycle_count == 6
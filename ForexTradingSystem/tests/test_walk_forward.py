@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ForexTradingSystem.modules.signal_generator import SignalGenerator
+from ForexTradingSystem.modules.walk_forward import WalkForward, param_grid
+
+
+def history(n=1500, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.001, n) + 0.002 * np.sin(np.arange(n) / 40)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='1h'),
+        'open': close, 'high': close * 1.0005, 'low': close * 0.9995, 'close': close
+    })
+
+
+GRID = param_grid(rsi=(7, 14), ema=(10, 30), macd=((8, 21, 5), (12, 26, 9)))
+
+
+def test_folds_tile_the_test_history_and_workers_agree():
+    serial = WalkForward(history(), cost_bps=1.0, workers=1).run(GRID, train_bars=400, test_bars=200)
+    parallel = WalkForward(history(), cost_bps=1.0, workers=2).run(GRID, train_bars=400, test_bars=200)
+    assert serial['summary']['folds'] == 6
+    assert serial['summary']['bars'] == len(serial['equity']) == 1499 - 400
+    assert [fold['params'] for fold in serial['folds']] == [fold['params'] for fold in parallel['folds']]
+    assert [point['equity'] for point in serial['equity']] == pytest.approx(
+        [point['equity'] for point in parallel['equity']])
+        
+    returns = [fold['test_return'] for fold in serial['folds']]
+    assert serial['summary']['total_return'] == pytest.approx(np.prod(1 + np.array(returns)) - 1)
+    assert serial['folds'][1]['test'][0] == str(history()['timestamp'][600])
+
+
+def test_indicators_are_computed_once_per_spec():
+    walk_forward = WalkForward(history(), workers=1)
+    walk_forward.run(GRID, train_bars=400, test_bars=200)
+    assert len(walk_forward.cache) == 2 + 2 + 2  # Not one per parameter set or window
+    cached = dict(walk_forward.cache)
+    walk_forward.run(GRID, train_bars=300, test_bars=300, anchored=True)
+    assert all(walk_forward.cache[key] is buffers for key, buffers in cached.items())
+    assert walk_forward.windows(300, 300, anchored=True)[-1] == (0, 1200, 1499)
+
+
+def test_out_of_sample_ignores_later_bars():
+    full = WalkForward(history(), workers=1).run(GRID, train_bars=400, test_bars=200)
+    frame = history()
+    frame.loc[1000:, ['open', 'high', 'low', 'close']] *= 1.5  # Rewrite the future after fold 3
+    changed = WalkForward(frame, workers=1).run(GRID, train_bars=400, test_bars=200)
+    assert [fold['params'] for fold in changed['folds'][:3]] == [fold['params'] for fold in full['folds'][:3]]
+    assert [point['equity'] for point in changed['equity'][:599]] == pytest.approx(
+        [point['equity'] for point in full['equity'][:599]])
+        
+    with pytest.raises(ValueError):
+        WalkForward(history(300), workers=1).run(GRID, train_bars=400, test_bars=200)
+
+
+def test_winning_parameters_drive_the_live_generator():
+    result = WalkForward(history(), workers=1).run(
+        param_grid(macd=((8, 21, 5),)), train_bars=400, test_bars=200)
+    generator = SignalGenerator()
+    generator.indicators = result['folds'][-1]['params']
+    frame = pd.DataFrame({'MACD_8_21_5': [0.1, 0.3], 'MACDs_8_21_5': [0.2, 0.2]})
+    assert generator._generate_macd_signal(frame) == 'bullish'